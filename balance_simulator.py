@@ -0,0 +1,256 @@
+#헤드리스 밸런스 시뮬레이터
+#LLM 없이 전투/보상/상점/물약 사용 루프를 스크립트 정책으로 수천 세션 실행하고
+#턴별 골드, 명성, 인벤토리 곡선을 CSV로 출력
+#사용법: python balance_simulator.py --sessions 10000 --turns 30 --output balance.csv
+
+import argparse
+import csv
+import io
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Tuple
+from langchain_core.messages import AIMessage
+
+from database import MainStoryDB
+from battle_system import BattleSystem
+from inventory_system import InventorySystem, ShopSystem, ItemRewardSystem
+from rng import GameRNG
+from models import GAME_CONSTANTS
+
+
+class StubLLM:
+    #LLM 대역 - 네트워크 호출 없이 고정 응답
+    def invoke(self, messages) -> AIMessage:
+        return AIMessage(content="(시뮬레이션)")
+
+
+# 스크립트 정책
+# heal_below: 파티 HP 비율이 이 값 미만이면 물약 사용
+# potion_reserve: 보유 체력 물약이 이 개수 미만이면 구입
+# gold_reserve: 구입 후에도 남겨둘 최소 골드
+POLICIES = {
+    "cautious": {"heal_below": 0.5, "potion_reserve": 2, "gold_reserve": 100},
+    "frugal": {"heal_below": 0.25, "potion_reserve": 0, "gold_reserve": 0},
+    "shopper": {"heal_below": 0.6, "potion_reserve": 5, "gold_reserve": 0}
+}
+
+# 시뮬레이션 파티 (이름, 타입, 직업)
+SIMULATION_PARTY = [
+    ("시뮬 용사", "player", "전사"),
+    ("시뮬 마법사", "companion", "마법사"),
+    ("시뮬 성직자", "companion", "성직자")
+]
+
+SHOP_POTION = "치유 물약"
+MAX_POTIONS_PER_TURN = 3
+
+# 턴 하나에 해당하는 게임 시간(초) - 상점 재고 보충 등 시각 기준 동작을 게임과 같은 게임 시계로 재현
+SIMULATED_TURN_SECONDS = GAME_CONSTANTS["GAME_TURN_SECONDS"]
+
+CSV_FIELDS = [
+    "session", "policy", "seed", "turn", "event", "gold", "reputation",
+    "inventory_items", "inventory_value", "hp_potions", "party_hp_ratio",
+    "alive_members", "potions_used", "potions_bought"
+]
+
+
+def _party_hp_ratio(main_db) -> Tuple[float, int]:
+    #파티 전체 HP 비율과 생존 인원
+    party_status = main_db.get_party_status()
+    total_hp = sum(char[3] for char in party_status)
+    total_max_hp = sum(char[4] for char in party_status) or 1
+    alive = sum(1 for char in party_status if char[7])
+    return total_hp / total_max_hp, alive
+
+
+def _inventory_snapshot(main_db, player_id: int) -> Tuple[int, int, int]:
+    #인벤토리 총 수량, 총 가치, 체력 물약 수
+    items = quantity_value = hp_potions = 0
+    for item_id, item_name, item_type, quantity, description, value in main_db.get_inventory(player_id):
+        items += quantity
+        quantity_value += quantity * (value or 0)
+        if item_type == "hp_potion":
+            hp_potions += quantity
+    return items, quantity_value, hp_potions
+
+
+def run_session(session_id: int, policy_name: str, turns: int, seed: int, explore_every: int) -> List[Dict]:
+    #세션 하나 실행 - 세션마다 독립 메모리 DB와 시드 (병렬/직렬 결과 동일)
+    policy = POLICIES[policy_name]
+    stub_llm = StubLLM()
+    rng = GameRNG(seed)
+    main_db = MainStoryDB(":memory:", reputation_half_life=None)  # 명성 감쇠 없음 (결과 재현용)
+
+    battle_system = BattleSystem(rng, llm=stub_llm)
+    reward_system = ItemRewardSystem(rng)
+    shop_system = ShopSystem(llm=stub_llm)
+    inventory_system = InventorySystem(llm=stub_llm)
+
+    rows = []
+    try:
+        with redirect_stdout(io.StringIO()):
+            member_ids = [
+                main_db.create_character({"name": name, "type": char_type, "class": class_name, "is_in_party": True})
+                for name, char_type, class_name in SIMULATION_PARTY
+            ]
+            player_id = member_ids[0]
+            state = {
+                "main_story_db": main_db,
+                "main_story_player_id": player_id,
+                "companion_ids": member_ids[1:],
+                "current_location": "시뮬레이션 평원",
+                "player_gold": 300,
+                "messages": []
+            }
+            potions_used = potions_bought = 0
+
+            for turn in range(1, turns + 1):
+                main_db.advance_clock(SIMULATED_TURN_SECONDS)  # 턴 단위 게임 시계
+                
+                # 턴 동안의 명성 변화는 누적했다가 턴 끝에 한 번에 기록
+                main_db.begin_reputation_turn()
+                
+                # 탐험 또는 전투
+                if explore_every and turn % explore_every == 0:
+                    event = "explore"
+                    reward_system.generate_exploration_rewards(state)
+                else:
+                    event = "battle"
+                    battle_data = battle_system.simulate_battle(state)
+                    state = battle_system.apply_battle_consequences(state, battle_data)
+                    reward_system.generate_battle_rewards(state, battle_data)
+
+                # 물약 사용
+                for _ in range(MAX_POTIONS_PER_TURN):
+                    hp_ratio, alive = _party_hp_ratio(main_db)
+                    if alive == 0 or hp_ratio >= policy["heal_below"]:
+                        break
+                    if not main_db.get_item_by_type(player_id, "hp_potion"):
+                        break
+                    inventory_system.use_potion(state)
+                    potions_used += 1
+
+                # 상점 구입
+                price = shop_system.reputation_manager.apply_reputation_to_price(
+                    shop_system.base_shop_items[SHOP_POTION]["price"],
+                    main_db.get_local_reputation(player_id, state["current_location"])
+                )
+                while (_inventory_snapshot(main_db, player_id)[2] < policy["potion_reserve"]
+                       and state["player_gold"] - price >= policy["gold_reserve"]):
+                    if shop_system.try_purchase(state, SHOP_POTION)["status"] != "ok":
+                        break  # 품절 (또는 골드 부족)
+                    potions_bought += 1
+
+                main_db.flush_reputation()
+                
+                hp_ratio, alive = _party_hp_ratio(main_db)
+                items, inventory_value, hp_potions = _inventory_snapshot(main_db, player_id)
+                rows.append({
+                    "session": session_id,
+                    "policy": policy_name,
+                    "seed": seed,
+                    "turn": turn,
+                    "event": event,
+                    "gold": state["player_gold"],
+                    "reputation": main_db.get_character(player_id)["reputation"],
+                    "inventory_items": items,
+                    "inventory_value": inventory_value,
+                    "hp_potions": hp_potions,
+                    "party_hp_ratio": round(hp_ratio, 4),
+                    "alive_members": alive,
+                    "potions_used": potions_used,
+                    "potions_bought": potions_bought
+                })
+
+                # 전멸 시 세션 종료
+                if alive == 0:
+                    break
+    finally:
+        main_db.close()
+
+    return rows
+
+
+def _run_session_task(task: Tuple) -> List[Dict]:
+    #프로세스 풀 작업 단위
+    return run_session(*task)
+
+
+def build_tasks(sessions: int, policies: List[str], turns: int, seed: int, explore_every: int) -> List[Tuple]:
+    #세션 작업 목록 (정책은 순서대로 번갈아 배정, 시드는 세션 번호로 고정)
+    return [
+        (session_id, policies[session_id % len(policies)], turns, seed + session_id, explore_every)
+        for session_id in range(sessions)
+    ]
+
+
+def run_simulation(tasks: List[Tuple], workers: int, output_path: str) -> Dict[str, Dict]:
+    #세션 실행 후 CSV 기록 - 결과는 작업 순서대로 기록되어 워커 수와 무관하게 같은 파일
+    summary = defaultdict(lambda: {"sessions": 0, "wipes": 0, "final_gold": 0, "final_reputation": 0})
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+        if workers <= 1:
+            results = map(_run_session_task, tasks)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(tasks) // (workers * 8))
+            results = executor.map(_run_session_task, tasks, chunksize=chunksize)
+
+        try:
+            for rows in results:
+                writer.writerows(rows)
+                if rows:
+                    last = rows[-1]
+                    stats = summary[last["policy"]]
+                    stats["sessions"] += 1
+                    stats["wipes"] += last["alive_members"] == 0
+                    stats["final_gold"] += last["gold"]
+                    stats["final_reputation"] += last["reputation"]
+        finally:
+            if executor:
+                executor.shutdown()
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="헤드리스 밸런스 시뮬레이터")
+    parser.add_argument("--sessions", type=int, default=1000, help="실행할 세션 수")
+    parser.add_argument("--turns", type=int, default=30, help="세션당 최대 턴 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수 (1이면 직렬 실행)")
+    parser.add_argument("--policies", default=",".join(POLICIES), help=f"정책 목록 (쉼표 구분: {', '.join(POLICIES)})")
+    parser.add_argument("--seed", type=int, default=0, help="기준 시드 (세션 시드 = 기준 시드 + 세션 번호)")
+    parser.add_argument("--explore-every", type=int, default=4, help="N턴마다 전투 대신 탐험 (0이면 전투만)")
+    parser.add_argument("--output", default="balance_results.csv", help="CSV 출력 경로")
+    args = parser.parse_args()
+
+    policies = [name.strip() for name in args.policies.split(",") if name.strip()]
+    unknown = [name for name in policies if name not in POLICIES]
+    if unknown or not policies:
+        parser.error(f"알 수 없는 정책: {', '.join(unknown) or '(없음)'}")
+
+    tasks = build_tasks(args.sessions, policies, args.turns, args.seed, args.explore_every)
+
+    started = time.perf_counter()
+    summary = run_simulation(tasks, args.workers, args.output)
+    elapsed = time.perf_counter() - started
+
+    print(f"세션 {args.sessions}개 x 최대 {args.turns}턴 완료 ({elapsed:.1f}초, 워커 {args.workers}개)")
+    print(f"결과: {args.output}")
+    for policy_name, stats in summary.items():
+        sessions = stats["sessions"]
+        print(f"- {policy_name}: 세션 {sessions}개, "
+              f"평균 최종 골드 {stats['final_gold'] / sessions:.1f}, "
+              f"평균 최종 명성 {stats['final_reputation'] / sessions:.1f}, "
+              f"전멸률 {stats['wipes'] / sessions:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,634 @@
+#전투 엔진 모듈
+#전투원 능력치를 배열로 보관하고 모든 전투원의 전투 결과를 한 번에 일괄 계산
+#파티 3명 전투와 수천 명 규모의 시뮬레이션을 같은 코드로 처리
+#라운드 전투는 양 진영 전투원을 같은 배열에 보관하고 행동 순서(민첩)대로 적 체력과 사망을 추적
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from models import BattleResult, GAME_CONSTANTS
+
+# 직업별 전투 범위 (최소, 최대 - 양 끝 포함)
+# (받는 피해, MP 소모, 입히는 피해, 특수 기술 추가 피해)
+PARTY_RANGES = {
+    "전사": ((5, 35), (3, 15), (25, 50), (10, 20)),
+    "성직자": ((5, 35), (8, 20), (15, 30), (10, 20)),
+    "마법사": ((5, 35), (10, 25), (30, 55), (10, 20)),
+    "기본": ((5, 35), (3, 15), (20, 40), (10, 20))
+}
+
+# 솔로 전투는 더 높은 데미지
+SOLO_RANGES = ((10, 30), (5, 20), (30, 60), (15, 25))
+
+CRITICAL_MULTIPLIER = 1.5
+
+# 라운드 전투 - 적 한 명의 기본 행동당 피해 범위 (적 attack_bonus만큼 이동)
+ENEMY_ROUND_DAMAGE = (10, 25)
+ENEMY_AGILITY = 10
+
+# 직업별 범위는 전투 전체 기준 - 라운드 전투의 행동 한 번은 그 1/ROUND_ACTION_SHARE
+ROUND_ACTION_SHARE = 3
+
+# 라운드마다 민첩에 더하는 주사위 (행동 순서 결정)
+INITIATIVE_DIE = 10
+
+PARTY_SIDE = 0
+ENEMY_SIDE = 1
+NO_WINNER = -1
+
+# 추정 시 한 번에 추첨할 최대 전투원 수 (메모리 제한)
+ESTIMATE_BATCH_SIZE = 1_000_000
+
+
+def reward_multiplier(reputation):
+    #명성에 따른 보상 배율 (정수 또는 배열)
+    reputation = np.asarray(reputation)
+    multiplier = np.select(
+        [reputation >= 60, reputation >= 20, reputation <= -40],
+        [1.5, 1.2, 0.8],
+        default=1.0
+    )
+    return multiplier if multiplier.ndim else float(multiplier)
+
+
+def battle_reward_formula(total_damage, critical_hits, special_actions, reputation, enemy_multiplier: float = 1.0):
+    #전투 보상 공식 - DB 없이 계산하는 순수 함수 (정수 또는 배열)
+    #enemy_multiplier: 조우한 적의 보상 배율
+    #반환: (경험치, 골드, 명성 변화)
+    multiplier = reward_multiplier(reputation) * enemy_multiplier
+
+    # 기본 보상 + 보너스
+    bonus = critical_hits * 5 + special_actions * 3
+    experience = np.trunc((20 + total_damage // 10 + bonus) * multiplier).astype(np.int64)
+    gold = np.trunc((10 + total_damage // 20 + bonus) * multiplier).astype(np.int64)
+    reputation_change = np.where(np.asarray(total_damage) > 100, 2, 1)
+
+    if experience.ndim == 0:
+        return int(experience), int(gold), int(reputation_change)
+    return experience, gold, reputation_change
+
+
+# 직업명 키워드 -> 전투 범위 계열 (앞에서부터 먼저 일치하는 계열 사용)
+CLASS_KEYWORDS = (
+    ("성직자", ("성직자", "사제", "신관", "priest", "cleric")),
+    ("마법사", ("마법사", "마도사", "흑마법사", "mage", "wizard")),
+    ("전사", ("전사", "기사", "검사", "테스트용사", "warrior", "knight"))
+)
+
+# 능력치 기준값 - 기준값(10)과 레벨 1이면 직업 기본 범위 그대로
+COMBAT_STAT_BASELINE = 10
+
+
+def class_family(class_name: str) -> str:
+    #직업명을 전투 범위 계열로 분류
+    class_name = (class_name or "").lower()
+    for family, keywords in CLASS_KEYWORDS:
+        if any(keyword in class_name for keyword in keywords):
+            return family
+    return "기본"
+
+
+def compute_combat_profile(class_name: str, level: int = 1, strength: int = COMBAT_STAT_BASELINE,
+                           agility: int = COMBAT_STAT_BASELINE, intelligence: int = COMBAT_STAT_BASELINE) -> Tuple:
+    #직업과 능력치로 전투 범위 계산
+    #공격 피해: 주 능력치(전사/기본=힘, 마법사/성직자=지력) 1당 +1, 레벨당 +2
+    #받는 피해: 민첩 2당 -1 / MP 소모: 지력 3당 -1 (최소 1)
+    family = class_family(class_name)
+    taken, mp_cost, damage, special = PARTY_RANGES[family]
+
+    primary = intelligence if family in ("마법사", "성직자") else strength
+    damage_bonus = (primary or COMBAT_STAT_BASELINE) - COMBAT_STAT_BASELINE + 2 * (max(1, level or 1) - 1)
+    dodge = ((agility or COMBAT_STAT_BASELINE) - COMBAT_STAT_BASELINE) // 2
+    focus = ((intelligence or COMBAT_STAT_BASELINE) - COMBAT_STAT_BASELINE) // 3
+
+    shift = lambda bounds, delta, floor: (max(floor, bounds[0] + delta), max(floor, bounds[1] + delta))
+    return (
+        shift(taken, -dodge, 0),
+        shift(mp_cost, -focus, 1),
+        shift(damage, damage_bonus, 1),
+        special
+    )
+
+
+def enemy_round_damage(attack_bonus):
+    #적의 행동당 피해 범위 (최소, 최대) - attack_bonus만큼 이동 (정수 또는 배열)
+    low = np.maximum(1, ENEMY_ROUND_DAMAGE[0] + np.asarray(attack_bonus))
+    high = np.maximum(low, ENEMY_ROUND_DAMAGE[1] + np.asarray(attack_bonus))
+    if low.ndim == 0:
+        return int(low), int(high)
+    return low, high
+
+
+def combat_defense(agility: int) -> int:
+    #라운드 전투 방어력 - 민첩 2당 받는 피해 -1 (최소 0)
+    return max(0, ((agility or COMBAT_STAT_BASELINE) - COMBAT_STAT_BASELINE) // 2)
+
+
+class CombatProfileCache:
+    #캐릭터별 전투 범위 캐시 - 능력치 버전이 바뀐 캐릭터만 다시 조회/계산
+
+    def __init__(self):
+        self._profiles = {}  # char_id -> (능력치 버전, 전투 범위, 민첩)
+
+    def get_ranges(self, main_db, char_ids: Sequence[int]) -> List[Tuple]:
+        #캐릭터 id 순서대로 전투 범위 반환
+        stale = [char_id for char_id in char_ids
+                 if self._profiles.get(char_id, (None,))[0] != main_db.stats_version(char_id)]
+
+        if stale:
+            for char_id, name, class_name, level, strength, agility, intelligence in main_db.get_combat_stats(stale):
+                ranges = compute_combat_profile(class_name or name, level, strength, agility, intelligence)
+                self._profiles[char_id] = (main_db.stats_version(char_id), ranges,
+                                           agility or COMBAT_STAT_BASELINE)
+
+        return [self._profiles[char_id][1] if char_id in self._profiles else PARTY_RANGES["기본"]
+                for char_id in char_ids]
+
+    def get_agility(self, main_db, char_ids: Sequence[int]) -> List[int]:
+        #캐릭터 id 순서대로 민첩 (get_ranges와 같은 캐시 사용)
+        self.get_ranges(main_db, char_ids)
+        return [self._profiles[char_id][2] if char_id in self._profiles else COMBAT_STAT_BASELINE
+                for char_id in char_ids]
+
+    def invalidate(self, char_id: Optional[int] = None):
+        #캐시 무효화 (char_id가 없으면 전체)
+        if char_id is None:
+            self._profiles.clear()
+        else:
+            self._profiles.pop(char_id, None)
+
+
+@dataclass
+class CombatantArrays:
+    #전투원 상태 (전투원별 dict 대신 같은 길이의 배열들로 보관)
+    ids: np.ndarray
+    names: List[str]
+    hp: np.ndarray
+    mp: np.ndarray
+    max_mp: np.ndarray
+    taken_low: np.ndarray
+    taken_high: np.ndarray
+    mp_low: np.ndarray
+    mp_high: np.ndarray
+    damage_low: np.ndarray
+    damage_high: np.ndarray
+    special_low: np.ndarray
+    special_high: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_ranges(cls, ids: Sequence[int], names: List[str], hp: Sequence[int],
+                    mp: Sequence[int], max_mp: Sequence[int], ranges: Sequence[Tuple]) -> "CombatantArrays":
+        #전투원별 범위 목록으로 배열 생성
+        bounds = np.asarray(ranges, dtype=np.int64).reshape(len(ids), 4, 2)
+        return cls(
+            ids=np.asarray(ids, dtype=np.int64),
+            names=list(names),
+            hp=np.asarray(hp, dtype=np.int64),
+            mp=np.asarray(mp, dtype=np.int64),
+            max_mp=np.asarray(max_mp, dtype=np.int64),
+            taken_low=bounds[:, 0, 0], taken_high=bounds[:, 0, 1],
+            mp_low=bounds[:, 1, 0], mp_high=bounds[:, 1, 1],
+            damage_low=bounds[:, 2, 0], damage_high=bounds[:, 2, 1],
+            special_low=bounds[:, 3, 0], special_high=bounds[:, 3, 1]
+        )
+
+    @classmethod
+    def from_party_status(cls, party_status: List[Tuple], ranges: Sequence[Tuple]) -> "CombatantArrays":
+        #get_party_status 행 목록과 캐릭터별 전투 범위로 배열 생성
+        ids, names, hp, mp, max_mp = [], [], [], [], []
+        for char in party_status:
+            char_id, name, char_type, char_hp, max_hp, char_mp, char_max_mp, is_alive, relationship, reputation, gold = char
+            ids.append(char_id)
+            names.append(name)
+            hp.append(char_hp)
+            mp.append(char_mp)
+            max_mp.append(char_max_mp)
+        return cls.from_ranges(ids, names, hp, mp, max_mp, ranges)
+
+    def repeat(self, trials: int) -> "CombatantArrays":
+        #같은 전투원 구성을 trials번 반복 (전투원 순서가 안쪽 축, 이름은 복제하지 않음)
+        tile = lambda values: np.tile(values, trials)
+        return CombatantArrays(
+            ids=tile(self.ids), names=[],
+            hp=tile(self.hp), mp=tile(self.mp), max_mp=tile(self.max_mp),
+            taken_low=tile(self.taken_low), taken_high=tile(self.taken_high),
+            mp_low=tile(self.mp_low), mp_high=tile(self.mp_high),
+            damage_low=tile(self.damage_low), damage_high=tile(self.damage_high),
+            special_low=tile(self.special_low), special_high=tile(self.special_high)
+        )
+
+    def against(self, attack_bonus: int, defense: int) -> "CombatantArrays":
+        #적 능력치 반영 - 받는 피해 범위 +attack_bonus (최소 0), 입히는 피해 범위 -defense (최소 1)
+        return CombatantArrays(
+            ids=self.ids, names=self.names, hp=self.hp, mp=self.mp, max_mp=self.max_mp,
+            taken_low=np.maximum(0, self.taken_low + attack_bonus),
+            taken_high=np.maximum(0, self.taken_high + attack_bonus),
+            mp_low=self.mp_low, mp_high=self.mp_high,
+            damage_low=np.maximum(1, self.damage_low - defense),
+            damage_high=np.maximum(1, self.damage_high - defense),
+            special_low=self.special_low, special_high=self.special_high
+        )
+
+    @classmethod
+    def uniform(cls, count: int, ranges: Tuple, hp: int = 100, mp: int = 50) -> "CombatantArrays":
+        #같은 범위를 가진 전투원 count명 (대량 시뮬레이션용)
+        return cls.from_ranges(
+            np.arange(count), [f"전투원{i + 1}" for i in range(count)],
+            np.full(count, hp), np.full(count, mp), np.full(count, mp),
+            [ranges] * count
+        )
+
+
+@dataclass
+class BattleRolls:
+    #일괄 계산된 전투 결과 (전투원 순서와 같은 배열)
+    damage_taken: np.ndarray
+    mp_used: np.ndarray
+    damage_dealt: np.ndarray
+    critical: np.ndarray
+    special: np.ndarray
+    hp_after: np.ndarray
+    mp_after: np.ndarray
+    alive: np.ndarray
+
+    def db_rows(self, combatants: CombatantArrays) -> List[Tuple]:
+        #DB 일괄 반영용 (hp, mp, is_alive, id) 행 목록
+        return list(zip(self.hp_after.tolist(), self.mp_after.tolist(),
+                        self.alive.tolist(), combatants.ids.tolist()))
+
+    def to_battle_results(self, combatants: CombatantArrays, track_state: bool = True) -> List[BattleResult]:
+        #BattleResult 목록으로 변환 (솔로 전투는 HP/MP를 추적하지 않음)
+        results = []
+        for i, name in enumerate(combatants.names):
+            results.append(BattleResult(
+                participant_name=name,
+                damage_taken=int(self.damage_taken[i]),
+                mp_used=int(self.mp_used[i]),
+                damage_dealt=int(self.damage_dealt[i]),
+                hp_after=int(self.hp_after[i]) if track_state else 'solo_player',
+                mp_after=int(self.mp_after[i]) if track_state else 'solo_player',
+                alive=bool(self.alive[i]) if track_state else True,
+                critical=bool(self.critical[i]),
+                special_action=bool(self.special[i])
+            ))
+        return results
+
+
+@dataclass
+class SkirmishArrays:
+    #라운드 전투 전투원 상태 - 양 진영을 같은 배열에 두고 side로 구분
+    ids: np.ndarray
+    names: List[str]
+    side: np.ndarray
+    hp: np.ndarray
+    mp: np.ndarray
+    damage_low: np.ndarray
+    damage_high: np.ndarray
+    mp_low: np.ndarray
+    mp_high: np.ndarray
+    special_low: np.ndarray
+    special_high: np.ndarray
+    defense: np.ndarray
+    agility: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_party(cls, combatants: CombatantArrays, agility: Sequence[int]) -> "SkirmishArrays":
+        #파티 전투원 배열과 민첩으로 아군 진영 생성 (전투 전체 범위를 행동 한 번 기준으로 나눔)
+        share = lambda values: np.maximum(1, values // ROUND_ACTION_SHARE)
+        return cls(
+            ids=combatants.ids, names=list(combatants.names),
+            side=np.full(len(combatants), PARTY_SIDE, dtype=np.int64),
+            hp=combatants.hp, mp=combatants.mp,
+            damage_low=share(combatants.damage_low), damage_high=share(combatants.damage_high),
+            mp_low=share(combatants.mp_low), mp_high=share(combatants.mp_high),
+            special_low=share(combatants.special_low), special_high=share(combatants.special_high),
+            defense=np.asarray([combat_defense(value) for value in agility], dtype=np.int64),
+            agility=np.asarray(agility, dtype=np.int64)
+        )
+
+    @classmethod
+    def enemies(cls, count: int, name: str, hp: int, attack_bonus: int = 0, defense: int = 0,
+                agility: int = ENEMY_AGILITY) -> "SkirmishArrays":
+        #같은 적 count마리로 적 진영 생성 (MP/특수 기술 없음)
+        damage_low, damage_high = enemy_round_damage(attack_bonus)
+        full = lambda value: np.full(count, value, dtype=np.int64)
+        return cls(
+            ids=np.arange(count), names=[name] * count if count == 1 else [f"{name}{i + 1}" for i in range(count)],
+            side=full(ENEMY_SIDE), hp=full(hp), mp=full(0),
+            damage_low=full(damage_low), damage_high=full(damage_high),
+            mp_low=full(0), mp_high=full(0), special_low=full(0), special_high=full(0),
+            defense=full(defense), agility=full(agility)
+        )
+
+    @classmethod
+    def uniform(cls, count: int, side: int, ranges: Tuple, hp: int = 100, mp: int = 50,
+                defense: int = 0, agility: int = COMBAT_STAT_BASELINE) -> "SkirmishArrays":
+        #같은 범위를 가진 전투원 count명 (대규모 전투/벤치마크용)
+        skirmish = cls.from_party(CombatantArrays.uniform(count, ranges, hp, mp), [agility] * count)
+        skirmish.side = np.full(count, side, dtype=np.int64)
+        skirmish.defense = np.full(count, defense, dtype=np.int64)
+        return skirmish
+
+    def tile(self, trials: int) -> "SkirmishArrays":
+        #같은 구성으로 trials번 전투 (fight_trials용) - 능력치/상태 필드 모양은 (trials, 전투원 수),
+        #ids/names/side는 전투마다 같으므로 복제하지 않음
+        tile = lambda values: np.tile(values, (trials, 1))
+        return SkirmishArrays(
+            ids=self.ids, names=self.names, side=self.side,
+            hp=tile(self.hp), mp=tile(self.mp),
+            damage_low=tile(self.damage_low), damage_high=tile(self.damage_high),
+            mp_low=tile(self.mp_low), mp_high=tile(self.mp_high),
+            special_low=tile(self.special_low), special_high=tile(self.special_high),
+            defense=tile(self.defense), agility=tile(self.agility)
+        )
+
+    def set_enemy(self, index: int, hp, attack_bonus, defense):
+        #tile한 배열의 index번 전투원을 전투마다 다른 적으로 교체 (SkirmishArrays.enemies와 같은 능력치 규칙)
+        self.hp[:, index] = hp
+        self.damage_low[:, index], self.damage_high[:, index] = enemy_round_damage(attack_bonus)
+        self.defense[:, index] = defense
+
+    @classmethod
+    def join(cls, *groups: "SkirmishArrays") -> "SkirmishArrays":
+        #여러 진영 배열을 하나로 연결 (전투원 인덱스는 연결 순서)
+        concat = lambda field: np.concatenate([getattr(group, field) for group in groups])
+        return cls(
+            ids=concat("ids"), names=[name for group in groups for name in group.names],
+            side=concat("side"), hp=concat("hp"), mp=concat("mp"),
+            damage_low=concat("damage_low"), damage_high=concat("damage_high"),
+            mp_low=concat("mp_low"), mp_high=concat("mp_high"),
+            special_low=concat("special_low"), special_high=concat("special_high"),
+            defense=concat("defense"), agility=concat("agility")
+        )
+
+
+@dataclass
+class SkirmishResult:
+    #라운드 전투 결과 (전투원 순서와 같은 배열)
+    #fight_trials 결과는 rounds/winner가 (trials,), 나머지가 (trials, 전투원 수) 배열
+    rounds: int
+    winner: int  # PARTY_SIDE / ENEMY_SIDE / NO_WINNER(라운드 제한 도달)
+    damage_taken: np.ndarray
+    mp_used: np.ndarray
+    damage_dealt: np.ndarray
+    kills: np.ndarray
+    critical: np.ndarray
+    special: np.ndarray
+    hp_after: np.ndarray
+    alive: np.ndarray
+
+
+class BattleEngine:
+    #배열 기반 전투 계산 엔진
+
+    def __init__(self, rng: Optional[np.random.Generator] = None,
+                 critical_chance: float = GAME_CONSTANTS["BATTLE_CRITICAL_CHANCE"],
+                 special_chance: float = GAME_CONSTANTS["BATTLE_SPECIAL_CHANCE"]):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.critical_chance = critical_chance
+        self.special_chance = special_chance
+
+    def roll(self, combatants: CombatantArrays) -> BattleRolls:
+        #모든 전투원의 받는 피해, MP 소모, 입히는 피해, 크리티컬, 특수 기술을 한 번에 추첨
+        count = len(combatants)
+        rng = self.rng
+
+        damage_taken = rng.integers(combatants.taken_low, combatants.taken_high, endpoint=True)
+        mp_used = rng.integers(combatants.mp_low, combatants.mp_high, endpoint=True)
+        damage_dealt = rng.integers(combatants.damage_low, combatants.damage_high, endpoint=True)
+
+        # 크리티컬 히트
+        critical = rng.random(count) < self.critical_chance
+        damage_dealt = np.where(critical, (damage_dealt * CRITICAL_MULTIPLIER).astype(np.int64), damage_dealt)
+
+        # 특수 기술
+        special = rng.random(count) < self.special_chance
+        special_bonus = rng.integers(combatants.special_low, combatants.special_high, endpoint=True)
+        damage_dealt = damage_dealt + np.where(special, special_bonus, 0)
+
+        hp_after = np.maximum(0, combatants.hp - damage_taken)
+        mp_after = np.clip(combatants.mp - mp_used, 0, combatants.max_mp)
+
+        return BattleRolls(
+            damage_taken=damage_taken,
+            mp_used=mp_used,
+            damage_dealt=damage_dealt,
+            critical=critical,
+            special=special,
+            hp_after=hp_after,
+            mp_after=mp_after,
+            alive=hp_after > 0
+        )
+
+    def roll_trials(self, combatants: CombatantArrays, trials: int, attack_bonus=0, defense=0) -> BattleRolls:
+        #같은 구성으로 trials번 전투 추첨 - 결과 배열 모양은 (trials, 전투원 수)
+        #attack_bonus/defense: 전투마다 조우한 적 능력치 (길이 trials 배열 또는 공통 정수 - CombatantArrays.against)
+        count = len(combatants)
+        batch_trials = max(1, ESTIMATE_BATCH_SIZE // max(1, count))
+        attack_bonus = np.broadcast_to(attack_bonus, trials)
+        defense = np.broadcast_to(defense, trials)
+        batches = []
+
+        for start in range(0, trials, batch_trials):
+            size = min(batch_trials, trials - start)
+            enemy = slice(start, start + size)
+            batches.append(self.roll(combatants.repeat(size).against(
+                np.repeat(attack_bonus[enemy], count), np.repeat(defense[enemy], count)
+            )))
+
+        stack = lambda field: np.concatenate([getattr(b, field) for b in batches]).reshape(trials, count)
+        return BattleRolls(
+            damage_taken=stack("damage_taken"),
+            mp_used=stack("mp_used"),
+            damage_dealt=stack("damage_dealt"),
+            critical=stack("critical"),
+            special=stack("special"),
+            hp_after=stack("hp_after"),
+            mp_after=stack("mp_after"),
+            alive=stack("alive")
+        )
+
+    def fight(self, skirmish: SkirmishArrays, max_rounds: int = GAME_CONSTANTS["BATTLE_MAX_ROUNDS"]) -> SkirmishResult:
+        #라운드 전투 - 한쪽 진영이 전멸하거나 max_rounds에 도달할 때까지 진행
+        #라운드마다 살아있는 전투원 전원의 행동 순서/피해/크리티컬/특수 기술/표적 추첨은 배열로 한 번에,
+        #적용은 행동 순서대로 한 번씩 (먼저 쓰러진 전투원은 행동하지 않음) - 라운드당 비용은 전투원 수에 선형
+        count = len(skirmish)
+        rng = self.rng
+
+        hp = skirmish.hp.astype(np.int64).tolist()
+        mp = skirmish.mp.astype(np.int64).tolist()
+        side = skirmish.side.tolist()
+        defense = skirmish.defense.tolist()
+        damage_taken = [0] * count
+        damage_dealt = [0] * count
+        mp_used = [0] * count
+        kills = [0] * count
+        critical = [False] * count
+        special = [False] * count
+
+        # 진영별 생존자 목록 - 쓰러지면 마지막 원소와 교체해 O(1) 제거
+        members = {PARTY_SIDE: [], ENEMY_SIDE: []}
+        position = {}
+        for i in range(count):
+            if hp[i] > 0:
+                position[i] = len(members[side[i]])
+                members[side[i]].append(i)
+
+        def remove(i: int):
+            group = members[side[i]]
+            last = group.pop()
+            if last != i:
+                group[position[i]] = last
+                position[last] = position[i]
+            del position[i]
+
+        rounds = 0
+        while rounds < max_rounds and members[PARTY_SIDE] and members[ENEMY_SIDE]:
+            rounds += 1
+            actors = np.fromiter(position, dtype=np.int64, count=len(position))
+
+            # 행동 순서: 민첩 + 주사위 (높은 순)
+            initiative = skirmish.agility[actors] + rng.integers(0, INITIATIVE_DIE, size=len(actors), endpoint=True)
+            actors = actors[np.argsort(-initiative, kind="stable")]
+
+            damage = rng.integers(skirmish.damage_low[actors], skirmish.damage_high[actors], endpoint=True)
+            crits = rng.random(len(actors)) < self.critical_chance
+            damage = np.where(crits, (damage * CRITICAL_MULTIPLIER).astype(np.int64), damage)
+            specials = (rng.random(len(actors)) < self.special_chance) & (skirmish.special_high[actors] > 0)
+            damage = damage + np.where(
+                specials, rng.integers(skirmish.special_low[actors], skirmish.special_high[actors], endpoint=True), 0
+            )
+            costs = rng.integers(skirmish.mp_low[actors], skirmish.mp_high[actors], endpoint=True)
+            picks = rng.random(len(actors))
+
+            for actor, hit, crit, used_special, cost, pick in zip(
+                actors.tolist(), damage.tolist(), crits.tolist(), specials.tolist(), costs.tolist(), picks.tolist()
+            ):
+                if hp[actor] <= 0:
+                    continue
+                foes = members[1 - side[actor]]
+                if not foes:
+                    break
+
+                target = foes[int(pick * len(foes))]
+                hit = max(1, hit - defense[target])
+                hp[target] = max(0, hp[target] - hit)
+                damage_dealt[actor] += hit
+                damage_taken[target] += hit
+                critical[actor] = critical[actor] or crit
+                special[actor] = special[actor] or used_special
+
+                spent = min(mp[actor], cost)
+                mp[actor] -= spent
+                mp_used[actor] += spent
+
+                if hp[target] == 0:
+                    kills[actor] += 1
+                    remove(target)
+
+        if members[PARTY_SIDE] and members[ENEMY_SIDE]:
+            winner = NO_WINNER
+        else:
+            winner = PARTY_SIDE if members[PARTY_SIDE] else ENEMY_SIDE
+
+        hp_after = np.asarray(hp, dtype=np.int64)
+        return SkirmishResult(
+            rounds=rounds,
+            winner=winner,
+            damage_taken=np.asarray(damage_taken, dtype=np.int64),
+            mp_used=np.asarray(mp_used, dtype=np.int64),
+            damage_dealt=np.asarray(damage_dealt, dtype=np.int64),
+            kills=np.asarray(kills, dtype=np.int64),
+            critical=np.asarray(critical, dtype=bool),
+            special=np.asarray(special, dtype=bool),
+            hp_after=hp_after,
+            alive=hp_after > 0
+        )
+
+    def fight_trials(self, skirmish: SkirmishArrays,
+                     max_rounds: int = GAME_CONSTANTS["BATTLE_MAX_ROUNDS"]) -> SkirmishResult:
+        #fight를 여러 전투에 한 번에 진행 - skirmish는 SkirmishArrays.tile 결과 (필드 모양 (trials, 전투원 수))
+        #라운드의 행동 순번마다 모든 전투의 그 순번 전투원을 배열 연산으로 함께 처리 -
+        #파이썬 반복은 라운드 수 x 전투원 수로 전투 수와 무관 (전투원이 적은 파티 전투 추정용)
+        #규칙은 fight와 같음: 민첩+주사위 순서, 살아있는 적 중 무작위 표적, 먼저 쓰러진 전투원은 행동하지 않음
+        trials, count = skirmish.hp.shape
+        rng = self.rng
+        rows = np.arange(trials)
+
+        party = np.broadcast_to(skirmish.side == PARTY_SIDE, (trials, count))
+        hp = skirmish.hp.astype(np.int64)
+        mp = skirmish.mp.astype(np.int64)
+        damage_taken = np.zeros((trials, count), dtype=np.int64)
+        damage_dealt = np.zeros((trials, count), dtype=np.int64)
+        mp_used = np.zeros((trials, count), dtype=np.int64)
+        kills = np.zeros((trials, count), dtype=np.int64)
+        critical = np.zeros((trials, count), dtype=bool)
+        special = np.zeros((trials, count), dtype=bool)
+        rounds = np.zeros(trials, dtype=np.int64)
+
+        for _ in range(max_rounds):
+            alive = hp > 0
+            ongoing = (alive & party).any(axis=1) & (alive & ~party).any(axis=1)
+            if not ongoing.any():
+                break
+            rounds += ongoing
+
+            # 행동 순서: 민첩 + 주사위 (높은 순, 라운드 시작 시 쓰러진 전투원은 맨 뒤)
+            initiative = skirmish.agility + rng.integers(0, INITIATIVE_DIE, size=(trials, count), endpoint=True)
+            order = np.argsort(np.where(alive, -initiative, 1), axis=1, kind="stable")
+
+            damage = rng.integers(skirmish.damage_low, skirmish.damage_high, endpoint=True)
+            crits = rng.random((trials, count)) < self.critical_chance
+            damage = np.where(crits, (damage * CRITICAL_MULTIPLIER).astype(np.int64), damage)
+            specials = (rng.random((trials, count)) < self.special_chance) & (skirmish.special_high > 0)
+            damage = damage + np.where(
+                specials, rng.integers(skirmish.special_low, skirmish.special_high, endpoint=True), 0
+            )
+            costs = rng.integers(skirmish.mp_low, skirmish.mp_high, endpoint=True)
+            picks = rng.random((trials, count))
+
+            for slot in range(count):
+                actor = order[:, slot]
+                foes = (hp > 0) & (party != party[rows, actor][:, None])
+                foe_count = foes.sum(axis=1)
+                acting = ongoing & (hp[rows, actor] > 0) & (foe_count > 0)
+                if not acting.any():
+                    continue
+
+                trial, actor, foes = rows[acting], actor[acting], foes[acting]
+                nth = (picks[trial, actor] * foe_count[acting]).astype(np.int64)
+                target = np.argmax(np.cumsum(foes, axis=1) > nth[:, None], axis=1)
+
+                hit = np.maximum(1, damage[trial, actor] - skirmish.defense[trial, target])
+                hp[trial, target] = np.maximum(0, hp[trial, target] - hit)
+                damage_dealt[trial, actor] += hit
+                damage_taken[trial, target] += hit
+                critical[trial, actor] |= crits[trial, actor]
+                special[trial, actor] |= specials[trial, actor]
+
+                spent = np.minimum(mp[trial, actor], costs[trial, actor])
+                mp[trial, actor] -= spent
+                mp_used[trial, actor] += spent
+                kills[trial, actor] += hp[trial, target] == 0
+
+        alive = hp > 0
+        party_left = (alive & party).any(axis=1)
+        enemy_left = (alive & ~party).any(axis=1)
+        return SkirmishResult(
+            rounds=rounds,
+            winner=np.where(party_left & enemy_left, NO_WINNER, np.where(party_left, PARTY_SIDE, ENEMY_SIDE)),
+            damage_taken=damage_taken,
+            mp_used=mp_used,
+            damage_dealt=damage_dealt,
+            kills=kills,
+            critical=critical,
+            special=special,
+            hp_after=hp,
+            alive=alive
+        )
@@ -1,20 +1,50 @@
 #전투 시스템 모듈
 #동적 전투 시뮬레이션이지만 아직 구체적인 배틀노드 구현X
-#배틀 시스템 초기 구현 (배틀 상황을 제시 하지만 무조건 승리)
+#적과 라운드 전투를 진행해 격파/퇴각/패배가 갈림
 
-import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from models import BattleResult, GAME_CONSTANTS
 from reputation_system import ReputationManager
+import numpy as np
+from rng import GameRNG
+from encounter_system import EncounterSystem, Encounter
+from battle_engine import (
+    BattleEngine, BattleRolls, CombatantArrays, CombatProfileCache, SkirmishArrays, SOLO_RANGES,
+    PARTY_SIDE, ENEMY_SIDE, NO_WINNER, COMBAT_STAT_BASELINE, compute_combat_profile, battle_reward_formula
+)
+
+# 전투 결과별 표시 문구
+BATTLE_OUTCOME_LABELS = {"victory": "격파", "retreat": "퇴각", "defeat": "패배"}
+BATTLE_OUTCOME_ENDINGS = {
+    "victory": "전투에서 승리했습니다!",
+    "retreat": "적이 물러났습니다!",
+    "defeat": "파티가 쓰러졌습니다..."
+}
+
+@dataclass
+class BattleNarration:
+    #진행 중인 전투 장면 생성 작업
+    future: Future
+    fallback_scene: str
+    started_at: float
+
 
 class BattleSystem:
     #전투 시스템 클래스
     
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.8)
-        self.reputation_manager = ReputationManager()
+    def __init__(self, rng: GameRNG = None, llm=None):
+        self.llm = llm if llm is not None else ChatOpenAI(model="gpt-4o-mini", temperature=0.8)
+        self.rng = rng if rng is not None else GameRNG()
+        self.reputation_manager = ReputationManager(self.rng, llm=llm)
+        self.battle_engine = BattleEngine(self.rng.stream("battle"))
+        self.combat_profiles = CombatProfileCache()
+        self.encounter_system = EncounterSystem()
     
     def simulate_battle(self, state: Dict) -> Dict:
         #전투 시뮬레이션 실행
@@ -22,148 +52,114 @@ class BattleSystem:
         companion_ids = state.get("companion_ids", [])
         current_location = state.get("current_location", "알 수 없는 곳")
         
+        # 적 조우 (위치와 명성에 맞는 적 원형에서 추첨)
+        encounter = self.encounter_system.generate(
+            self.rng.stream("encounter"), current_location, self._get_current_reputation(state)
+        )
+        
         # 전투 참가자 확인
         has_companions = companion_ids and len(companion_ids) > 0 and main_db is not None
         
         if has_companions:
-            return self._simulate_party_battle(state, main_db, companion_ids)
+            battle_data = self._simulate_party_battle(state, main_db, companion_ids, encounter)
         else:
-            return self._simulate_solo_battle(state)
+            battle_data = self._simulate_solo_battle(state, encounter)
         
-    def _simulate_party_battle(self, state: Dict, main_db, companion_ids: List[int]) -> Dict:
-        #파티 전투
-
-        battle_results = []
-        total_damage_dealt = 0
-        critical_hits = []
-        special_actions = []
+        # 라운드 전투 결과가 없으면(솔로) 총 데미지가 적 체력에 못 미칠 때 적이 퇴각 (보상 감소)
+        enemy = encounter.to_dict()
+        enemy["outcome"] = battle_data.pop("outcome", None) or (
+            "victory" if battle_data["total_damage_dealt"] >= encounter.hp else "retreat"
+        )
+        battle_data["enemy"] = enemy
+        return battle_data
+        
+    def _simulate_party_battle(self, state: Dict, main_db, companion_ids: List[int], encounter: Encounter) -> Dict:
+        #파티 전투 (적과 라운드 전투 후 DB에 한 번에 반영)
 
         # 파티 상태 조회
         party_status = main_db.get_party_status()
 
+        fighters = []
         for char in party_status:
-            char_id, name, char_type, hp, max_hp, mp, max_mp, is_alive, relationship, reputation, gold = char
+            name, is_alive = char[1], char[7]
 
             if not is_alive:
                 print(f"{name}은 이미 쓰러진 상태, 전투 불참")
                 continue
-            
-            # 전투 계산
-            battle_result = self._calculate_character_battle(char_id, name, char_type, main_db)
-            battle_results.append(battle_result)
-            
-            total_damage_dealt += battle_result['damage_dealt']
-            
-            if battle_result['critical']:
-                critical_hits.append(name)
-            
-            if battle_result['special_action']:
-                special_actions.append(name)
-        
+
+            fighters.append(char)
+
+        if not fighters:
+            return {
+                "battle_results": [],
+                "total_damage_dealt": 0,
+                "critical_hits": [],
+                "special_actions": [],
+                "battle_type": "party"
+            }
+
+        # 전투 계산 - 파티(앞쪽)와 적(뒤쪽)을 같은 배열에 두고 라운드 진행
+        fighter_ids = [char[0] for char in fighters]
+        ranges = self.combat_profiles.get_ranges(main_db, fighter_ids)
+        combatants = CombatantArrays.from_party_status(fighters, ranges)
+        party = SkirmishArrays.from_party(combatants, self.combat_profiles.get_agility(main_db, fighter_ids))
+        enemies = SkirmishArrays.enemies(1, encounter.name, encounter.hp, encounter.attack_bonus, encounter.defense)
+        result = self.battle_engine.fight(SkirmishArrays.join(party, enemies))
+
+        count = len(combatants)
+        rolls = BattleRolls(
+            damage_taken=result.damage_taken[:count],
+            mp_used=result.mp_used[:count],
+            damage_dealt=result.damage_dealt[:count],
+            critical=result.critical[:count],
+            special=result.special[:count],
+            hp_after=result.hp_after[:count],
+            mp_after=np.clip(combatants.mp - result.mp_used[:count], 0, combatants.max_mp),
+            alive=result.alive[:count]
+        )
+        main_db.apply_battle_results(rolls.db_rows(combatants))
+
+        outcome = {PARTY_SIDE: "victory", ENEMY_SIDE: "defeat"}.get(result.winner, "retreat")
         return {
-            "battle_results": battle_results,
-            "total_damage_dealt": total_damage_dealt,
-            "critical_hits": critical_hits,
-            "special_actions": special_actions,
-            "battle_type": "party"
+            "battle_results": rolls.to_battle_results(combatants),
+            "total_damage_dealt": int(rolls.damage_dealt.sum()),
+            "critical_hits": [name for name, hit in zip(combatants.names, rolls.critical) if hit],
+            "special_actions": [name for name, used in zip(combatants.names, rolls.special) if used],
+            "battle_type": "party",
+            "rounds": result.rounds,
+            "outcome": outcome
         }
     
-    def _simulate_solo_battle(self, state: Dict) -> Dict:
+    def _simulate_solo_battle(self, state: Dict, encounter: Encounter) -> Dict:
         #솔로 전투 시뮬레이션
         
         player = state["player"]
         player_name = player.name if hasattr(player, 'name') else player.get('이름', '테스트용사')
                 
-        # 솔로 전투 계산
-        damage_taken = random.randint(10, 30)
-        mp_used = random.randint(5, 20)
-        damage_dealt = random.randint(30, 60)  # 솔로는 더 높은 데미지
-        
-        # 크리티컬 히트 확률
-        is_critical = random.random() < GAME_CONSTANTS["BATTLE_CRITICAL_CHANCE"]
-        if is_critical:
-            damage_dealt = int(damage_dealt * 1.5)
-        
-        # 특수 행동 확률
-        special_action_used = random.random() < GAME_CONSTANTS["BATTLE_SPECIAL_CHANCE"]
-        if special_action_used:
-            damage_dealt += random.randint(15, 25)
-        
-        battle_result = BattleResult(
-            participant_name=player_name,
-            damage_taken=damage_taken,
-            mp_used=mp_used,
-            damage_dealt=damage_dealt,
-            hp_after='solo_player',
-            mp_after='solo_player',
-            alive=True,
-            critical=is_critical,
-            special_action=special_action_used
-        )
+        # 솔로 전투 계산 (HP/MP는 추적하지 않음)
+        combatants = CombatantArrays.from_ranges([0], [player_name], [0], [0], [0], [SOLO_RANGES])
+        combatants = combatants.against(encounter.attack_bonus, encounter.defense)
+        rolls = self.battle_engine.roll(combatants)
+        battle_result = rolls.to_battle_results(combatants, track_state=False)[0]
         
         return {
             "battle_results": [battle_result],
-            "total_damage_dealt": damage_dealt,
-            "critical_hits": [player_name] if is_critical else [],
-            "special_actions": [player_name] if special_action_used else [],
+            "total_damage_dealt": battle_result['damage_dealt'],
+            "critical_hits": [player_name] if battle_result['critical'] else [],
+            "special_actions": [player_name] if battle_result['special_action'] else [],
             "battle_type": "solo"
         }
     
-    def _calculate_character_battle(self, char_id: int, name: str, char_type: str, main_db) -> BattleResult:
-        #개별 캐릭터 전투 계산
-
-        # 데미지 받기
-        damage_taken = random.randint(5, 35)
-        new_hp, still_alive = main_db.apply_damage(char_id, damage_taken)
-        
-        # MP 소모 (직업별 차등)
-        if "성직자" in name:
-            mp_used = random.randint(8, 20)
-        elif "마법사" in name:
-            mp_used = random.randint(10, 25)
-        else:
-            mp_used = random.randint(3, 15)
-        
-        # MP 차감
-        new_hp_after_heal, new_mp = main_db.heal_character(char_id, 0, -mp_used)
-        
-        # 적에게 입힌 데미지 (직업별 차등)
-        if "전사" in name or "테스트용사" in name:
-            damage_dealt = random.randint(25, 50)
-        elif "성직자" in name:
-            damage_dealt = random.randint(15, 30)
-        elif "마법사" in name:
-            damage_dealt = random.randint(30, 55)
-        else:
-            damage_dealt = random.randint(20, 40)
-        
-        # 크리티컬 히트 확률
-        is_critical = random.random() < GAME_CONSTANTS["BATTLE_CRITICAL_CHANCE"]
-        if is_critical:
-            damage_dealt = int(damage_dealt * 1.5)
-        
-        # 특수 행동 확률
-        special_action_used = random.random() < GAME_CONSTANTS["BATTLE_SPECIAL_CHANCE"]
-        if special_action_used:
-            damage_dealt += random.randint(10, 20)
-        
-        return BattleResult(
-            participant_name=name,
-            damage_taken=damage_taken,
-            mp_used=mp_used,
-            damage_dealt=damage_dealt,
-            hp_after=new_hp,
-            mp_after=new_mp,
-            alive=still_alive,
-            critical=is_critical,
-            special_action=special_action_used
-        )
-    
     def create_battle_summary(self, battle_data: Dict) -> List[str]:
         #전투 결과 요약 생성
         battle_results = battle_data["battle_results"]
         battle_summary = []
         
+        enemy = battle_data.get("enemy")
+        if enemy:
+            outcome = BATTLE_OUTCOME_LABELS.get(enemy.get("outcome"), "퇴각")
+            battle_summary.append(f"👹 {enemy['name']} (HP {enemy['hp']}): {outcome}")
+        
         for result in battle_results:
             summary_line = f"{result['participant_name']}: -{result['damage_taken']}HP, -{result['mp_used']}MP"
             
@@ -182,8 +178,8 @@ class BattleSystem:
         
         return battle_summary
     
-    def generate_dynamic_battle_scene(self, state: Dict, battle_data: Dict) -> str:
-        #동적 전투 장면 생성
+    def _build_battle_scene_prompt(self, state: Dict, battle_data: Dict) -> Tuple[str, str]:
+        #전투 장면 프롬프트와 기본 장면(백업용) 구성 - DB 조회가 있으므로 호출 스레드에서 실행
         current_location = state.get("current_location", "알 수 없는 곳")
         battle_results = battle_data["battle_results"]
         total_damage_dealt = battle_data["total_damage_dealt"]
@@ -206,6 +202,31 @@ class BattleSystem:
         current_reputation = self._get_current_reputation(state)
         reputation_response = self.reputation_manager.get_reputation_response(current_reputation)
         
+        enemy = battle_data.get("enemy")
+        fallback_scene = self._generate_basic_battle_scene(
+            current_location, battle_participants, battle_summary,
+            enemy["name"] if enemy else None, enemy.get("outcome", "victory") if enemy else "victory"
+        )
+        
+        # 적이 정해진 경우 - 적 창조 없이 묘사만 요청하는 짧은 프롬프트
+        if enemy:
+            outcome = {
+                "victory": "적을 쓰러뜨림", "defeat": "파티가 전멸함"
+            }.get(enemy.get("outcome"), "적이 버티지 못하고 퇴각")
+            ending = BATTLE_OUTCOME_ENDINGS.get(enemy.get("outcome"), BATTLE_OUTCOME_ENDINGS["retreat"])
+            sys_prompt = f"""
+        "{current_location}"에서 {enemy['name']}({enemy['description']})과 싸웠습니다.
+        직전 상황: {recent_ai_messages[-1][:200] if recent_ai_messages else "없음"}
+        플레이어 명성: {reputation_response.level.value} - 적의 태도에 반영
+        전투 통계:
+        {chr(10).join(battle_summary)}
+        결과: {outcome}
+        
+        통계(피해, 크리티컬, 특수 기술, 쓰러짐)를 그대로 반영해 200-300자로 전투 장면을 묘사하세요.
+        마지막은 "{ending} 어떻게 하시겠어요?"로 마무리하세요.
+        """
+            return sys_prompt, fallback_scene
+        
         sys_prompt = f"""
         현재 위치 "{current_location}"에서 전투가 발생했습니다!
         
@@ -260,29 +281,75 @@ class BattleSystem:
         마지막에 "전투에서 승리했습니다! 어떻게 하시겠어요?"로 마무리하세요.
         """
         
+        return sys_prompt, fallback_scene
+    
+    def _invoke_battle_scene(self, sys_prompt: str) -> str:
+        #전투 장면 LLM 호출
+        response = self.llm.invoke([
+            SystemMessage(content=sys_prompt),
+            HumanMessage(content="현재 상황에 맞는 적과 전투 장면을 창조적으로 생성해주세요")
+        ])
+        return response.content
+    
+    def generate_dynamic_battle_scene(self, state: Dict, battle_data: Dict) -> str:
+        #동적 전투 장면 생성 (완료까지 대기)
+        sys_prompt, fallback_scene = self._build_battle_scene_prompt(state, battle_data)
+        
         try:
-            response = self.llm.invoke([
-                SystemMessage(content=sys_prompt),
-                HumanMessage(content="현재 상황에 맞는 적과 전투 장면을 창조적으로 생성해주세요")
-            ])
-            return response.content
+            return self._invoke_battle_scene(sys_prompt)
+            
+        except Exception as e:
+            print(f"전투 장면 생성 오류: {e}")
+            return fallback_scene
+    
+    def start_battle_narration(self, state: Dict, battle_data: Dict) -> BattleNarration:
+        #전투 장면 생성을 백그라운드로 시작 - 전투 결과 적용/통계 표시는 기다리지 않음
+        sys_prompt, fallback_scene = self._build_battle_scene_prompt(state, battle_data)
+        future = Future()
+        
+        def narrate():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self._invoke_battle_scene(sys_prompt))
+            except Exception as e:
+                future.set_exception(e)
+        
+        # 데몬 스레드 - 응답이 늦어도 게임 종료를 막지 않음
+        threading.Thread(target=narrate, name="battle-narration", daemon=True).start()
+        return BattleNarration(future=future, fallback_scene=fallback_scene, started_at=time.monotonic())
+    
+    def wait_battle_narration(self, narration: BattleNarration, budget: float = None) -> str:
+        #전투 장면 대기 - 시작 시점부터 지연 한도를 넘기면 기본 장면으로 대체
+        if budget is None:
+            budget = GAME_CONSTANTS["BATTLE_NARRATION_TIMEOUT"]
+        remaining = max(0.0, budget - (time.monotonic() - narration.started_at))
+        
+        try:
+            return narration.future.result(timeout=remaining)
+            
+        except FutureTimeoutError:
+            narration.future.cancel()
+            print(f"전투 장면 생성 지연 ({budget:g}초 초과) - 기본 장면 사용")
+            return narration.fallback_scene
             
         except Exception as e:
             print(f"전투 장면 생성 오류: {e}")
-            return self._generate_basic_battle_scene(current_location, battle_participants, battle_summary)
+            return narration.fallback_scene
     
-    def _generate_basic_battle_scene(self, location: str, participants: List[str], battle_summary: List[str]) -> str:
+    def _generate_basic_battle_scene(self, location: str, participants: List[str], battle_summary: List[str],
+                                     enemy_name: Optional[str] = None, outcome: str = "victory") -> str:
         #기본 전투 장면 생성 (백업용)
         return f"""
         **{location}에서 치열한 전투!**
 
-        갑작스럽게 나타난 적과 목숨을 건 전투를 벌였습니다!
+        갑작스럽게 나타난 {enemy_name or '적'}과 목숨을 건 전투를 벌였습니다!
         {', '.join(participants)}이 혼신의 힘을 다해 싸운 결과:
 
         **전투 결과**:
         {chr(10).join(battle_summary)}
 
-        피와 땀으로 얼룩진 치열한 혈투 끝에 승리했습니다! 어떻게 하시겠어요?
+        피와 땀으로 얼룩진 치열한 혈투 끝에 {BATTLE_OUTCOME_ENDINGS.get(outcome, BATTLE_OUTCOME_ENDINGS["victory"])} 어떻게 하시겠어요?
         """
     
     def _get_current_reputation(self, state: Dict) -> int:
@@ -291,9 +358,7 @@ class BattleSystem:
         player_id = state.get("main_story_player_id")
         
         if main_db and player_id:
-            player_data = main_db.get_character(player_id)
-            if player_data:
-                return player_data['reputation']
+            return main_db.get_reputation(player_id)
         
         return 0
     
@@ -303,34 +368,171 @@ class BattleSystem:
         critical_hits = len(battle_data["critical_hits"])
         special_actions = len(battle_data["special_actions"])
         
-        # 기본 보상
-        base_exp = 20 + (total_damage // 10)
-        base_gold = 10 + (total_damage // 20)
+        # 조우한 적의 보상 배율 (퇴각시키면 절반)
+        enemy = battle_data.get("enemy")
+        if enemy and enemy.get("outcome") == "defeat":
+            return {
+                "experience": 0,
+                "gold": 0,
+                "reputation_change": 0,
+                "reputation_reason": "전투 패배"
+            }
         
-        # 보너스 계산
-        critical_bonus = critical_hits * 5
-        special_bonus = special_actions * 3
+        enemy_multiplier = 1.0
+        if enemy:
+            enemy_multiplier = enemy["reward_multiplier"] * (1.0 if enemy.get("outcome") == "victory" else 0.5)
         
-        # 명성 보너스
         reputation = self._get_current_reputation(state)
-        reputation_multiplier = 1.0
-        if reputation >= 60:
-            reputation_multiplier = 1.5
-        elif reputation >= 20:
-            reputation_multiplier = 1.2
-        elif reputation <= -40:
-            reputation_multiplier = 0.8
-        
-        final_exp = int((base_exp + critical_bonus + special_bonus) * reputation_multiplier)
-        final_gold = int((base_gold + critical_bonus + special_bonus) * reputation_multiplier)
+        experience, gold, reputation_change = battle_reward_formula(
+            total_damage, critical_hits, special_actions, reputation, enemy_multiplier
+        )
         
         return {
-            "experience": final_exp,
-            "gold": final_gold,
-            "reputation_change": 2 if total_damage > 100 else 1,
+            "experience": experience,
+            "gold": gold,
+            "reputation_change": reputation_change,
             "reputation_reason": "전투 승리"
         }
     
+    def estimate_battle(self, party: List, n: int = 100_000, reputation: int = 0, location: str = "",
+                        solo: bool = False, seed: Optional[int] = None, main_db=None) -> Dict:
+        #몬테카를로 전투 결과 추정 (DB를 건드리지 않음) - 실제 전투와 같은 규칙으로 n번 진행
+        #n번의 전투마다 위치/명성에 맞는 적을 한 번에 추첨하고, 파티는 fight_trials(행동 순서, 최대 BATTLE_MAX_ROUNDS 라운드),
+        #솔로는 roll_trials(적 능력치를 반영한 한 번의 추첨)로 모든 전투를 배열 연산으로 함께 계산 - 보상은 calculate_battle_rewards와 같은 규칙(적 배율, 퇴각 절반, 패배 0)
+        #party: get_party_status 행(main_db 필요 - 실제 전투처럼 저장된 능력치의 전투 범위 캐시 사용)
+        #       또는 get_character 형식 dict 목록 (쓰러진 참가자는 제외)
+        #solo=True이면 첫 번째 참가자를 솔로 전투 범위로 계산
+        #seed를 주면 같은 결과를 재현 (없으면 세션의 추정 전용 스트림 사용 - 게임 전투/조우 스트림은 건드리지 않음)
+        members = self._estimate_members(party, main_db)
+        if solo:
+            members = members[:1]
+        if not members:
+            raise ValueError("추정할 전투 참가자가 없습니다")
+
+        estimate_rng = GameRNG(seed) if seed is not None else self.rng
+        engine = BattleEngine(estimate_rng.stream("battle_estimate"))
+        encounter_rng = estimate_rng.stream("encounter_estimate")
+
+        names = [m["name"] for m in members]
+        if solo:
+            combatants = CombatantArrays.from_ranges([0], names, [0], [0], [0], [SOLO_RANGES])
+        else:
+            combatants = CombatantArrays.from_ranges(
+                list(range(len(members))), names, [m["hp"] for m in members], [m["mp"] for m in members],
+                [m["max_mp"] for m in members], [m["profile"] for m in members]
+            )
+            party_side = SkirmishArrays.from_party(combatants, [m["agility"] for m in members])
+
+        count = len(members)
+        enemies = self.encounter_system.generate_batch(encounter_rng, location, reputation, n)
+        if solo:
+            rolls = engine.roll_trials(combatants, n, enemies["attack_bonus"], enemies["defense"])
+            damage_taken, damage_dealt = rolls.damage_taken, rolls.damage_dealt
+            critical, special = rolls.critical, rolls.special
+            alive = np.ones((n, count), dtype=bool)
+            rounds = None
+            winner = np.where(damage_dealt.sum(axis=1) >= enemies["hp"], PARTY_SIDE, NO_WINNER)
+        else:
+            skirmish = SkirmishArrays.join(party_side, SkirmishArrays.enemies(1, "적", 1)).tile(n)
+            skirmish.set_enemy(count, enemies["hp"], enemies["attack_bonus"], enemies["defense"])
+            result = engine.fight_trials(skirmish)
+            damage_taken, damage_dealt = result.damage_taken[:, :count], result.damage_dealt[:, :count]
+            critical, special = result.critical[:, :count], result.special[:, :count]
+            alive = result.alive[:, :count]
+            rounds = result.rounds
+            winner = result.winner
+
+        # 격파는 적 배율 그대로, 퇴각(라운드 제한/솔로 미격파)은 절반, 패배는 보상 없음
+        enemy_multiplier = enemies["reward_multiplier"] * np.select(
+            [winner == PARTY_SIDE, winner == ENEMY_SIDE], [1.0, 0.0], default=0.5
+        )
+        outcomes = {
+            "victory": float((winner == PARTY_SIDE).mean()),
+            "retreat": float((winner == NO_WINNER).mean()),
+            "defeat": float((winner == ENEMY_SIDE).mean())
+        }
+
+        total_damage = damage_dealt.sum(axis=1)
+        experience, gold, reputation_change = battle_reward_formula(
+            total_damage, critical.sum(axis=1), special.sum(axis=1), reputation, enemy_multiplier
+        )
+        reputation_change = np.where(enemy_multiplier > 0, reputation_change, 0)
+
+        member_stats = []
+        for i, name in enumerate(names):
+            member_stats.append({
+                "name": name,
+                "damage_taken": self._distribution(damage_taken[:, i]),
+                "damage_dealt": self._distribution(damage_dealt[:, i]),
+                "ko_probability": float(1.0 - alive[:, i].mean()),
+                "critical_rate": float(critical[:, i].mean()),
+                "special_rate": float(special[:, i].mean())
+            })
+
+        return {
+            "trials": n,
+            "battle_type": "solo" if solo else "party",
+            "location": location,
+            "outcomes": outcomes,
+            "rounds": None if rounds is None else self._distribution(rounds),
+            "total_damage_dealt": self._distribution(total_damage),
+            "members": member_stats,
+            "wipe_probability": float((~alive.any(axis=1)).mean()),
+            "expected_experience": float(experience.mean()),
+            "expected_gold": float(gold.mean()),
+            "experience": self._distribution(experience),
+            "gold": self._distribution(gold),
+            "expected_reputation_change": float(reputation_change.mean())
+        }
+
+    def _estimate_members(self, party: List, main_db=None) -> List[Dict]:
+        #추정용 참가자 정보 정규화 - 실제 전투처럼 쓰러진 참가자는 제외
+        rows = [member for member in party if not isinstance(member, dict)]
+        if rows and main_db is None:
+            raise ValueError("파티 상태 행으로 추정하려면 main_db가 필요합니다")
+
+        row_ids = [row[0] for row in rows if row[7]]
+        ranges = dict(zip(row_ids, self.combat_profiles.get_ranges(main_db, row_ids))) if row_ids else {}
+        agility = dict(zip(row_ids, self.combat_profiles.get_agility(main_db, row_ids))) if row_ids else {}
+
+        members = []
+        for member in party:
+            if isinstance(member, dict):
+                if not member.get("is_alive", True):
+                    continue
+                mp = member.get("mp", 50)
+                members.append({
+                    "name": member["name"],
+                    "hp": member.get("hp", 100),
+                    "mp": mp,
+                    "max_mp": member.get("max_mp", mp),
+                    "agility": member.get("agility") or COMBAT_STAT_BASELINE,
+                    "profile": compute_combat_profile(
+                        member.get("class") or member["name"], member.get("level", 1),
+                        member.get("strength"), member.get("agility"), member.get("intelligence")
+                    )
+                })
+                continue
+            char_id, name, char_type, hp, max_hp, mp, max_mp, is_alive, relationship, reputation, gold = member
+            if not is_alive:
+                continue
+            members.append({"name": name, "hp": hp, "mp": mp, "max_mp": max_mp,
+                            "agility": agility[char_id], "profile": ranges[char_id]})
+        return members
+
+    def _distribution(self, values: np.ndarray) -> Dict:
+        #분포 요약 (평균, 표준편차, 최소/최대, 백분위)
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        return {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": int(values.min()),
+            "p5": float(p5),
+            "p50": float(p50),
+            "p95": float(p95),
+            "max": int(values.max())
+        }
+
     def apply_battle_consequences(self, state: Dict, battle_data: Dict) -> Dict:
         #전투 결과 적용
         main_db = state.get("main_story_db")
@@ -342,10 +544,8 @@ class BattleSystem:
         # 보상 계산
         rewards = self.calculate_battle_rewards(battle_data, state)
         
-        # 골드 업데이트
-        current_gold = state.get("player_gold", 0)
-        new_gold = current_gold + rewards["gold"]
-        state["player_gold"] = new_gold
+        # 골드 업데이트 (DB가 기준 - 상점 구매도 DB 골드로 확인)
+        state["player_gold"] = main_db.update_gold(player_id, rewards["gold"])
         
         # 명성 업데이트
         main_db.update_reputation(
@@ -355,11 +555,20 @@ class BattleSystem:
             state.get("current_location", "전투지역")
         )
         
+        # 조우한 적 기록
+        enemy = battle_data.get("enemy")
+        if enemy:
+            main_db.record_encounter(
+                player_id, enemy, battle_data["total_damage_dealt"], len(state.get("messages", []))
+            )
+        
         # 전투 이벤트 기록
+        enemy_label = f"{enemy['name']} 상대 " if enemy else ""
+        defeated = bool(enemy) and enemy.get("outcome") == "defeat"
         main_db.add_story_event(
             player_id,
-            "battle_victory",
-            f"전투 승리 - 총 데미지: {battle_data['total_damage_dealt']}",
+            "battle_defeat" if defeated else "battle_victory",
+            f"{enemy_label}{'전투 패배' if defeated else '전투 승리'} - 총 데미지: {battle_data['total_damage_dealt']}",
             state.get("current_location", "전투지역"),
             len(state.get("messages", [])),
             rewards["reputation_change"],
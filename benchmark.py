@@ -0,0 +1,217 @@
+#성능 벤치마크 스크립트
+#핫 패스(라운드 전투, 명성 등급 조회 등)의 실행 시간을 측정해 출력
+#사용법: python benchmark.py [--repeat 200]
+
+import argparse
+import time
+import numpy as np
+
+from battle_engine import BattleEngine, SkirmishArrays, PARTY_RANGES, PARTY_SIDE, ENEMY_SIDE
+from models import ReputationLevel, ReputationResponse, REPUTATION_THRESHOLDS
+from reputation_system import ReputationManager
+from database import MainStoryDB
+from inventory_system import InventorySystem
+
+
+class _NoLLM:
+    #벤치마크용 - LLM을 생성하지 않기 위한 자리표시자
+    def invoke(self, messages):
+        raise RuntimeError("벤치마크에서는 LLM을 호출하지 않습니다")
+
+
+def _measure(func, repeat: int) -> float:
+    #func를 repeat번 실행한 1회 평균 시간(ms)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def bench_skirmish(size: int, repeat: int, seed: int = 0) -> tuple:
+    #size 대 size 라운드 전투 - (전투 1회 평균 ms, 라운드 1회 평균 ms)
+    engine = BattleEngine(np.random.default_rng(seed))
+    skirmish = SkirmishArrays.join(
+        SkirmishArrays.uniform(size, PARTY_SIDE, PARTY_RANGES["기본"], hp=100, agility=12),
+        SkirmishArrays.uniform(size, ENEMY_SIDE, PARTY_RANGES["기본"], hp=100, defense=2)
+    )
+    rounds = []
+    per_fight = _measure(lambda: rounds.append(engine.fight(skirmish, max_rounds=100).rounds), repeat)
+    return per_fight, per_fight * len(rounds) / sum(rounds)
+
+
+class _IfElifReputation:
+    #비교 기준 - 등급표 조회 이전의 명성 경로 (if/elif 등급 판정, 호출마다 설정 dict 재생성)
+
+    def get_reputation_level(self, reputation: int) -> ReputationLevel:
+        if reputation >= REPUTATION_THRESHOLDS[ReputationLevel.HEROIC]:
+            return ReputationLevel.HEROIC
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.VERY_FRIENDLY]:
+            return ReputationLevel.VERY_FRIENDLY
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.FRIENDLY]:
+            return ReputationLevel.FRIENDLY
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.NEUTRAL]:
+            return ReputationLevel.NEUTRAL
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.SLIGHTLY_HOSTILE]:
+            return ReputationLevel.SLIGHTLY_HOSTILE
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.HOSTILE]:
+            return ReputationLevel.HOSTILE
+        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.VERY_HOSTILE]:
+            return ReputationLevel.VERY_HOSTILE
+        else:
+            return ReputationLevel.ENEMY
+
+    def get_reputation_response(self, reputation: int, npc_name: str = "NPC", location: str = "마을") -> ReputationResponse:
+        level = self.get_reputation_level(reputation)
+        response_configs = {
+            ReputationLevel.HEROIC: {
+                "greeting": f"영웅님! {npc_name}입니다. 당신의 명성은 온 대륙에 울려 퍼지고 있습니다!",
+                "tone": "극도로 존경스럽고 경외심 가득한", "willingness_to_help": 1.0, "price_modifier": 0.5,
+                "special_actions": ["무료_서비스", "특별_정보_제공", "귀중한_선물"]
+            },
+            ReputationLevel.VERY_FRIENDLY: {
+                "greeting": f"오, {npc_name}입니다! 당신의 업적은 정말 훌륭합니다!",
+                "tone": "매우 친근하고 호의적인", "willingness_to_help": 0.9, "price_modifier": 0.7,
+                "special_actions": ["할인_제공", "추가_정보", "친절한_조언"]
+            },
+            ReputationLevel.FRIENDLY: {
+                "greeting": f"안녕하세요! {npc_name}입니다. 좋은 평판을 들었습니다.",
+                "tone": "친근하고 협조적인", "willingness_to_help": 0.8, "price_modifier": 0.9,
+                "special_actions": ["약간_할인", "기본_정보_제공"]
+            },
+            ReputationLevel.NEUTRAL: {
+                "greeting": f"안녕하세요. {npc_name}입니다.",
+                "tone": "평범하고 중립적인", "willingness_to_help": 0.6, "price_modifier": 1.0,
+                "special_actions": ["기본_서비스"]
+            },
+            ReputationLevel.SLIGHTLY_HOSTILE: {
+                "greeting": f"음... {npc_name}입니다. 당신에 대한 이야기를 들었는데...",
+                "tone": "약간 경계하는", "willingness_to_help": 0.4, "price_modifier": 1.2,
+                "special_actions": ["정보_제한", "경계"]
+            },
+            ReputationLevel.HOSTILE: {
+                "greeting": f"흥! {npc_name}다. 당신 같은 자와는 거래하기 싫지만...",
+                "tone": "적대적이고 불쾌한", "willingness_to_help": 0.2, "price_modifier": 1.5,
+                "special_actions": ["높은_가격", "무례한_태도", "정보_거부"]
+            },
+            ReputationLevel.VERY_HOSTILE: {
+                "greeting": f"당신이... {npc_name}은 당신을 경계하고 있습니다.",
+                "tone": "매우 적대적이고 두려워하는", "willingness_to_help": 0.1, "price_modifier": 2.0,
+                "special_actions": ["서비스_거부", "도망_시도", "경비_호출"]
+            },
+            ReputationLevel.ENEMY: {
+                "greeting": f"감히 여기에 나타나다니! {npc_name}이 당신을 용서하지 않겠다!",
+                "tone": "극도로 적대적이고 공격적인", "willingness_to_help": 0.0, "price_modifier": 3.0,
+                "special_actions": ["전투_시작", "도망", "경비_호출", "위협"]
+            }
+        }
+        config = response_configs[level]
+        return ReputationResponse(
+            level=level, greeting=config["greeting"], tone=config["tone"],
+            willingness_to_help=config["willingness_to_help"], price_modifier=config["price_modifier"],
+            special_actions=config["special_actions"]
+        )
+
+    def get_reputation_status_message(self, reputation: int) -> str:
+        level = self.get_reputation_level(reputation)
+        status_messages = {
+            ReputationLevel.HEROIC: f"🌟 영웅 ({reputation}) - 모든 이들이 당신을 경외합니다!",
+            ReputationLevel.VERY_FRIENDLY: f"😊 매우 호의적 ({reputation}) - 사람들이 당신을 매우 좋아합니다!",
+            ReputationLevel.FRIENDLY: f"🙂 호의적 ({reputation}) - 사람들이 당신을 좋아합니다.",
+            ReputationLevel.NEUTRAL: f"😐 평범 ({reputation}) - 보통의 평판입니다.",
+            ReputationLevel.SLIGHTLY_HOSTILE: f"😕 약간 비호의적 ({reputation}) - 사람들이 당신을 경계합니다.",
+            ReputationLevel.HOSTILE: f"😠 적대적 ({reputation}) - 사람들이 당신을 싫어합니다.",
+            ReputationLevel.VERY_HOSTILE: f"😨 매우 적대적 ({reputation}) - 사람들이 당신을 무서워합니다!",
+            ReputationLevel.ENEMY: f"💀 원수 ({reputation}) - 사람들이 당신을 증오합니다!"
+        }
+        return status_messages[level]
+
+    def apply_reputation_to_price(self, base_price: int, reputation: int) -> int:
+        return max(1, int(base_price * self.get_reputation_response(reputation).price_modifier))
+
+    def can_access_service(self, reputation: int, service_type: str) -> bool:
+        level = self.get_reputation_level(reputation)
+        service_requirements = {
+            "기본_상점": ReputationLevel.VERY_HOSTILE,
+            "특별_아이템": ReputationLevel.FRIENDLY,
+            "고급_서비스": ReputationLevel.VERY_FRIENDLY,
+            "영웅_전용": ReputationLevel.HEROIC,
+            "정보_수집": ReputationLevel.NEUTRAL,
+            "퀘스트_수주": ReputationLevel.SLIGHTLY_HOSTILE
+        }
+        required_level = service_requirements.get(service_type, ReputationLevel.NEUTRAL)
+        player_level_value = list(REPUTATION_THRESHOLDS.keys()).index(level)
+        required_level_value = list(REPUTATION_THRESHOLDS.keys()).index(required_level)
+        return player_level_value <= required_level_value
+
+
+def bench_reputation(repeat: int) -> dict:
+    #명성 등급 조회 - 명성 -100~100 전체에 대한 호출 1회 평균 시간(μs)
+    #항목별 (등급표 조회, 이전 if/elif 경로) - 두 경로의 결과가 같은지 먼저 확인
+    reputations = range(-100, 101)
+
+    def calls(manager) -> dict:
+        return {
+            "등급": lambda rep: manager.get_reputation_level(rep),
+            "응답": lambda rep: manager.get_reputation_response(rep),
+            "가격": lambda rep: manager.apply_reputation_to_price(100, rep),
+            "서비스": lambda rep: manager.can_access_service(rep, "특별_아이템"),
+            "상태": lambda rep: manager.get_reputation_status_message(rep)
+        }
+
+    current, baseline = calls(ReputationManager(llm=_NoLLM())), calls(_IfElifReputation())
+    for name, call in current.items():
+        for rep in reputations:
+            new, old = call(rep), baseline[name](rep)
+            if name == "응답":
+                new, old = (new.level, new.greeting, new.price_modifier), (old.level, old.greeting, old.price_modifier)
+            assert new == old, (name, rep, new, old)
+
+    per_call = lambda call: _measure(lambda: [call(rep) for rep in reputations], repeat) * 1000 / len(reputations)
+    return {name: (per_call(call), per_call(baseline[name])) for name, call in current.items()}
+
+
+def bench_inventory_display(repeat: int) -> tuple:
+    #인벤토리 화면 - (변경 후 첫 표시 ms, 변경 없는 반복 표시 ms, 반복 표시 1회의 SQL 문 수)
+    main_db = MainStoryDB(":memory:")
+    player_id = main_db.create_character({"name": "벤치 용사", "type": "player", "is_in_party": True})
+    for name in ("벤치 마법사", "벤치 성직자"):
+        main_db.create_character({"name": name, "type": "companion", "is_in_party": True})
+    main_db.add_items(player_id, [(f"아이템 {i}", f"type_{i % 5}", 1, "", i) for i in range(30)])
+    inventory_system = InventorySystem(llm=_NoLLM())
+    state = {"main_story_db": main_db, "main_story_player_id": player_id, "player_gold": 300}
+
+    def changed():
+        main_db.heal_character(player_id, 0, 0)
+        inventory_system.get_inventory_display(state)
+
+    cold = _measure(changed, repeat)
+    warm = _measure(lambda: inventory_system.get_inventory_display(state), repeat)
+    statements = []
+    main_db.conn.set_trace_callback(statements.append)
+    inventory_system.get_inventory_display(state)
+    main_db.conn.set_trace_callback(None)
+    main_db.close()
+    return cold, warm, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="성능 벤치마크")
+    parser.add_argument("--repeat", type=int, default=200, help="항목별 반복 횟수")
+    args = parser.parse_args()
+
+    # 라운드 전투 - 진영 크기에 따라 라운드당 비용이 선형으로 늘어나는지 확인
+    for size in (3, 10, 50, 100):
+        per_fight, per_round = bench_skirmish(size, args.repeat)
+        print(f"라운드 전투 {size} vs {size}: {per_fight:.3f} ms/전투, {per_round:.3f} ms/라운드")
+
+    # 명성 등급 조회 - 상점 목록/명성 확인에서 호출마다 쓰이는 경로
+    for name, (micros, baseline) in bench_reputation(args.repeat).items():
+        print(f"명성 {name} 조회: {micros:.3f} μs/호출 (이전 if/elif {baseline:.3f} μs, {baseline / micros:.1f}배)")
+
+    # 인벤토리 화면 - 물약/힐 후마다 다시 그리는 경로
+    cold, warm, statements = bench_inventory_display(args.repeat)
+    print(f"인벤토리 화면: 변경 후 {cold:.3f} ms, 반복 {warm * 1000:.3f} μs (SQL {statements}회)")
+
+
+if __name__ == "__main__":
+    main()
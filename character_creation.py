@@ -7,6 +7,7 @@ from typing import Dict, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from models import Player
+from item_catalog import starting_items
 
 class CharacterCreator:
     #캐릭터 생성 관리 클래스
@@ -176,42 +177,7 @@ class CharacterCreator:
     
     def generate_starting_items(self, character_data: Dict) -> list:
         #직업에 따른 초기 아이템 생성
-        job = character_data.get("직업", "전사")
-        
-        starting_items = {
-            "전사": [
-                {"name": "철검", "type": "weapon", "description": "견고한 철로 만든 검"},
-                {"name": "가죽 갑옷", "type": "armor", "description": "기본적인 방어구"},
-                {"name": "나무 방패", "type": "shield", "description": "튼튼한 나무 방패"},
-                {"name": "체력 물약", "type": "potion", "description": "HP 50 회복", "quantity": 3}
-            ],
-            "마법사": [
-                {"name": "마법 지팡이", "type": "weapon", "description": "마법력을 증폭시키는 지팡이"},
-                {"name": "마법사 로브", "type": "armor", "description": "마법 방어력을 제공하는 로브"},
-                {"name": "마법서: 파이어볼", "type": "spellbook", "description": "화염 마법서"},
-                {"name": "마나 물약", "type": "potion", "description": "MP 30 회복", "quantity": 5}
-            ],
-            "도적": [
-                {"name": "단검", "type": "weapon", "description": "날카로운 단검"},
-                {"name": "가죽 갑옷", "type": "armor", "description": "조용한 가죽 갑옷"},
-                {"name": "도구 세트", "type": "tool", "description": "자물쇠 따개와 각종 도구"},
-                {"name": "독 바르기", "type": "consumable", "description": "무기에 독을 바르는 도구"}
-            ],
-            "궁수": [
-                {"name": "장궁", "type": "weapon", "description": "정확한 장거리 활"},
-                {"name": "화살통", "type": "ammunition", "description": "화살 30발", "quantity": 30},
-                {"name": "가죽 갑옷", "type": "armor", "description": "가벼운 가죽 갑옷"},
-                {"name": "체력 물약", "type": "potion", "description": "HP 50 회복", "quantity": 2}
-            ],
-            "성직자": [
-                {"name": "성스러운 지팡이", "type": "weapon", "description": "치유 마법이 깃든 지팡이"},
-                {"name": "성직자 로브", "type": "armor", "description": "신성한 힘을 담은 로브"},
-                {"name": "성수", "type": "consumable", "description": "언데드에게 효과적", "quantity": 3},
-                {"name": "치유 물약", "type": "potion", "description": "HP 80 회복", "quantity": 4}
-            ]
-        }
-        
-        return starting_items.get(job, starting_items["전사"])
+        return starting_items(character_data.get("직업", "전사"))
     
 
     def create_player_object(self, character_data: Dict, starting_location: str, backstory: str, stats: Dict, items: list) -> Player:
@@ -3,19 +3,95 @@
 
 import sqlite3
 import os
+import itertools
+import time
+import weakref
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
 from datetime import datetime
-from models import Player, NPC, Item
+from models import Player, NPC, Item, ItemDefinition, GAME_CONSTANTS
+from item_catalog import ITEM_DEFINITIONS, legacy_item_name, normalize_item_type
+from regional_reputation import ReputationMatrix, region_for_location, local_standing
+
+# 능력치 버전 세대 번호 (DB 인스턴스/복원/초기화마다 새 값 - 캐시 키 충돌 방지)
+_stats_epochs = itertools.count(1)
+
+# update_character_stats로 변경 가능한 능력치 컬럼
+CHARACTER_STAT_COLUMNS = ("class", "level", "max_hp", "max_mp", "strength", "agility", "intelligence")
+
+
+# 명성 시계열 해상도 -> 버킷 길이(초) (세션은 세션 번호로 버킷을 나눔)
+REPUTATION_SERIES_RESOLUTIONS = {"hour": 3600, "day": 86400, "session": None}
+
+
+def downsample_series(series: List[Tuple], points: Optional[int]) -> List[Tuple]:
+    #(bucket, min, max, last, changes) 시계열을 연속 버킷끼리 합쳐 points개 이하로 줄임
+    if not points or len(series) <= points:
+        return series
+    size = -(-len(series) // points)
+    merged = []
+    for start in range(0, len(series), size):
+        group = series[start:start + size]
+        merged.append((
+            group[0][0],
+            min(row[1] for row in group),
+            max(row[2] for row in group),
+            group[-1][3],
+            sum(row[4] for row in group)
+        ))
+    return merged
+
+
+def decayed_reputation(reputation: int, elapsed: float, half_life: Optional[float]) -> int:
+    #저장된 명성이 elapsed초 동안 중립(0)으로 감쇠한 값 (반감기 half_life초, 없으면 감쇠 없음)
+    if not half_life or not reputation or elapsed <= 0:
+        return reputation
+    return int(round(reputation * 0.5 ** (elapsed / half_life)))
 
 class MainStoryDB:
     #메인스토리 데이터베이스 클래스
 
-    def __init__(self, db_path: str = "main_story.db"):
+    def __init__(self, db_path: str = "main_story.db",
+                 reputation_half_life: Optional[float] = GAME_CONSTANTS["REPUTATION_HALF_LIFE_HOURS"] * 3600):
         #데이터베이스 초기화
+        #reputation_half_life: 명성 감쇠 반감기(게임 시간 초), None이면 감쇠 없음
         self.db_path = db_path
+        self.reputation_half_life = reputation_half_life
+        # 게임 시계 - 턴마다 advance_clock으로 진행하고 저장 상태(game_time)에 보관 (게임 밖의 실제 시간은 흐르지 않음)
+        self.game_time = 0.0
         self.conn = sqlite3.connect(db_path)
         self.conn.execute("PRAGMA foreign_keys = ON")
+        # 명성 감쇠는 조회 시 (값, 마지막 변경 시각)으로 계산 - 주기적인 전체 갱신 없음
+        # (연결이 DB 객체를 강하게 참조하지 않도록 약한 참조 사용 - 참조 순환 방지)
+        owner = weakref.ref(self)
+        self.conn.create_function(
+            "decayed_reputation", 2, lambda reputation, updated_at: owner()._decayed_reputation(reputation, updated_at)
+        )
         self._create_tables()
+        self.game_time = self._latest_timestamp()
+        
+        # 캐릭터별 능력치 버전 (전투 프로필 캐시 무효화용, 메모리에만 유지)
+        self._stats_epoch = next(_stats_epochs)
+        self._stats_versions: Dict[int, int] = {}
+        
+        # 파티/인벤토리 뷰 - 조회 결과를 (버전, 행)으로 보관하고 쓰기 경로에서만 버전을 올려 무효화
+        # (같은 버전이면 SQL 없이 재사용, 감쇠/이번 턴 명성은 조회할 때마다 반영)
+        self._party_version = 0
+        self._inventory_versions: Dict[int, int] = {}
+        self._party_view: Optional[Tuple[int, List[Tuple]]] = None
+        self._inventory_views: Dict[int, Tuple[int, List[Tuple]]] = {}
+        
+        # 턴 단위 명성 누적 (begin_reputation_turn ~ flush_reputation 사이의 변화는 메모리에만 반영)
+        self._reputation_deferred = False
+        self._pending_reputation: Dict[int, Dict] = {}  # char_id -> {"old", "value", "changes"}
+        
+        # 지역별 명성 행렬 (처음 조회할 때 regional_reputation 테이블에서 한 번 적재)
+        self._regional = ReputationMatrix()
+        self._regional_loaded = False
+        self._pending_regional: Dict[Tuple[int, str], int] = {}  # (char_id, 지역) -> 이번 턴 지역 명성
+        
+        # 명성 시계열의 이번 세션 번호 (처음 기록할 때 이전 세션 다음 번호로 정함)
+        self._series_session: Optional[int] = None
 
     def _create_tables(self):
         #테이블 생성
@@ -45,25 +121,36 @@ class MainStoryDB:
             gold INTEGER DEFAULT 300,
             backstory TEXT,
             created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            reputation_updated_at REAL -- 명성을 마지막으로 기록한 게임 시계 (감쇠 기준)
         )
         ''')
 
-        # 인벤토리 테이블
+        # 아이템 카탈로그 테이블 (item_catalog.ITEM_DEFINITIONS로 채우고 메모리에 한 번 적재)
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            player_id INTEGER NOT NULL,
-            item_name TEXT NOT NULL,
-            item_type TEXT NOT NULL,
-            quantity INTEGER DEFAULT 1,
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL,
             description TEXT,
             value INTEGER DEFAULT 0,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (player_id) REFERENCES main_story_characters (id)
+            hp_effect INTEGER DEFAULT 0,
+            mp_effect INTEGER DEFAULT 0
         )
         ''')
         
+        # 인벤토리 테이블 (아이템 정보는 items 참조 - 플레이어별 아이템 id와 수량만)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            player_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (player_id, item_id),
+            FOREIGN KEY (player_id) REFERENCES main_story_characters (id),
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        ) WITHOUT ROWID
+        ''')
+        
         # 스토리 이벤트 테이블
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS story_events (
@@ -110,9 +197,192 @@ class MainStoryDB:
             FOREIGN KEY (player_id) REFERENCES main_story_characters (id)
         )
         ''')
+        
+        # 지역별 명성 테이블 (플레이어 x 지역)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS regional_reputation (
+            player_id INTEGER NOT NULL,
+            region TEXT NOT NULL,
+            reputation INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL, -- 게임 시계 (감쇠 기준)
+            PRIMARY KEY (player_id, region),
+            FOREIGN KEY (player_id) REFERENCES main_story_characters (id)
+        ) WITHOUT ROWID
+        ''')
+        
+        # 명성 시계열 테이블 (시간/일/세션 버킷별 최저/최고/마지막 명성 - 명성 변화마다 증분 갱신)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reputation_series (
+            player_id INTEGER NOT NULL,
+            resolution TEXT NOT NULL, -- 'hour', 'day' or 'session'
+            bucket INTEGER NOT NULL, -- 버킷 시작 unix time (세션은 세션 번호)
+            min_reputation INTEGER NOT NULL,
+            max_reputation INTEGER NOT NULL,
+            last_reputation INTEGER NOT NULL,
+            changes INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (player_id, resolution, bucket),
+            FOREIGN KEY (player_id) REFERENCES main_story_characters (id)
+        ) WITHOUT ROWID
+        ''')
+        
+        # 상점 재고 테이블 (상점 지역별 아이템 재고 - restock_at이 지나면 조회/구매 시 최대치로 보충)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS shop_stock (
+            location TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            stock INTEGER NOT NULL CHECK (stock >= 0),
+            max_stock INTEGER NOT NULL,
+            restock_at REAL NOT NULL, -- 게임 시계
+            PRIMARY KEY (location, item_name)
+        ) WITHOUT ROWID
+        ''')
+        
+        # 조우한 적 기록 테이블
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS encounters (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL,
+            enemy_name TEXT NOT NULL,
+            description TEXT,
+            enemy_hp INTEGER,
+            attack_bonus INTEGER,
+            defense INTEGER,
+            reputation_band TEXT,
+            location TEXT,
+            total_damage INTEGER,
+            outcome TEXT, -- 'victory' or 'retreat'
+            turn_number INTEGER,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (player_id) REFERENCES main_story_characters (id)
+        )
+        ''')
 
         self.conn.commit()
 
+        self._load_item_catalog()
+        self._migrate_inventory()
+        self._ensure_reputation_timestamp()
+
+    def clock(self) -> float:
+        #명성 감쇠, 상점 재고 보충, 명성 시계열의 시각 기준 (인스턴스 속성으로 바꿔 다른 시계 사용 가능)
+        return self.game_time
+
+    def advance_clock(self, seconds: float = GAME_CONSTANTS["GAME_TURN_SECONDS"]):
+        #턴 경계에서 게임 시계 진행
+        self.game_time += seconds
+
+    def _latest_timestamp(self) -> float:
+        #DB에 기록된 가장 늦은 명성 시각 - 저장된 게임 시계가 없을 때(새 DB, 이전 버전 저장) 여기서 이어서 진행
+        #이전 버전 DB의 실제 시각 기록도 마지막 기록 시점부터 이어지므로 게임을 하지 않은 기간은 감쇠하지 않음
+        row = self.conn.execute('''
+            SELECT MAX(latest) FROM (
+                SELECT MAX(reputation_updated_at) AS latest FROM main_story_characters
+                UNION ALL SELECT MAX(updated_at) FROM regional_reputation
+                UNION ALL SELECT MAX(updated_at) FROM reputation_series
+            )
+        ''').fetchone()
+        return float(row[0]) if row[0] is not None else 0.0
+
+    def _ensure_reputation_timestamp(self):
+        #이전 DB에 명성 기록 시각 컬럼 추가 - 기존 캐릭터는 마지막 수정 시각부터 감쇠 (이전 DB의 기록은 실제 시각)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(main_story_characters)")]
+        if "reputation_updated_at" in columns:
+            return
+
+        with self.conn:
+            self.conn.execute("ALTER TABLE main_story_characters ADD COLUMN reputation_updated_at REAL")
+            self.conn.execute('''
+                UPDATE main_story_characters
+                SET reputation_updated_at = COALESCE(CAST(strftime('%s', updated_at) AS REAL), ?)
+            ''', (time.time(),))
+
+    def _decayed_reputation(self, reputation: Optional[int], updated_at: Optional[float]) -> Optional[int]:
+        #SQL 함수 decayed_reputation(reputation, reputation_updated_at) - 현재 시각 기준 감쇠한 명성
+        if reputation is None or updated_at is None:
+            return reputation
+        return decayed_reputation(reputation, self.clock() - updated_at, self.reputation_half_life)
+
+    def _load_item_catalog(self):
+        #카탈로그 정의를 items 테이블에 반영하고 (id -> 정의), (이름 -> id)를 메모리에 적재
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO items (name, type, description, value, hp_effect, mp_effect)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    type = excluded.type,
+                    description = excluded.description,
+                    value = excluded.value,
+                    hp_effect = excluded.hp_effect,
+                    mp_effect = excluded.mp_effect
+            ''', [(item.name, item.type, item.description, item.value, item.hp_effect, item.mp_effect)
+                  for item in ITEM_DEFINITIONS])
+        
+        self._items: Dict[int, ItemDefinition] = {}
+        self._item_ids: Dict[str, int] = {}
+        for item_id, name, item_type, description, value, hp_effect, mp_effect in self.conn.execute(
+            "SELECT id, name, type, description, value, hp_effect, mp_effect FROM items"
+        ):
+            self._items[item_id] = ItemDefinition(name, item_type, description or "", value or 0,
+                                                  hp_effect or 0, mp_effect or 0)
+            self._item_ids[name] = item_id
+
+    def _migrate_inventory(self):
+        #이전 DB의 인벤토리(행마다 이름/타입/설명)를 (player_id, item_id, quantity)로 변환
+        #카탈로그에 없는 아이템은 카탈로그에 추가하고, 같은 아이템의 중복 행은 수량을 합침
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(inventory)")]
+        if "item_name" not in columns:
+            return
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute("BEGIN")  # 테이블 교체(DDL)까지 한 트랜잭션으로
+            rows = cursor.execute('''
+                SELECT player_id, item_name, item_type, SUM(quantity), MAX(description), MAX(value)
+                FROM inventory
+                WHERE quantity > 0 AND player_id IN (SELECT id FROM main_story_characters)
+                GROUP BY player_id, item_name, item_type
+            ''').fetchall()
+            quantities: Dict[Tuple[int, int], int] = {}
+            for player_id, item_name, item_type, quantity, description, value in rows:
+                item_id = self._item_id(cursor, legacy_item_name(item_name, item_type), item_type,
+                                        description or "", value or 0)
+                quantities[(player_id, item_id)] = quantities.get((player_id, item_id), 0) + quantity
+
+            cursor.execute("DROP TABLE inventory")
+            cursor.execute('''
+                CREATE TABLE inventory (
+                    player_id INTEGER NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    quantity INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (player_id, item_id),
+                    FOREIGN KEY (player_id) REFERENCES main_story_characters (id),
+                    FOREIGN KEY (item_id) REFERENCES items (id)
+                ) WITHOUT ROWID
+            ''')
+            cursor.executemany(
+                "INSERT INTO inventory (player_id, item_id, quantity) VALUES (?, ?, ?)",
+                [(player_id, item_id, quantity) for (player_id, item_id), quantity in quantities.items()]
+            )
+
+    def _item_id(self, cursor, item_name: str, item_type: str, description: str = "", value: int = 0) -> int:
+        #아이템명의 카탈로그 id - 카탈로그에 없는 아이템이면 추가 (커밋은 호출한 쪽에서)
+        item_id = self._item_ids.get(item_name)
+        if item_id is not None:
+            return item_id
+        item = ItemDefinition(item_name, normalize_item_type(item_name, item_type), description or "", value or 0)
+        cursor.execute('''
+            INSERT INTO items (name, type, description, value) VALUES (?, ?, ?, ?)
+        ''', (item.name, item.type, item.description, item.value))
+        item_id = cursor.lastrowid
+        self._items[item_id] = item
+        self._item_ids[item_name] = item_id
+        return item_id
+
+    def get_item(self, item_id: int) -> Optional[ItemDefinition]:
+        #아이템 id의 카탈로그 정의 (메모리 조회)
+        return self._items.get(item_id)
+
     def create_character(self, char_data: Dict) -> int:
         #캐릭터 생성
         cursor = self.conn.cursor()
@@ -121,8 +391,8 @@ class MainStoryDB:
             INSERT INTO main_story_characters
             (name, type, race, class, level, hp, max_hp, mp, max_mp,
              strength, agility, intelligence, current_location, is_alive,
-             is_in_party, relationship_level, reputation, gold, backstory)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             is_in_party, relationship_level, reputation, gold, backstory, reputation_updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             char_data['name'], char_data['type'], char_data.get('race', '인간'),
             char_data.get('class', '전사'), char_data.get('level', 1),
@@ -132,10 +402,11 @@ class MainStoryDB:
             char_data.get('intelligence', 10), char_data.get('current_location', '마을'),
             char_data.get('is_alive', True), char_data.get('is_in_party', False),
             char_data.get('relationship_level', 0), char_data.get('reputation', 0),
-            char_data.get('gold', 300), char_data.get('backstory', '')
+            char_data.get('gold', 300), char_data.get('backstory', ''), self.clock()
         ))
         
         self.conn.commit()
+        self._touch_party()
         return cursor.lastrowid
     
     def get_character(self, char_id: int) -> Optional[Dict]:
@@ -148,21 +419,121 @@ class MainStoryDB:
         result = cursor.fetchone()
         if result:
             columns = [desc[0] for desc in cursor.description]
-            return dict(zip(columns, result))
+            character = dict(zip(columns, result))
+            if char_id in self._pending_reputation:
+                character["reputation"] = self._pending_reputation[char_id]["value"]
+            else:
+                character["reputation"] = self._decayed_reputation(
+                    character["reputation"], character.get("reputation_updated_at")
+                )
+            return character
         return None
     
     def get_party_status(self) -> List[Tuple]:
-        #파티 상태 조회
+        #파티 상태 조회 (파티 뷰가 최신이면 SQL 없이 반환)
+        rows = [
+            row[:9] + (self._decayed_reputation(row[9], row[11]), row[10])
+            for row in self._party_rows()
+        ]
+        return self._with_pending_reputation(rows, 9)
+    
+    def _party_rows(self) -> List[Tuple]:
+        #파티 뷰 원본 행 - 명성은 저장된 값과 기록 시각 그대로 (id, ..., reputation, gold, reputation_updated_at)
+        if self._party_view is None or self._party_view[0] != self._party_version:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT id, name, type, hp, max_hp, mp, max_mp, is_alive, 
+                       relationship_level, reputation, gold, reputation_updated_at
+                FROM main_story_characters 
+                WHERE is_in_party = 1
+                ORDER BY type, name
+            ''')
+            self._party_view = (self._party_version, cursor.fetchall())
+        return self._party_view[1]
+    
+    def data_version(self) -> Tuple[int, int]:
+        #DB 내용 버전 (세대 번호, 연결의 누적 변경 행 수) - 같으면 내용이 같음 (저장 시 DB 스냅샷 재사용 판단용)
+        #세대 번호는 복원/초기화 때마다 바뀌므로 backup으로 통째로 바뀐 경우도 구분
+        return self._stats_epoch, self.conn.total_changes
+    
+    def party_version(self) -> Tuple[int, int]:
+        #파티 뷰 버전 (세대 번호, 변경 횟수) - SQL 없이 조회
+        return self._stats_epoch, self._party_version
+    
+    def inventory_version(self, player_id: int) -> Tuple[int, int]:
+        #인벤토리 뷰 버전 (세대 번호, 변경 횟수) - SQL 없이 조회
+        return self._stats_epoch, self._inventory_versions.get(player_id, 0)
+    
+    def _touch_party(self):
+        #캐릭터 행을 바꾼 쓰기 경로에서 호출 - 파티 뷰 무효화
+        self._party_version += 1
+    
+    def _touch_inventory(self, player_id: int):
+        #인벤토리를 바꾼 쓰기 경로에서 호출 - 그 플레이어의 인벤토리 뷰 무효화
+        self._inventory_versions[player_id] = self._inventory_versions.get(player_id, 0) + 1
+    
+    def leave_party(self, char_id: int, location: str) -> bool:
+        #캐릭터를 파티에서 제외 (삭제하지 않고 is_in_party만 해제, 위치 기록)
         cursor = self.conn.cursor()
         cursor.execute('''
-            SELECT id, name, type, hp, max_hp, mp, max_mp, is_alive, 
-                   relationship_level, reputation, gold
-            FROM main_story_characters 
-            WHERE is_in_party = 1
-            ORDER BY type, name
-        ''')
+            UPDATE main_story_characters 
+            SET is_in_party = FALSE, current_location = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (location, char_id))
+        self.conn.commit()
+        self._touch_party()
+        return cursor.rowcount > 0
+    
+    def get_combat_stats(self, char_ids: List[int]) -> List[Tuple]:
+        #전투 프로필 계산용 능력치 일괄 조회 - (id, name, class, level, strength, agility, intelligence)
+        if not char_ids:
+            return []
+        
+        placeholders = ",".join("?" * len(char_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT id, name, class, level, strength, agility, intelligence
+            FROM main_story_characters
+            WHERE id IN ({placeholders})
+        ''', list(char_ids))
         return cursor.fetchall()
     
+    def stats_version(self, char_id: int) -> Tuple[int, int]:
+        #캐릭터 능력치 버전 (세대 번호, 변경 횟수) - SQL 없이 조회
+        return self._stats_epoch, self._stats_versions.get(char_id, 0)
+    
+    def update_character_stats(self, char_id: int, **stats) -> bool:
+        #캐릭터 능력치 변경 (레벨업, 장비 등) - 변경 시 능력치 버전 증가
+        changes = {column: value for column, value in stats.items() if column in CHARACTER_STAT_COLUMNS}
+        unknown = set(stats) - set(changes)
+        if unknown:
+            raise ValueError(f"변경할 수 없는 능력치: {', '.join(sorted(unknown))}")
+        if not changes:
+            return False
+        
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            UPDATE main_story_characters
+            SET {assignments}, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (*changes.values(), char_id))
+        self.conn.commit()
+        
+        if cursor.rowcount == 0:
+            return False
+        
+        self._stats_versions[char_id] = self._stats_versions.get(char_id, 0) + 1
+        self._touch_party()
+        return True
+    
+    def _reset_stats_versions(self):
+        #DB 내용이 통째로 바뀌었을 때 모든 능력치/뷰 버전 무효화
+        self._stats_epoch = next(_stats_epochs)
+        self._stats_versions.clear()
+        self._party_view = None
+        self._inventory_views.clear()
+    
     def apply_damage(self, char_id: int, damage: int) -> Tuple[int, bool]:
         #캐릭터에게 데미지 적용
         cursor = self.conn.cursor()
@@ -183,6 +554,7 @@ class MainStoryDB:
         ''', (new_hp, is_alive, char_id))
         
         self.conn.commit()
+        self._touch_party()
         return new_hp, is_alive
     
     def heal_character(self, char_id: int, hp_heal: int, mp_heal: int) -> Tuple[int, int]:
@@ -207,14 +579,56 @@ class MainStoryDB:
         ''', (new_hp, new_mp, new_hp > 0, char_id))
         
         self.conn.commit()
+        self._touch_party()
         return new_hp, new_mp
-    
+
+    def apply_battle_results(self, rows: List[Tuple[int, int, bool, int]]):
+        #전투 결과 일괄 반영 - (hp, mp, is_alive, id) 행들을 한 트랜잭션으로 갱신
+        if not rows:
+            return
+
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE main_story_characters
+                SET hp = ?, mp = ?, is_alive = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', rows)
+        self._touch_party()
+
     def update_reputation(self, char_id: int, reputation_change: int, reason: str = "", location: str = "") -> int:
-        #캐릭터 명성 업데이트
+        #캐릭터 명성 업데이트 (턴 진행 중이면 메모리에 누적하고 flush_reputation에서 기록)
+        if self._reputation_deferred:
+            pending = self._pending_reputation.get(char_id)
+            if pending is None:
+                cursor = self.conn.cursor()
+                cursor.execute('''
+                    SELECT decayed_reputation(reputation, reputation_updated_at)
+                    FROM main_story_characters WHERE id = ?
+                ''', (char_id,))
+                result = cursor.fetchone()
+                if not result:
+                    return 0
+                pending = {"old": result[0], "value": result[0], "changes": []}
+                self._pending_reputation[char_id] = pending
+            
+            pending["value"] = max(-100, min(100, pending["value"] + reputation_change))
+            pending["changes"].append((reputation_change, reason, location))
+            self._touch_party()
+            
+            region = region_for_location(location)
+            if region:
+                key = (char_id, region)
+                self._pending_regional[key] = max(-100, min(100, self.get_regional_reputation(char_id, region)
+                                                             + reputation_change))
+            return pending["value"]
+        
         cursor = self.conn.cursor()
         
-        # 현재 명성 조회
-        cursor.execute("SELECT reputation FROM main_story_characters WHERE id = ?", (char_id,))
+        # 현재 명성 조회 (마지막 기록 이후 감쇠 반영)
+        cursor.execute('''
+            SELECT decayed_reputation(reputation, reputation_updated_at)
+            FROM main_story_characters WHERE id = ?
+        ''', (char_id,))
         result = cursor.fetchone()
         
         if not result:
@@ -223,12 +637,12 @@ class MainStoryDB:
         old_reputation = result[0]
         new_reputation = max(-100, min(100, old_reputation + reputation_change))
         
-        # 명성 업데이트
+        # 명성 업데이트 (감쇠 기준 시각도 갱신)
         cursor.execute('''
             UPDATE main_story_characters
-            SET reputation = ?, updated_at = CURRENT_TIMESTAMP
+            SET reputation = ?, reputation_updated_at = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
-        ''', (new_reputation, char_id))
+        ''', (new_reputation, self.clock(), char_id))
         
         # 명성 변화 기록
         cursor.execute('''
@@ -237,9 +651,190 @@ class MainStoryDB:
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (char_id, old_reputation, new_reputation, reputation_change, reason, location))
         
+        # 변화가 일어난 지역의 명성 갱신
+        now = self.clock()
+        region = region_for_location(location)
+        if region:
+            regional_reputation = max(-100, min(100, self.get_regional_reputation(char_id, region) + reputation_change))
+            self._write_regional(cursor, [(char_id, region, regional_reputation)], now)
+        
+        self._write_series(cursor, {char_id: [new_reputation]}, now)
+        
         self.conn.commit()
+        self._touch_party()
         return new_reputation
     
+    def get_reputation(self, char_id: int) -> int:
+        #현재 명성 (이번 턴에 누적된 변화 포함)
+        if char_id in self._pending_reputation:
+            return self._pending_reputation[char_id]["value"]
+        
+        # 파티원이면 파티 뷰의 저장 값으로 감쇠 계산 (SQL 없음)
+        for row in self._party_rows():
+            if row[0] == char_id:
+                return self._decayed_reputation(row[9], row[11])
+        
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT decayed_reputation(reputation, reputation_updated_at)
+            FROM main_story_characters WHERE id = ?
+        ''', (char_id,))
+        result = cursor.fetchone()
+        return result[0] if result else 0
+    
+    def begin_reputation_turn(self):
+        #턴 시작 - 이후 명성 변화는 flush_reputation까지 메모리에 누적
+        self._reputation_deferred = True
+    
+    def flush_reputation(self) -> int:
+        #턴 종료 - 누적된 명성 변화를 캐릭터별 UPDATE 1회와 변화 기록 일괄 INSERT로 한 트랜잭션에 기록
+        #기록한 변화 수 반환 (이후 변화는 다시 즉시 기록)
+        self._reputation_deferred = False
+        if not self._pending_reputation:
+            return 0
+        
+        updates = []
+        history = []
+        series = {}
+        now = self.clock()
+        for char_id, pending in self._pending_reputation.items():
+            updates.append((pending["value"], now, char_id))
+            reputation = pending["old"]
+            values = series[char_id] = []
+            for change, reason, location in pending["changes"]:
+                new_reputation = max(-100, min(100, reputation + change))
+                history.append((char_id, reputation, new_reputation, change, reason, location))
+                values.append(new_reputation)
+                reputation = new_reputation
+        
+        regional = [(char_id, region, reputation) for (char_id, region), reputation in self._pending_regional.items()]
+        
+        with self.conn:
+            self.conn.executemany('''
+                UPDATE main_story_characters
+                SET reputation = ?, reputation_updated_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', updates)
+            self.conn.executemany('''
+                INSERT INTO reputation_changes
+                (player_id, old_reputation, new_reputation, change_amount, reason, location)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', history)
+            self._write_regional(self.conn, regional, now)
+            self._write_series(self.conn, series, now)
+        
+        self._pending_reputation.clear()
+        self._pending_regional.clear()
+        self._touch_party()
+        return len(history)
+    
+    def _series_session_bucket(self) -> int:
+        #이번 세션의 시계열 버킷 번호 (기록된 마지막 세션 다음 번호)
+        if self._series_session is None:
+            result = self.conn.execute(
+                "SELECT MAX(bucket) FROM reputation_series WHERE resolution = 'session'"
+            ).fetchone()
+            self._series_session = (result[0] or 0) + 1
+        return self._series_session
+    
+    def _write_series(self, cursor, values: Dict[int, List[int]], now: float):
+        #캐릭터별 이번에 바뀐 명성 값들을 시간/일/세션 버킷에 반영 (커밋은 호출한 쪽에서)
+        rows = []
+        for char_id, reputations in values.items():
+            if not reputations:
+                continue
+            for resolution, length in REPUTATION_SERIES_RESOLUTIONS.items():
+                bucket = int(now // length * length) if length else self._series_session_bucket()
+                rows.append((char_id, resolution, bucket, min(reputations), max(reputations),
+                             reputations[-1], len(reputations), now))
+        if not rows:
+            return
+        cursor.executemany('''
+            INSERT INTO reputation_series
+            (player_id, resolution, bucket, min_reputation, max_reputation, last_reputation, changes, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (player_id, resolution, bucket) DO UPDATE SET
+                min_reputation = MIN(min_reputation, excluded.min_reputation),
+                max_reputation = MAX(max_reputation, excluded.max_reputation),
+                last_reputation = excluded.last_reputation,
+                changes = changes + excluded.changes,
+                updated_at = excluded.updated_at
+        ''', rows)
+    
+    def get_reputation_series(self, player_id: int, resolution: str = "day", limit: int = 30,
+                              points: Optional[int] = None) -> List[Tuple]:
+        #명성 시계열 조회 - 최근 limit개 버킷의 (bucket, min, max, last, changes)를 오래된 순으로
+        #points를 주면 연속 버킷을 합쳐 그 개수 이하로 줄임 (기록 당시 명성 기준, 감쇠 미반영)
+        if resolution not in REPUTATION_SERIES_RESOLUTIONS:
+            raise ValueError(f"알 수 없는 시계열 해상도: {resolution}")
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT bucket, min_reputation, max_reputation, last_reputation, changes
+            FROM reputation_series
+            WHERE player_id = ? AND resolution = ?
+            ORDER BY bucket DESC
+            LIMIT ?
+        ''', (player_id, resolution, limit))
+        return downsample_series(cursor.fetchall()[::-1], points)
+    
+    def _regional_matrix(self) -> ReputationMatrix:
+        #지역별 명성 행렬 (처음 사용할 때 테이블 전체를 한 번 적재)
+        if not self._regional_loaded:
+            self._regional.load(self.conn.execute(
+                "SELECT player_id, region, reputation, updated_at FROM regional_reputation"
+            ))
+            self._regional_loaded = True
+        return self._regional
+    
+    def _write_regional(self, cursor, rows: List[Tuple[int, str, int]], now: float):
+        #지역 명성 upsert와 행렬 갱신 (커밋은 호출한 쪽에서)
+        if not rows:
+            return
+        cursor.executemany('''
+            INSERT INTO regional_reputation (player_id, region, reputation, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (player_id, region) DO UPDATE SET
+                reputation = excluded.reputation,
+                updated_at = excluded.updated_at
+        ''', [(char_id, region, reputation, now) for char_id, region, reputation in rows])
+        matrix = self._regional_matrix()
+        for char_id, region, reputation in rows:
+            matrix.set(char_id, region, reputation, now)
+    
+    def get_regional_reputation(self, char_id: int, location: str) -> int:
+        #위치가 속한 지역에서의 명성 (이번 턴 변화와 감쇠 반영, 기록이 없으면 0)
+        region = region_for_location(location)
+        pending = self._pending_regional.get((char_id, region))
+        if pending is not None:
+            return pending
+        reputation, updated_at = self._regional_matrix().get(char_id, region)
+        return self._decayed_reputation(reputation, updated_at) if updated_at is not None else reputation
+    
+    def get_regional_reputations(self, char_id: int) -> Dict[str, int]:
+        #플레이어의 지역별 명성 전체 (기록이 있는 지역만)
+        standings = {
+            region: self._decayed_reputation(reputation, updated_at)
+            for region, (reputation, updated_at) in self._regional_matrix().player_row(char_id).items()
+        }
+        for (pending_id, region), reputation in self._pending_regional.items():
+            if pending_id == char_id:
+                standings[region] = reputation
+        return standings
+    
+    def get_local_reputation(self, char_id: int, location: str) -> int:
+        #위치에서의 평판 - 전체 명성과 그 지역 명성의 가중 평균 (상점 가격, NPC 태도 기준)
+        return local_standing(self.get_reputation(char_id), self.get_regional_reputation(char_id, location))
+    
+    def _with_pending_reputation(self, rows: List[Tuple], reputation_index: int) -> List[Tuple]:
+        #조회 행(첫 컬럼 id)에 이번 턴에 누적된 명성 반영
+        if not self._pending_reputation:
+            return rows
+        return [
+            row[:reputation_index] + (self._pending_reputation[row[0]]["value"],) + row[reputation_index + 1:]
+            if row[0] in self._pending_reputation else row
+            for row in rows
+        ]
+    
     def update_gold(self, char_id: int, gold_change: int) -> int:
         #캐릭터 골드 업데이트
         cursor = self.conn.cursor()
@@ -260,86 +855,182 @@ class MainStoryDB:
         ''', (new_gold, char_id))
         
         self.conn.commit()
+        self._touch_party()
         return new_gold
     
-    def add_item(self, player_id: int, item_name: str, item_type: str, quantity: int, description: str = "", value: int = 0) -> int:
-        #인벤토리에 아이템 추가
+    def get_gold(self, char_id: int) -> int:
+        #캐릭터 보유 골드
         cursor = self.conn.cursor()
-        
-        # 기존 아이템 확인
+        cursor.execute("SELECT gold FROM main_story_characters WHERE id = ?", (char_id,))
+        result = cursor.fetchone()
+        return result[0] if result else 0
+    
+    def _restock_shop(self, cursor, location: str, stock_limits: Dict[str, int], now: float, restock_interval: float):
+        #상점 재고 행을 준비하고 보충 시각이 지난 재고를 최대치로 채움 (커밋은 호출한 쪽에서)
+        cursor.executemany('''
+            INSERT OR IGNORE INTO shop_stock (location, item_name, stock, max_stock, restock_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(location, item_name, max_stock, max_stock, now + restock_interval)
+              for item_name, max_stock in stock_limits.items()])
         cursor.execute('''
-            SELECT id, quantity FROM inventory
-            WHERE player_id = ? AND item_name = ? AND item_type = ?
-        ''', (player_id, item_name, item_type))
-        
-        existing_item = cursor.fetchone()
-        
-        if existing_item:
-            # 기존 아이템 수량 증가
-            item_id, current_quantity = existing_item
-            new_quantity = current_quantity + quantity
+            UPDATE shop_stock SET stock = max_stock, restock_at = ?
+            WHERE location = ? AND restock_at <= ?
+        ''', (now + restock_interval, location, now))
+    
+    def get_shop_stock(self, location: str, stock_limits: Dict[str, int],
+                       restock_interval: float = GAME_CONSTANTS["SHOP_RESTOCK_HOURS"] * 3600) -> Dict[str, int]:
+        #상점의 아이템별 현재 재고 - stock_limits: 아이템명 -> 최대 재고 (처음 여는 상점이면 최대치로 준비)
+        with self.conn:
+            cursor = self.conn.cursor()
+            self._restock_shop(cursor, location, stock_limits, self.clock(), restock_interval)
+            cursor.execute("SELECT item_name, stock FROM shop_stock WHERE location = ?", (location,))
+            return dict(cursor.fetchall())
+    
+    def purchase_item(self, player_id: int, shop_location: str, stock_limits: Dict[str, int], item: Tuple[str, str, str, int],
+                      quantity: int, unit_price: int, location: str = "",
+                      restock_interval: float = GAME_CONSTANTS["SHOP_RESTOCK_HOURS"] * 3600) -> Tuple[str, int, int]:
+        #상점 구매 - 재고 확인/차감, 골드 차감, 아이템 지급, 거래 기록을 한 트랜잭션으로 처리 (커밋 1회)
+        #item: (이름, 타입, 설명, 원가) / 재고와 골드는 조건부 UPDATE로 차감해 동시에 구매해도 음수가 되지 않음
+        #(결과, 남은 골드, 남은 재고) 반환 - 결과: "ok", "out_of_stock", "not_enough_gold"
+        #실패 시 세이브포인트까지만 되돌려 같은 연결에 대기 중인 다른 쓰기는 건드리지 않음
+        item_name, item_type, description, value = item
+        total_price = unit_price * quantity
+        cursor = self.conn.cursor()
+        cursor.execute("SAVEPOINT purchase_item")
+        try:
+            self._restock_shop(cursor, shop_location, stock_limits, self.clock(), restock_interval)
+            
             cursor.execute('''
-                UPDATE inventory SET quantity = ? WHERE id = ?
-            ''', (new_quantity, item_id))
-            result_id = item_id
-        else:
-            # 새 아이템 추가
+                UPDATE shop_stock SET stock = stock - ?
+                WHERE location = ? AND item_name = ? AND stock >= ?
+            ''', (quantity, shop_location, item_name, quantity))
+            if cursor.rowcount != 1:
+                self._rollback_to(cursor, "purchase_item")
+                return "out_of_stock", self.get_gold(player_id), self._shop_item_stock(shop_location, item_name)
+            
             cursor.execute('''
-                INSERT INTO inventory (player_id, item_name, item_type, quantity, description, value)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (player_id, item_name, item_type, quantity, description, value))
-            result_id = cursor.lastrowid
+                UPDATE main_story_characters
+                SET gold = gold - ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND gold >= ?
+            ''', (total_price, player_id, total_price))
+            if cursor.rowcount != 1:
+                self._rollback_to(cursor, "purchase_item")
+                return "not_enough_gold", self.get_gold(player_id), self._shop_item_stock(shop_location, item_name)
+            
+            cursor.execute('''
+                INSERT INTO inventory (player_id, item_id, quantity)
+                VALUES (?, ?, ?)
+                ON CONFLICT (player_id, item_id)
+                DO UPDATE SET quantity = quantity + excluded.quantity
+            ''', (player_id, self._item_id(cursor, item_name, item_type, description, value), quantity))
+            cursor.execute('''
+                INSERT INTO shop_transactions
+                (player_id, item_name, quantity, unit_price, total_price, transaction_type, location)
+                VALUES (?, ?, ?, ?, ?, 'buy', ?)
+            ''', (player_id, item_name, quantity, unit_price, total_price, location))
+            
+            gold = self.get_gold(player_id)
+            stock = self._shop_item_stock(shop_location, item_name)
+            cursor.execute("RELEASE purchase_item")
+            self.conn.commit()
+            self._touch_party()
+            self._touch_inventory(player_id)
+            return "ok", gold, stock
+        except sqlite3.Error:
+            if self.conn.in_transaction:
+                self._rollback_to(cursor, "purchase_item")
+            raise
+    
+    def _rollback_to(self, cursor, savepoint: str):
+        #세이브포인트 이후의 변경만 되돌리고 세이브포인트 해제 (그 이전의 커밋되지 않은 쓰기는 유지)
+        cursor.execute(f"ROLLBACK TO {savepoint}")
+        cursor.execute(f"RELEASE {savepoint}")
+    
+    def _shop_item_stock(self, location: str, item_name: str) -> int:
+        #상점 아이템 하나의 재고 (행이 없으면 0)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT stock FROM shop_stock WHERE location = ? AND item_name = ?", (location, item_name))
+        result = cursor.fetchone()
+        return result[0] if result else 0
+    
+    def add_item(self, player_id: int, item_name: str, item_type: str, quantity: int, description: str = "", value: int = 0) -> int:
+        #인벤토리에 아이템 추가 - 아이템 id 반환 (카탈로그에 없는 아이템이면 카탈로그에 먼저 추가)
+        cursor = self.conn.cursor()
+        item_id = self._item_id(cursor, item_name, item_type, description, value)
+        cursor.execute('''
+            INSERT INTO inventory (player_id, item_id, quantity)
+            VALUES (?, ?, ?)
+            ON CONFLICT (player_id, item_id)
+            DO UPDATE SET quantity = quantity + excluded.quantity
+        ''', (player_id, item_id, quantity))
         
         self.conn.commit()
-        return result_id
+        self._touch_inventory(player_id)
+        return item_id
     
+    def add_items(self, player_id: int, items: List[Tuple[str, str, int, str, int]]) -> int:
+        #인벤토리에 아이템 여러 개 일괄 추가 - (이름, 타입, 수량, 설명, 가치) 목록
+        #같은 아이템은 먼저 합친 뒤 한 트랜잭션의 upsert로 반영 (커밋 1회)
+        if not items:
+            return 0
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            merged: Dict[int, int] = {}
+            for item_name, item_type, quantity, description, value in items:
+                item_id = self._item_id(cursor, item_name, item_type, description, value)
+                merged[item_id] = merged.get(item_id, 0) + quantity
+            cursor.executemany('''
+                INSERT INTO inventory (player_id, item_id, quantity)
+                VALUES (?, ?, ?)
+                ON CONFLICT (player_id, item_id)
+                DO UPDATE SET quantity = quantity + excluded.quantity
+            ''', [(player_id, item_id, quantity) for item_id, quantity in merged.items()])
+
+        self._touch_inventory(player_id)
+        return len(merged)
+
     def get_inventory(self, player_id: int) -> List[Tuple]:
-        #플레이어 인벤토리 조회
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT id, item_name, item_type, quantity, description, value
-            FROM inventory
-            WHERE player_id = ? AND quantity > 0
-            ORDER BY item_type, item_name
-        ''', (player_id,))
-        return cursor.fetchall()
+        #플레이어 인벤토리 조회 - (아이템 id, 이름, 타입, 수량, 설명, 가치)를 타입/이름순으로
+        #(인벤토리 뷰가 최신이면 SQL 없이 반환, 아이템 정보는 메모리 카탈로그에서)
+        version = self._inventory_versions.get(player_id, 0)
+        view = self._inventory_views.get(player_id)
+        if view is None or view[0] != version:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT item_id, quantity FROM inventory
+                WHERE player_id = ? AND quantity > 0
+            ''', (player_id,))
+            rows = []
+            for item_id, quantity in cursor.fetchall():
+                item = self._items[item_id]
+                rows.append((item_id, item.name, item.type, quantity, item.description, item.value))
+            rows.sort(key=lambda row: (row[2], row[1]))
+            view = self._inventory_views[player_id] = (version, rows)
+        return list(view[1])
     
     def get_item_by_type(self, player_id: int, item_type: str) -> List[Tuple]:
-        #특정 타입의 아이템 조회
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT id, item_name, item_type, quantity, description, value
-            FROM inventory
-            WHERE player_id = ? AND item_type = ? AND quantity > 0
-            ORDER BY item_name
-        ''', (player_id, item_type))
-        return cursor.fetchall()
+        #특정 타입의 아이템 조회 (인벤토리 뷰에서 거름 - 이름순 유지)
+        return [item for item in self.get_inventory(player_id) if item[2] == item_type]
     
     def use_item(self, player_id: int, item_id: int, quantity_used: int) -> bool:
-        #아이템 사용 (수량 차감)
+        #아이템 사용 (수량 차감, 다 쓰면 행 삭제) - item_id는 카탈로그 아이템 id
         cursor = self.conn.cursor()
         cursor.execute('''
-            SELECT quantity FROM inventory WHERE id = ? AND player_id = ?
-        ''', (item_id, player_id))
+            UPDATE inventory SET quantity = quantity - ?
+            WHERE player_id = ? AND item_id = ? AND quantity >= ?
+        ''', (quantity_used, player_id, item_id, quantity_used))
         
-        result = cursor.fetchone()
-        if not result:
-            return False
-        
-        current_quantity = result[0]
-        if current_quantity < quantity_used:
+        if cursor.rowcount != 1:
+            # 조건부 UPDATE가 아무 행도 바꾸지 않았으므로 되돌릴 것이 없음 (대기 중인 다른 쓰기는 그대로)
             return False
         
-        new_quantity = current_quantity - quantity_used
-        
-        if new_quantity <= 0:
-            cursor.execute('DELETE FROM inventory WHERE id = ?', (item_id,))
-        else:
-            cursor.execute('''
-                UPDATE inventory SET quantity = ? WHERE id = ?
-            ''', (new_quantity, item_id))
+        cursor.execute('''
+            DELETE FROM inventory WHERE player_id = ? AND item_id = ? AND quantity <= 0
+        ''', (player_id, item_id))
         
         self.conn.commit()
+        self._touch_inventory(player_id)
         return True
     
     def add_story_event(self, player_id: int, event_type: str, description: str, location: str = "", turn_number: int = 0, reputation_change: int = 0, gold_change: int = 0):
@@ -354,6 +1045,32 @@ class MainStoryDB:
               reputation_change, gold_change))
         self.conn.commit()
 
+    def record_encounter(self, player_id: int, enemy: Dict, total_damage: int, turn_number: int = 0) -> int:
+        #조우한 적 기록
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO encounters
+            (player_id, enemy_name, description, enemy_hp, attack_bonus, defense,
+             reputation_band, location, total_damage, outcome, turn_number)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (player_id, enemy['name'], enemy.get('description', ''), enemy.get('hp', 0),
+              enemy.get('attack_bonus', 0), enemy.get('defense', 0), enemy.get('reputation_band', ''),
+              enemy.get('location', ''), total_damage, enemy.get('outcome', 'victory'), turn_number))
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def get_recent_encounters(self, player_id: int, limit: int = 5) -> List[Tuple]:
+        #최근 조우한 적 조회
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT enemy_name, location, enemy_hp, total_damage, outcome, timestamp
+            FROM encounters
+            WHERE player_id = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (player_id, limit))
+        return cursor.fetchall()
+
     def get_adventure_count(self, player_id: int) -> int:
         #모험 횟수 조회
         cursor = self.conn.cursor()
@@ -383,7 +1100,7 @@ class MainStoryDB:
             SELECT old_reputation, new_reputation, change_amount, reason, location, timestamp
             FROM reputation_changes
             WHERE player_id = ?
-            ORDER BY timestamp DESC
+            ORDER BY timestamp DESC, id DESC
             LIMIT ?
         ''', (player_id, limit))
         return cursor.fetchall()
@@ -404,11 +1121,13 @@ class MainStoryDB:
         #이름으로 캐릭터 조회
         cursor = self.conn.cursor()
         cursor.execute('''
-            SELECT id, name, type, hp, max_hp, mp, max_mp, is_alive, class, reputation
+            SELECT id, name, type, hp, max_hp, mp, max_mp, is_alive, class,
+                   decayed_reputation(reputation, reputation_updated_at)
             FROM main_story_characters
             WHERE name = ? AND is_in_party = 1
         ''', (name,))
-        return cursor.fetchone()
+        result = cursor.fetchone()
+        return self._with_pending_reputation([result], 9)[0] if result else None
     
     def get_healers(self) -> List[Tuple]:
         #파티 내 치유사 조회
@@ -422,7 +1141,7 @@ class MainStoryDB:
         ''')
         return cursor.fetchall()
     
-    def backup_database(self, backup_path: str = None):
+    def backup_database(self, backup_path: str = None, verbose: bool = True):
         #데이터베이스 백업
         if backup_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -431,28 +1150,60 @@ class MainStoryDB:
         backup_conn = sqlite3.connect(backup_path)
         self.conn.backup(backup_conn)
         backup_conn.close()
-        print(f"데이터베이스가 {backup_path}에 백업되었습니다.")
+        if verbose:
+            print(f"데이터베이스가 {backup_path}에 백업되었습니다.")
+    
+    def restore_from(self, snapshot_path: str):
+        #스냅샷 DB를 현재 연결에 복원 (sqlite backup API, 스냅샷 파일은 읽기 전용으로 유지)
+        snapshot_uri = Path(snapshot_path).absolute().as_uri() + "?mode=ro"
+        snapshot_conn = sqlite3.connect(snapshot_uri, uri=True)
+        try:
+            snapshot_conn.backup(self.conn)
+        finally:
+            snapshot_conn.close()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        # 이전 버전 스냅샷이면 새 테이블/컬럼 보충
+        self._create_tables()
+        self.game_time = self._latest_timestamp()
+        self._reset_stats_versions()
+        self._pending_reputation.clear()
+        self._pending_regional.clear()
+        self._regional_loaded = False
+        self._series_session = None
     
     def reset_database(self):
         #데이터베이스 초기화
         cursor = self.conn.cursor()
         
         # 모든 테이블 삭제
+        cursor.execute("DROP TABLE IF EXISTS encounters")
+        cursor.execute("DROP TABLE IF EXISTS regional_reputation")
+        cursor.execute("DROP TABLE IF EXISTS reputation_series")
+        cursor.execute("DROP TABLE IF EXISTS shop_stock")
         cursor.execute("DROP TABLE IF EXISTS reputation_changes")
         cursor.execute("DROP TABLE IF EXISTS shop_transactions")
         cursor.execute("DROP TABLE IF EXISTS story_events")
         cursor.execute("DROP TABLE IF EXISTS inventory")
+        cursor.execute("DROP TABLE IF EXISTS items")
         cursor.execute("DROP TABLE IF EXISTS main_story_characters")
         
         self.conn.commit()
         
         # 테이블 재생성
         self._create_tables()
+        self.game_time = 0.0
+        self._reset_stats_versions()
+        self._pending_reputation.clear()
+        self._pending_regional.clear()
+        self._regional_loaded = False
+        self._series_session = None
         print("데이터베이스가 초기화되었습니다.")
     
     def close(self):
-        #데이터베이스 연결 종료
+        #데이터베이스 연결 종료 (누적된 명성 변화는 먼저 기록)
         if self.conn:
+            if self._pending_reputation:
+                self.flush_reputation()
             self.conn.close()
     
     def __del__(self):
@@ -0,0 +1,318 @@
+#NPC 대화 뱅크 모듈
+#(명성 등급, 특별 행동, NPC 원형)별 대화 템플릿을 SQLite에 보관하고 로컬에서 바로 골라 사용
+#템플릿은 처음 열 때 기본 문장 조합으로 채우고, 없는 키는 첫 요청 시 LLM으로 채워 저장
+#사용법: python dialogue_bank.py (기본 템플릿을 미리 채우고 조회 시간 확인)
+
+import json
+import sqlite3
+import string
+import threading
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+from langchain_core.messages import SystemMessage, HumanMessage
+from models import ReputationLevel
+from rng import choice
+
+DIALOGUE_BANK_FILENAME = "dialogue_bank.db"
+
+# 템플릿에 쓸 수 있는 자리표시자
+TEMPLATE_FIELDS = ("npc_name", "location")
+
+# 없는 키를 LLM으로 채울 때 요청할 변형 수
+GENERATED_VARIANTS = 6
+
+# NPC 이름 키워드별 원형 (앞에서부터 먼저 일치하는 원형 사용, 없으면 "기본")
+NPC_ARCHETYPES = {
+    "상인": ("상인", "상점", "장사", "행상"),
+    "경비병": ("경비", "병사", "기사", "순찰"),
+    "여관 주인": ("여관", "주점", "바텐더", "주인장"),
+    "주민": ("주민", "마을", "농부", "아이")
+}
+DEFAULT_ARCHETYPE = "기본"
+
+# 가벼운 대화로 보는 입력 키워드 - 이외의 입력은 고유 맥락이 필요하므로 LLM 사용
+SMALL_TALK_KEYWORDS = ("안녕", "반가", "인사", "잘 지내", "날씨", "뭐 해", "뭐해", "누구", "수고", "고마", "감사", "잘 있")
+SMALL_TALK_MAX_LENGTH = 20
+
+# 등급별 첫 문장 ({npc_name}, {location})
+LEVEL_OPENINGS = {
+    ReputationLevel.HEROIC: (
+        "영웅님! {npc_name}입니다. 당신의 명성은 온 대륙에 울려 퍼지고 있습니다!",
+        "이럴 수가, {location}에 영웅님이 오시다니! {npc_name}, 영광입니다!",
+        "{npc_name}입니다. 영웅님의 이야기를 듣지 않고 자란 사람은 없지요!"
+    ),
+    ReputationLevel.VERY_FRIENDLY: (
+        "오, {npc_name}입니다! 당신의 업적은 정말 훌륭합니다!",
+        "다시 뵙게 되어 기쁩니다! {npc_name}입니다.",
+        "{location}의 모두가 당신 이야기를 하고 있어요. {npc_name}입니다!"
+    ),
+    ReputationLevel.FRIENDLY: (
+        "안녕하세요! {npc_name}입니다. 좋은 평판을 들었습니다.",
+        "어서 오세요, {npc_name}입니다. 소문대로 좋은 분 같군요.",
+        "반갑습니다! {location}에 오신 걸 환영해요. {npc_name}입니다."
+    ),
+    ReputationLevel.NEUTRAL: (
+        "안녕하세요. {npc_name}입니다.",
+        "{npc_name}입니다. 처음 뵙는 얼굴이군요.",
+        "음, {location}에는 무슨 일로? {npc_name}입니다."
+    ),
+    ReputationLevel.SLIGHTLY_HOSTILE: (
+        "음... {npc_name}입니다. 당신에 대한 이야기를 들었는데...",
+        "{npc_name}입니다. 별로 좋은 소문은 못 들었습니다만.",
+        "{location}에서 소란은 피우지 마십시오. {npc_name}입니다."
+    ),
+    ReputationLevel.HOSTILE: (
+        "흥! {npc_name}다. 당신 같은 자와는 거래하기 싫지만...",
+        "{npc_name}다. 볼일만 보고 빨리 떠나.",
+        "또 너냐. {location}에서는 다들 널 싫어해."
+    ),
+    ReputationLevel.VERY_HOSTILE: (
+        "당신이... {npc_name}은 당신을 경계하고 있습니다.",
+        "가, 가까이 오지 마! {npc_name}은 아무 짓도 안 했어!",
+        "{npc_name}이 뒷걸음질 칩니다. \"원하는 게 뭐요...?\""
+    ),
+    ReputationLevel.ENEMY: (
+        "감히 여기에 나타나다니! {npc_name}이 당신을 용서하지 않겠다!",
+        "{location}에서 네 얼굴을 다시 볼 줄은 몰랐다! {npc_name}이 가만두지 않겠다!",
+        "네놈이구나! {npc_name}의 인내도 여기까지다!"
+    )
+}
+
+# 원형별 태도 문장 - 호의(친근 이상)/중립(평범~약간 비호의)/적대(적대 이하)
+ATTITUDE_BANDS = {
+    ReputationLevel.HEROIC: "friendly", ReputationLevel.VERY_FRIENDLY: "friendly",
+    ReputationLevel.FRIENDLY: "friendly", ReputationLevel.NEUTRAL: "neutral",
+    ReputationLevel.SLIGHTLY_HOSTILE: "neutral", ReputationLevel.HOSTILE: "hostile",
+    ReputationLevel.VERY_HOSTILE: "hostile", ReputationLevel.ENEMY: "hostile"
+}
+
+ARCHETYPE_LINES = {
+    "상인": {
+        "friendly": ("좋은 물건이 막 들어왔는데 먼저 보여드리죠.", "당신 같은 손님이라면 언제든 환영입니다."),
+        "neutral": ("물건을 보시겠소, 아니면 그냥 구경이오?", "값은 정해진 대로 받습니다."),
+        "hostile": ("돈만 제대로 낸다면야 팔긴 하겠소.", "가게 안에서 허튼짓하면 바로 쫓아낼 거요.")
+    },
+    "경비병": {
+        "friendly": ("당신 덕분에 요즘 순찰이 한결 편합니다.", "필요한 게 있으면 경비대에 말씀만 하십시오."),
+        "neutral": ("규칙만 지킨다면 문제없을 거요.", "수상한 자를 보면 알려주시오."),
+        "hostile": ("내 눈은 계속 당신을 지켜보고 있다.", "한 번만 더 문제를 일으키면 감옥행이다.")
+    },
+    "여관 주인": {
+        "friendly": ("제일 좋은 방을 비워두었지요. 한잔 하시겠어요?", "따뜻한 스튜가 마침 다 끓었습니다."),
+        "neutral": ("방은 하룻밤에 은화 몇 닢이오.", "식사는 저녁때만 됩니다."),
+        "hostile": ("방은... 마침 다 찼소.", "술 마시고 소란 피우면 바로 내쫓을 거요.")
+    },
+    "주민": {
+        "friendly": ("아이들이 당신 이야기를 흉내 내며 놀아요.", "이 동네에 오신 것만으로도 든든합니다."),
+        "neutral": ("요즘 길이 험하니 조심하세요.", "별일 없는 평범한 하루지요."),
+        "hostile": ("우린 조용히 살고 싶을 뿐이에요.", "문 닫아야겠네요. 어서 가세요.")
+    },
+    "기본": {
+        "friendly": ("무엇이든 도와드리겠습니다.", "당신과 이야기할 수 있어 기쁩니다."),
+        "neutral": ("무슨 일이십니까?", "용건이 있으시면 말씀하세요."),
+        "hostile": ("용건만 간단히 해.", "너와 길게 이야기할 생각은 없다.")
+    }
+}
+
+# 특별 행동 문장 (None은 특별 행동 없음)
+ACTION_LINES = {
+    None: ("",),
+    "무료_서비스": ("이번엔 돈은 받지 않겠습니다. 제 작은 감사의 표시예요.", "영웅님께 값을 받을 순 없지요. 그냥 가져가세요."),
+    "특별_정보_제공": ("아무에게도 말하지 않은 비밀 하나를 알려드리죠.", "북쪽 길에 관한 소문이 있는데, 당신께만 말씀드릴게요."),
+    "귀중한_선물": ("이걸 받아주세요. 대대로 내려온 물건입니다.", "작지만 귀한 선물을 준비했습니다."),
+    "할인_제공": ("당신에게는 특별히 값을 깎아드리죠.", "단골 가격으로 해드리겠습니다."),
+    "추가_정보": ("참, 요즘 이 근처에 이상한 일이 있었어요.", "덧붙이자면 동쪽 숲은 피하시는 게 좋아요."),
+    "친절한_조언": ("서두르지 마시고 충분히 준비하고 떠나세요.", "물약은 넉넉히 챙기시는 게 좋을 거예요."),
+    "약간_할인": ("조금은 깎아드릴 수 있어요.", "값은 조금 빼드리죠."),
+    "기본_정보_제공": ("길을 물으신다면 알려드릴 수 있어요.", "이 근처 지리는 제가 잘 압니다."),
+    "기본_서비스": ("필요한 게 있으면 말씀하세요.", "할 수 있는 만큼은 도와드리죠."),
+    "정보_제한": ("더 이상은 말해줄 수 없습니다.", "그건... 모르는 일입니다."),
+    "경계": ("손은 보이는 곳에 두시죠.", "이상한 짓은 하지 마십시오."),
+    "높은_가격": ("당신한테는 값을 더 받아야겠어.", "싫으면 다른 데 가보든가."),
+    "무례한_태도": ("하, 꼴 좋군.", "냄새나니 저리 떨어져."),
+    "정보_거부": ("알아도 너한텐 말 안 해.", "물어봐야 소용없어."),
+    "서비스_거부": ("당신에게 팔 물건은 없습니다!", "오늘은 문을 닫았어요. 돌아가세요!"),
+    "도망_시도": ("말을 마치기도 전에 뒷문으로 달아나려 합니다!", "슬금슬금 물러나더니 골목으로 뛰어갑니다!"),
+    "경비_호출": ("경비병! 경비병! 여기 그자가 있다!", "누가 경비대 좀 불러줘요!"),
+    "전투_시작": ("무기를 뽑아 들고 달려듭니다!", "말은 필요 없다. 덤벼라!"),
+    "도망": ("욕설을 내뱉고는 서둘러 자리를 피합니다.", "두고 보자며 달아납니다!"),
+    "위협": ("다음에 마주치면 살아서 못 돌아갈 거다.", "밤길 조심하는 게 좋을걸.")
+}
+
+
+def npc_archetype(npc_name: str) -> str:
+    #NPC 이름에서 원형 찾기
+    for archetype, keywords in NPC_ARCHETYPES.items():
+        if any(keyword in (npc_name or "") for keyword in keywords):
+            return archetype
+    return DEFAULT_ARCHETYPE
+
+
+def is_small_talk(user_input: str) -> bool:
+    #고유 맥락이 필요 없는 가벼운 대화인지 (빈 입력 포함)
+    text = (user_input or "").strip()
+    if not text:
+        return True
+    return len(text) <= SMALL_TALK_MAX_LENGTH and any(keyword in text for keyword in SMALL_TALK_KEYWORDS)
+
+
+def _is_valid_template(template: str) -> bool:
+    #자리표시자가 그대로의 {npc_name}, {location}뿐인 템플릿인지 - format을 실행하지 않고 구문만 검사
+    #(속성/인덱스 접근, 변환, 서식 지정이 붙은 자리표시자와 짝이 맞지 않는 중괄호는 거부)
+    try:
+        fields = list(string.Formatter().parse(template))
+    except ValueError:
+        return False
+    for _, field_name, format_spec, conversion in fields:
+        if field_name is not None and (field_name not in TEMPLATE_FIELDS or format_spec or conversion):
+            return False
+    return bool(template.strip())
+
+
+def seed_templates() -> List[Tuple[str, str, str, str]]:
+    #기본 템플릿 (등급, 특별 행동, 원형, 템플릿) - 첫 문장 x 원형 태도 x 특별 행동 조합
+    from reputation_system import TIER_BY_LEVEL
+
+    rows = []
+    for level, openings in LEVEL_OPENINGS.items():
+        actions = (None,) + TIER_BY_LEVEL[level].special_actions
+        for archetype, lines in ARCHETYPE_LINES.items():
+            attitude = lines[ATTITUDE_BANDS[level]]
+            for action in actions:
+                for opening, line, action_line in product(openings, attitude, ACTION_LINES.get(action, ("",))):
+                    template = " ".join(part for part in (opening, line, action_line) if part)
+                    rows.append((level.value, action or "", archetype, template))
+    return rows
+
+
+class DialogueBank:
+    #SQLite 대화 템플릿 뱅크 - 키별 템플릿은 처음 조회 시 메모리에 올려 재사용
+
+    def __init__(self, db_path: str = DIALOGUE_BANK_FILENAME):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._cache: Dict[Tuple[str, str, str], Tuple[str, ...]] = {}
+        self._create_tables()
+
+    def _create_tables(self):
+        #대화 템플릿 테이블 생성 (비어 있으면 기본 템플릿으로 채움)
+        with self.conn:
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS dialogue_templates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                level TEXT NOT NULL,
+                special_action TEXT NOT NULL DEFAULT '', -- 특별 행동 없음은 ''
+                archetype TEXT NOT NULL,
+                template TEXT NOT NULL,
+                source TEXT DEFAULT 'seed', -- 'seed' or 'llm'
+                UNIQUE (level, special_action, archetype, template)
+            )
+            ''')
+
+        if not self.conn.execute("SELECT 1 FROM dialogue_templates LIMIT 1").fetchone():
+            self.add_templates(seed_templates())
+
+    def add_templates(self, rows: List[Tuple[str, str, str, str]], source: str = "seed") -> int:
+        #템플릿 일괄 추가 (중복 무시) - 추가된 키의 메모리 캐시는 비움
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO dialogue_templates (level, special_action, archetype, template, source)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(level, action, archetype, template, source) for level, action, archetype, template in rows])
+            for level, action, archetype, template in rows:
+                self._cache.pop((level, action, archetype), None)
+            return self.conn.total_changes - before
+
+    def templates(self, level: ReputationLevel, special_action: Optional[str], archetype: str) -> Tuple[str, ...]:
+        #키별 템플릿 목록 (없으면 빈 튜플)
+        key = (level.value, special_action or "", archetype)
+        cached = self._cache.get(key)
+        if cached is None:
+            with self._lock:
+                cursor = self.conn.execute('''
+                    SELECT template FROM dialogue_templates
+                    WHERE level = ? AND special_action = ? AND archetype = ?
+                    ORDER BY id
+                ''', key)
+                cached = tuple(row[0] for row in cursor.fetchall())
+            if cached:
+                self._cache[key] = cached
+        return cached
+
+    def fill_with_llm(self, llm, level: ReputationLevel, tone: str, special_action: Optional[str], archetype: str) -> int:
+        #없는 키를 LLM으로 채움 - {npc_name}, {location} 자리표시자를 쓴 변형 여러 개를 JSON 배열로 받아 저장
+        sys_prompt = f"""
+        RPG NPC의 짧은 대사 템플릿 {GENERATED_VARIANTS}개를 만드세요.
+        - NPC 유형: {archetype}
+        - 플레이어 명성 등급: {level.value} (태도: {tone})
+        - 특별 행동: {special_action or "없음"} (있다면 대사에 자연스럽게 포함)
+        - NPC 이름은 {{npc_name}}, 장소는 {{location}} 자리표시자로 쓰고 다른 중괄호는 쓰지 마세요.
+        - 각 대사는 1-2문장, 80자 이내
+        JSON 문자열 배열만 출력하세요.
+        """
+        try:
+            response = llm.invoke([
+                SystemMessage(content=sys_prompt),
+                HumanMessage(content="대사 템플릿 생성")
+            ])
+            content = response.content.strip()
+            generated = json.loads(content[content.find("["):content.rfind("]") + 1])
+        except Exception as e:
+            print(f"대화 템플릿 생성 오류: {e}")
+            return 0
+
+        rows = [(level.value, special_action or "", archetype, template.strip())
+                for template in generated if isinstance(template, str) and _is_valid_template(template)]
+        return self.add_templates(rows, source="llm") if rows else 0
+
+    def get_line(self, rng, level: ReputationLevel, special_action: Optional[str], archetype: str,
+                 npc_name: str, location: str) -> Optional[str]:
+        #키에 맞는 템플릿 하나를 골라 대사 완성 (템플릿이 없으면 None)
+        candidates = self.templates(level, special_action, archetype)
+        if not candidates:
+            return None
+        return choice(rng, candidates).format(npc_name=npc_name, location=location)
+
+    def close(self):
+        self.conn.close()
+
+
+_default_bank: Optional[DialogueBank] = None
+
+
+def get_default_bank() -> DialogueBank:
+    #게임 전체에서 공유하는 기본 대화 뱅크 (처음 사용할 때 열기)
+    global _default_bank
+    if _default_bank is None:
+        _default_bank = DialogueBank()
+    return _default_bank
+
+
+if __name__ == "__main__":
+    # 기본 템플릿을 미리 채우고 로컬 조회 시간 확인
+    import time
+    import numpy as np
+
+    # 템플릿 검사 - 그대로의 {npc_name}, {location}만 허용
+    for template, valid in (("{npc_name}이 {location}에서 인사한다", True), ("{npc_name.title}", False),
+                            ("{npc_name[0]}", False), ("{npc_name!r}", False), ("{location:>9}", False),
+                            ("{player}", False), ("{0}", False), ("{npc_name", False), ("}", False), ("  ", False)):
+        assert _is_valid_template(template) == valid, template
+
+    bank = get_default_bank()
+    count = bank.conn.execute("SELECT COUNT(*) FROM dialogue_templates").fetchone()[0]
+    keys = bank.conn.execute(
+        "SELECT COUNT(*) FROM (SELECT DISTINCT level, special_action, archetype FROM dialogue_templates)"
+    ).fetchone()[0]
+    print(f"{bank.db_path}: 키 {keys}개, 템플릿 {count}개")
+
+    rng = np.random.default_rng(0)
+    lines = 100_000
+    started = time.perf_counter()
+    for _ in range(lines):
+        line = bank.get_line(rng, ReputationLevel.ENEMY, "경비_호출", "경비병", "경비대장", "마을")
+    elapsed = time.perf_counter() - started
+    print(f"예시: {line}")
+    print(f"대사 {lines}개 생성: {elapsed / lines * 1e6:.2f} μs/대사")
@@ -0,0 +1,153 @@
+#조우 시스템 모듈
+#위치 키워드와 명성 구간으로 색인된 적 원형 테이블에서 가중치 추첨으로 적을 생성
+#전투 계산은 실제 적 능력치를 사용하고, LLM은 정해진 적을 묘사만 함
+
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Tuple
+import numpy as np
+from loot_tables import AliasTable
+
+
+@dataclass(frozen=True)
+class EnemyArchetype:
+    #적 원형 정보
+    name: str
+    description: str
+    hp: int
+    attack_bonus: int  # 파티가 받는 피해 범위 증가량
+    defense: int  # 파티가 입히는 피해 범위 감소량
+    reward_multiplier: float  # 경험치/골드 배율
+    weight: float  # 추첨 가중치
+    reputation_bands: Tuple[str, ...] = ("hostile", "neutral", "renowned")
+
+
+# 위치 키워드별 적 원형 (""는 어느 키워드에도 맞지 않는 위치)
+ENEMY_ARCHETYPES = {
+    "숲": [
+        EnemyArchetype("늑대 무리", "굶주린 회색 늑대 서너 마리", 90, 0, 0, 1.0, 3.0),
+        EnemyArchetype("숲 고블린", "덫과 독화살을 쓰는 고블린 사냥꾼", 70, -3, 0, 0.9, 3.0),
+        EnemyArchetype("거대 거미", "나무 사이에 거미줄을 친 독거미", 120, 5, 3, 1.3, 1.5),
+        EnemyArchetype("숲 순찰대", "악명 높은 자를 쫓는 영주의 순찰대", 140, 5, 5, 1.2, 2.0, ("hostile",)),
+        EnemyArchetype("질투하는 용병", "명성을 빼앗으려는 떠돌이 용병", 130, 3, 5, 1.4, 1.5, ("renowned",))
+    ],
+    "동굴": [
+        EnemyArchetype("박쥐 떼", "어둠 속에서 몰려드는 흡혈 박쥐", 50, -5, 0, 0.7, 3.0),
+        EnemyArchetype("산성 슬라임", "닿는 것을 녹이는 산성 점액", 80, 0, 5, 1.0, 2.5),
+        EnemyArchetype("동굴 트롤", "상처가 빠르게 아무는 거대한 트롤", 200, 10, 8, 1.8, 1.0)
+    ],
+    "광산": [
+        EnemyArchetype("코볼트 광부", "곡괭이를 휘두르는 코볼트 무리", 70, 0, 0, 0.9, 3.0),
+        EnemyArchetype("바위 골렘", "광맥에서 깨어난 바위 골렘", 180, 5, 10, 1.6, 1.0)
+    ],
+    "유적": [
+        EnemyArchetype("해골 전사", "녹슨 검을 든 고대의 해골 병사", 100, 3, 3, 1.1, 3.0),
+        EnemyArchetype("망령", "유적에 묶인 원한 맺힌 망령", 90, 5, 0, 1.3, 2.0),
+        EnemyArchetype("고대 골렘", "유적을 지키는 마법 골렘", 220, 8, 10, 2.0, 0.8)
+    ],
+    "던전": [
+        EnemyArchetype("오크 전사", "도끼를 든 오크 돌격병", 130, 5, 3, 1.2, 3.0),
+        EnemyArchetype("다크 엘프 암살자", "그림자에 숨은 암살자", 100, 8, 0, 1.4, 1.5),
+        EnemyArchetype("미노타우로스", "미궁을 지배하는 황소 머리 괴물", 250, 12, 8, 2.2, 0.7)
+    ],
+    "마을": [
+        EnemyArchetype("불량배", "골목을 막아선 술 취한 불량배들", 60, -5, 0, 0.7, 3.0),
+        EnemyArchetype("소매치기 일당", "지갑을 노리는 재빠른 소매치기", 50, -3, 0, 0.8, 2.0),
+        EnemyArchetype("마을 경비대", "수배자를 체포하러 온 경비대", 150, 5, 8, 1.2, 3.0, ("hostile",)),
+        EnemyArchetype("도전자 검객", "이름난 모험가에게 결투를 청하는 검객", 110, 3, 5, 1.5, 2.0, ("renowned",))
+    ],
+    "산": [
+        EnemyArchetype("산적", "산길을 막아선 산적 무리", 100, 0, 3, 1.1, 3.0),
+        EnemyArchetype("하피", "절벽 위에서 날아드는 하피", 80, 3, 0, 1.1, 2.0)
+    ],
+    "": [
+        EnemyArchetype("산적", "길목을 지키는 산적 무리", 100, 0, 3, 1.1, 3.0),
+        EnemyArchetype("야생 멧돼지", "흥분한 거대 멧돼지", 80, 0, 0, 0.9, 3.0),
+        EnemyArchetype("고블린 정찰병", "무리를 부르는 고블린 정찰병", 60, -3, 0, 0.8, 2.5),
+        EnemyArchetype("현상금 사냥꾼", "플레이어의 목에 걸린 현상금을 노리는 자", 140, 5, 5, 1.4, 2.0, ("hostile",))
+    ]
+}
+
+REPUTATION_BANDS = ("hostile", "neutral", "renowned")
+
+
+def reputation_band(reputation: int) -> str:
+    #명성 구간 (험악 이하 / 중립 부근 / 호의 이상)
+    if reputation <= -21:
+        return "hostile"
+    if reputation >= 20:
+        return "renowned"
+    return "neutral"
+
+
+def encounter_keyword(location: str) -> str:
+    #위치 이름에서 조우 테이블 키워드 찾기
+    for keyword in ENEMY_ARCHETYPES:
+        if keyword and keyword in (location or ""):
+            return keyword
+    return ""
+
+
+def _compile_index() -> Dict[Tuple[str, str], Tuple[List[EnemyArchetype], AliasTable]]:
+    #(키워드, 명성 구간)별 후보 목록과 alias 테이블 미리 컴파일
+    index = {}
+    for keyword, archetypes in ENEMY_ARCHETYPES.items():
+        for band in REPUTATION_BANDS:
+            candidates = [enemy for enemy in archetypes if band in enemy.reputation_bands]
+            index[(keyword, band)] = (candidates, AliasTable([enemy.weight for enemy in candidates]))
+    return index
+
+
+ENCOUNTER_INDEX = _compile_index()
+
+
+@dataclass
+class Encounter:
+    #실제 전투에 등장한 적
+    name: str
+    description: str
+    hp: int
+    attack_bonus: int
+    defense: int
+    reward_multiplier: float
+    location: str
+    reputation_band: str
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class EncounterSystem:
+    #조우 생성
+
+    def generate(self, rng: np.random.Generator, location: str, reputation: int) -> Encounter:
+        #위치와 명성에 맞는 적 하나 추첨
+        band = reputation_band(reputation)
+        candidates, table = ENCOUNTER_INDEX[(encounter_keyword(location), band)]
+        enemy = candidates[int(table.sample(rng, 1)[0])]
+
+        # 같은 원형이라도 체력은 ±10% 변동
+        hp = int(enemy.hp * rng.uniform(0.9, 1.1))
+
+        return Encounter(
+            name=enemy.name,
+            description=enemy.description,
+            hp=hp,
+            attack_bonus=enemy.attack_bonus,
+            defense=enemy.defense,
+            reward_multiplier=enemy.reward_multiplier,
+            location=location,
+            reputation_band=band
+        )
+
+    def generate_batch(self, rng: np.random.Generator, location: str, reputation: int, count: int) -> Dict[str, np.ndarray]:
+        #위치와 명성에 맞는 적 count개를 한 번에 추첨 (전투 추정용 - generate와 같은 분포의 능력치 배열만 반환)
+        candidates, table = ENCOUNTER_INDEX[(encounter_keyword(location), reputation_band(reputation))]
+        picks = table.sample(rng, count)
+        stats = lambda field: np.asarray([getattr(enemy, field) for enemy in candidates])[picks]
+
+        return {
+            "hp": (stats("hp") * rng.uniform(0.9, 1.1, count)).astype(np.int64),
+            "attack_bonus": stats("attack_bonus").astype(np.int64),
+            "defense": stats("defense").astype(np.int64),
+            "reward_multiplier": stats("reward_multiplier").astype(np.float64)
+        }
@@ -22,6 +22,7 @@ class GameGraph:
                 "character_creation": "character_creation",  # 캐릭터 생성 추가
                 "main_story_start": "main_story_start",      # 메인 스토리 시작 추가
                 "battle": "battle",
+                "battle_narration": "battle_narration",
                 "companion_opportunity": "companion_opportunity",
                 "companion_decision": "companion_decision",
                 "companion_accept": "companion_accept",
@@ -56,6 +57,7 @@ class GameGraph:
         workflow.add_node("intent_analysis", self.game_nodes.intent_analysis_node)
         workflow.add_node("story_continue", self.game_nodes.story_continue_node)
         workflow.add_node("battle", self.game_nodes.battle_node)
+        workflow.add_node("battle_narration", self.game_nodes.battle_narration_node)
         
         # 동료 관리 노드들 (기존 + 새로 추가)
         workflow.add_node("companion_opportunity", self.game_nodes.companion_opportunity_node)
@@ -148,8 +150,9 @@ class GameGraph:
         workflow.add_edge("use_potion", "inventory_action")
         workflow.add_edge("use_heal", "inventory_action")
         
-        # 전투 후 아이템 보상
-        workflow.add_edge("battle", "item_reward")
+        # 전투 통계 → 전투 장면 → 아이템 보상
+        workflow.add_edge("battle", "battle_narration")
+        workflow.add_edge("battle_narration", "item_reward")
         
         # 대부분의 노드에서 user_input으로 복귀 (새 노드들 추가)
         for node in ["story_continue", "companion_accept", "companion_reject", 
@@ -10,22 +10,29 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from models import PlayerInitState, Player
 from story_manager import StoryManager
 from reputation_system import ReputationManager
+from action_classifier import ActionClassifier
 from battle_system import BattleSystem
 from inventory_system import InventorySystem, ShopSystem, ItemRewardSystem
 from database import MainStoryDB
+from rng import GameRNG
 from character_creation import CharacterCreator, show_character_creation_help
 
 class GameNodes:
     #게임 노드들 집합
 
-    def __init__(self):
+    def __init__(self, rng: GameRNG = None):
         self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+        # 세션 난수 - 전투/보상/대화가 같은 시드의 서브스트림을 사용
+        self.rng = rng if rng is not None else GameRNG()
         self.story_manager = StoryManager()
-        self.reputation_manager = ReputationManager()
-        self.battle_system = BattleSystem()
+        self.reputation_manager = ReputationManager(self.rng)
+        self.action_classifier = ActionClassifier()
+        self._turn_actions = (0, set())  # (턴 번호, 이번 턴에 적용한 명성 행동)
+        self.battle_system = BattleSystem(self.rng)
         self.inventory_system = InventorySystem()
         self.shop_system = ShopSystem()
-        self.item_reward_system = ItemRewardSystem()
+        self.item_reward_system = ItemRewardSystem(self.rng)
+        self.pending_battle_narration = None  # 생성 중인 전투 장면
         self.character_creator = CharacterCreator()
 
     def user_input_node(self, state: PlayerInitState) -> PlayerInitState:
@@ -268,6 +275,23 @@ class GameNodes:
 
         actual_goal = self.story_manager.extract_main_objective(first_ai_message)
 
+        #명성 행동은 로컬에서 분류 - 규칙/모델이 행동을 찾았으면 LLM에게 명성 영향 판단을 함께 요청해 교차 확인
+        classification = self.action_classifier.classify(user_message)
+        reputation_field = ""
+        reputation_guide = ""
+        if classification.candidate is not None:
+            reputation_field = '''
+                "reputation_impact": "명성에 미치는 영향 (positive/negative/neutral)",'''
+            reputation_guide = """
+            명성 시스템 고려사항:
+            - 선한 행동 → positive 영향
+            - 악한 행동 → negative 영향
+            - 중립적 행동 → neutral 영향
+            """
+            if classification.intent:
+                reputation_guide += """- 사용자 입력은 아직 결과가 아닌 의도/시도입니다 - 결과를 이룬 것으로 판단하지 마세요
+            """
+
         sys_prompt = f"""
             당신은 RPG 게임의 상황 분석 AI입니다.
             명성 시스템이 적용된 게임에서 사용자 입력을 분석하세요.
@@ -286,8 +310,7 @@ class GameNodes:
                 "next_action": "battle|companion_opportunity|story_continue|inventory|item_reward|shop_purchase|reputation_check",
                 "reason": "판단 이유",
                 "story_response": "이전 상황과 자연스럽게 이어지는 스토리 (200자 내외)",
-                "location_update": "새로운 위치명 (이동 시에만)",
-                "reputation_impact": "명성에 미치는 영향 (positive/negative/neutral)",
+                "location_update": "새로운 위치명 (이동 시에만)",{reputation_field}
                 "important_event": "중요한 사건 (있을 경우에만)"
             }}
         
@@ -301,12 +324,7 @@ class GameNodes:
             7. **companion_opportunity**: 동료 영입 ("누군가 만나고 싶어", "동료 찾기", "새로운 동료") (현재 {companion_count}/2명)
             8. **story_continue**: 위치 이동, 탐험, 대화 등 일반 게임 진행
             9. **item_reward**: 전투/탐험 완료 후 보상 상황
-        
-            명성 시스템 고려사항:
-            - 선한 행동 → positive 영향
-            - 악한 행동 → negative 영향
-            - 중립적 행동 → neutral 영향
-            """
+            {reputation_guide}"""
     
         try:
             response = self.llm.invoke([
@@ -316,15 +334,9 @@ class GameNodes:
             
             analysis = json.loads(response.content)
             #명성 변화 처리
-            reputation_change = 0
-            reputation_reason = ""
-
-            if analysis.get("reputation_impact") == "positive":
-                reputation_change = 2
-                reputation_reason = "선한 행동"
-            elif analysis.get("reputation_impact") == "negative":
-                reputation_change = -2
-                reputation_reason = "의심스러운 행동"
+            reputation_change, reputation_reason = self._classified_reputation_change(
+                classification, analysis.get("reputation_impact"), len(user_messages)
+            )
 
             # 컨텍스트 업데이트
             updated_state = self.story_manager.update_story_context(
@@ -353,6 +365,40 @@ class GameNodes:
             }
         
 
+    def _classified_reputation_change(self, classification, reputation_impact: str = None, turn: int = 0) -> tuple:
+        #분류된 행동의 (명성 변화, 사유) - 모호하면 LLM 판단과 후보 행동의 방향이 같을 때만 후보 행동을 적용
+        #결과 행동을 의도로만 말한 경우(도전한다, 지키자)는 LLM이 동의해도 결과 보상 대신 작은 변화만
+        #확정된 행동이라도 LLM 판단이 방향과 맞지 않으면(중립 포함) 적용하지 않음 - 언급만 한 문장 등의 오분류 방지
+        #같은 행동은 한 턴(사용자 입력 하나)에 한 번만 적용
+        action = classification.action
+        change, reason = 0, ""
+        if action is not None and reputation_impact is not None:
+            action_change = self.reputation_manager.calculate_reputation_change(action)
+            if reputation_impact != ("positive" if action_change > 0 else "negative"):
+                return 0, ""
+        if action is None and classification.ambiguous:
+            candidate_change = self.reputation_manager.calculate_reputation_change(classification.candidate)
+            if not classification.intent and (
+                    (reputation_impact == "positive" and candidate_change > 0) or
+                    (reputation_impact == "negative" and candidate_change < 0)):
+                action = classification.candidate
+            elif reputation_impact == "positive":
+                change, reason = 2, "선한 행동"
+            elif reputation_impact == "negative":
+                change, reason = -2, "의심스러운 행동"
+        
+        if action is not None:
+            change, reason = self.reputation_manager.calculate_reputation_change(action), action.replace("_", " ")
+        if change == 0:
+            return 0, ""
+        
+        if self._turn_actions[0] != turn:
+            self._turn_actions = (turn, set())
+        if reason in self._turn_actions[1]:
+            return 0, ""
+        self._turn_actions[1].add(reason)
+        return change, reason
+
     def story_continue_node(self, state: PlayerInitState) -> PlayerInitState:
         #일반적인 스토리 진행
 
@@ -364,8 +410,10 @@ class GameNodes:
         user_messages = [msg for msg in state["messages"] if isinstance(msg, HumanMessage)]
         last_user_input = user_messages[-1].content if user_messages else ""
     
-        # 현재 명성 조회
-        current_reputation = self._get_current_reputation(state)
+        # 현재 위치에서의 평판 조회 (주민들의 태도는 지역 평판 기준)
+        current_reputation = self.reputation_manager.get_local_reputation(
+            state.get("main_story_db"), state.get("main_story_player_id"), current_location
+        )
         reputation_response = self.reputation_manager.get_reputation_response(
             current_reputation, "주민들", current_location
         )
@@ -457,13 +505,13 @@ class GameNodes:
             }
         
     def battle_node(self, state: PlayerInitState) -> PlayerInitState:
-        #전투 상황 처리
+        #전투 상황 처리 - 전투 판정, 결과 적용, 통계는 바로 처리하고 전투 장면은 백그라운드 생성
 
         # 전투 시뮬레이션
         battle_data = self.battle_system.simulate_battle(state)
         
-        # 전투 장면 생성
-        battle_scene = self.battle_system.generate_dynamic_battle_scene(state, battle_data)
+        # 전투 장면 생성 시작 (명성 반영 프롬프트는 결과 적용 전에 구성)
+        self.pending_battle_narration = self.battle_system.start_battle_narration(state, battle_data)
         
         # 전투 통계 생성
         battle_summary = self.battle_system.create_battle_summary(battle_data)
@@ -472,8 +520,6 @@ class GameNodes:
         battle_report = f"""
 ⚔️ **전투 발생!**
 
-{battle_scene}
-
 **📊 전투 통계**:
 {chr(10).join(battle_summary)}
 """
@@ -487,10 +533,26 @@ class GameNodes:
         result = {
             **updated_state,
             "messages": updated_state["messages"] + [AIMessage(content=battle_report)],
-            "next_action": "item_reward"
+            "next_action": "battle_narration"
         }
         return result
     
+    def battle_narration_node(self, state: PlayerInitState) -> PlayerInitState:
+        #전투 장면 출력 - 지연 한도 안에 생성되지 않으면 기본 장면 사용
+        narration = self.pending_battle_narration
+        self.pending_battle_narration = None
+        
+        if narration is None:
+            return {**state, "next_action": "item_reward"}
+        
+        battle_scene = self.battle_system.wait_battle_narration(narration)
+        
+        return {
+            **state,
+            "messages": state["messages"] + [AIMessage(content=battle_scene)],
+            "next_action": "item_reward"
+        }
+    
     def inventory_node(self, state: PlayerInitState) -> PlayerInitState:
         #인벤토리 노드
 
@@ -1077,13 +1139,7 @@ class GameNodes:
     
         try:
             # DB에서 동료를 파티에서 제거 (삭제하지 않고 is_in_party만 False로)
-            cursor = main_db.conn.cursor()
-            cursor.execute('''
-                UPDATE main_story_characters 
-                SET is_in_party = FALSE, current_location = ? 
-                WHERE id = ?
-            ''', (f"{current_location} 근처", companion_id))
-            main_db.conn.commit()
+            main_db.leave_party(companion_id, f"{current_location} 근처")
         
             # 상태에서 동료 ID 제거
             if companion_id in companion_ids:
@@ -1259,17 +1315,41 @@ class GameNodes:
         current_reputation = self._get_current_reputation(state)
         reputation_status = self.reputation_manager.get_reputation_status_message(current_reputation)
         
+        # 현재 위치의 지역 평판 (상점 가격/NPC 태도 기준)
+        current_location = state.get("current_location", "알 수 없는 곳")
+        local_reputation = self.reputation_manager.get_local_reputation(main_db, player_id, current_location)
+        reputation_tier = self.reputation_manager.get_reputation_tier(local_reputation)
+        regional_reputations = main_db.get_regional_reputations(player_id)
+        regional_info = ", ".join(
+            f"{region} {reputation:+d}" for region, reputation in
+            sorted(regional_reputations.items(), key=lambda item: -abs(item[1]))[:5]
+        ) or "아직 없음"
+        
         # 명성 변화 기록 조회
         reputation_history = main_db.get_reputation_history(player_id, 5)
         
+        # 명성 추세 (시계열 버킷만 조회 - 전체 변화 기록을 훑지 않음)
+        daily_trend = self.reputation_manager.format_reputation_trend(
+            main_db.get_reputation_series(player_id, "day", limit=30, points=10)
+        )
+        session_trend = self.reputation_manager.format_reputation_trend(
+            main_db.get_reputation_series(player_id, "session", limit=10)
+        )
+        
         reputation_msg = f"""
         **명성 현황**
         {reputation_status}
+        📍 {current_location} 지역 평판: {local_reputation}
+        🗺️ 지역별 명성: {regional_info}
+
+        **명성 효과 ({current_location}):**
+        • 상점 가격: {reputation_tier.price_modifier * 100:.0f}% (기본 100%)
+        • NPC 호감도: {reputation_tier.willingness_to_help * 100:.0f}%
+        • 태도: {reputation_tier.tone}
 
-        **명성 효과:**
-        • 상점 가격: {self.reputation_manager.get_reputation_response(current_reputation).price_modifier * 100:.0f}% (기본 100%)
-        • NPC 호감도: {self.reputation_manager.get_reputation_response(current_reputation).willingness_to_help * 100:.0f}%
-        • 태도: {self.reputation_manager.get_reputation_response(current_reputation).tone}
+        **명성 추세:**
+        • 최근 30일: {daily_trend}
+        • 최근 세션: {session_trend}
 
         **최근 명성 변화:**
         """
@@ -1307,8 +1387,6 @@ class GameNodes:
         player_id = state.get("main_story_player_id")
         
         if main_db and player_id:
-            player_data = main_db.get_character(player_id)
-            if player_data:
-                return player_data['reputation']
+            return main_db.get_reputation(player_id)
         
         return 0
\ No newline at end of file
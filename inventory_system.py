@@ -1,31 +1,46 @@
 #인벤토리 및 상정 시스템 모듈
 #아이템 관리, 상점 거래 등을 처리한다
 
-import random
+from collections import Counter
 from typing import Dict, List, Optional, Tuple
 from models import Item, ShopItem, GAME_CONSTANTS
 from reputation_system import ReputationManager
+from rng import GameRNG, choice, randint
+from loot_tables import LootTables, difficulty_for_damage
+from regional_reputation import region_for_location
+from item_catalog import ITEMS_BY_NAME, LOOT_ITEM_NAMES, QUEST_REWARD_NAMES, catalog_tuples
 
 class InventorySystem:
     #인벤토리 시스템 클래스
 
-    def __init__(self):
-        self.reputation_manager = ReputationManager()
+    def __init__(self, llm=None):
+        self.reputation_manager = ReputationManager(llm=llm)
+        # 마지막으로 만든 인벤토리 화면 (뷰 버전, 명성, 골드) -> 문자열
+        self._display_cache: Optional[Tuple[Tuple, str]] = None
     
     def get_inventory_display(self, state: Dict) -> str:
-        #인벤토리 표시 생성
+        #인벤토리 표시 생성 (파티/인벤토리 뷰 버전과 명성/골드가 그대로면 이전 화면 재사용 - SQL 없음)
         main_db = state.get("main_story_db")
         player_id = state.get("main_story_player_id")
-        current_gold = state.get("player_gold", 0)
         
         if not main_db or not player_id:
             return "인벤토리에 접근할 수 없습니다."
         
-        # 인벤토리 조회
+        # 파티 HP/MP 상태 조회 (파티 뷰)
+        party_status = main_db.get_party_status()
+        current_gold = next((char[10] for char in party_status if char[0] == player_id), state.get("player_gold", 0))
+        
+        # 현재 명성 조회
+        current_reputation = self._get_current_reputation(state)
+        
+        cache_key = (player_id, main_db.party_version(), main_db.inventory_version(player_id),
+                     current_reputation, current_gold)
+        if self._display_cache is not None and self._display_cache[0] == cache_key:
+            return self._display_cache[1]
+        
+        # 인벤토리 조회 (인벤토리 뷰)
         inventory = main_db.get_inventory(player_id)
         
-        # 파티 HP/MP 상태 조회
-        party_status = main_db.get_party_status()
         party_hp_info = []
         
         for char in party_status:
@@ -44,8 +59,6 @@ class InventorySystem:
         healers = [char for char in party_hp_info 
                   if "성직자" in char.get("name", "") or "priest" in char.get("name", "").lower()]
         
-        # 현재 명성 조회
-        current_reputation = self._get_current_reputation(state)
         reputation_status = self.reputation_manager.get_reputation_status_message(current_reputation)
         
         inventory_display = f"""
@@ -101,6 +114,7 @@ class InventorySystem:
         어떻게 하시겠습니까?
         """
         
+        self._display_cache = (cache_key, inventory_display)
         return inventory_display
     
     def use_potion(self, state: Dict) -> str:
@@ -127,6 +141,8 @@ class InventorySystem:
     def _use_hp_potion(self, main_db, player_id: int, potion_info: Tuple) -> str:
         #HP 물약 사용
         item_id, item_name, item_type, quantity, description, value = potion_info
+        item = main_db.get_item(item_id)
+        effect = item.hp_effect if item and item.hp_effect else GAME_CONSTANTS["HEALING_POTION_EFFECT"]
         
         # 파티원들의 HP 회복
         party_status = main_db.get_party_status()
@@ -135,7 +151,7 @@ class InventorySystem:
         for char in party_status:
             char_id, name, char_type, hp, max_hp, mp, max_mp, is_alive, relationship, reputation, gold = char
             if is_alive and hp < max_hp:
-                heal_amount = min(GAME_CONSTANTS["HEALING_POTION_EFFECT"], max_hp - hp)
+                heal_amount = min(effect, max_hp - hp)
                 new_hp, new_mp = main_db.heal_character(char_id, heal_amount, 0)
                 healed_members.append(f"{name} (+{heal_amount} HP)")
         
@@ -153,6 +169,8 @@ class InventorySystem:
     def _use_mp_potion(self, main_db, player_id: int, potion_info: Tuple) -> str:
         #MP 물약 사용
         item_id, item_name, item_type, quantity, description, value = potion_info
+        item = main_db.get_item(item_id)
+        effect = item.mp_effect if item and item.mp_effect else GAME_CONSTANTS["MANA_POTION_EFFECT"]
         
         # 파티원들의 MP 회복
         party_status = main_db.get_party_status()
@@ -161,7 +179,7 @@ class InventorySystem:
         for char in party_status:
             char_id, name, char_type, hp, max_hp, mp, max_mp, is_alive, relationship, reputation, gold = char
             if is_alive and mp < max_mp:
-                heal_amount = min(GAME_CONSTANTS["MANA_POTION_EFFECT"], max_mp - mp)
+                heal_amount = min(effect, max_mp - mp)
                 new_hp, new_mp = main_db.heal_character(char_id, 0, heal_amount)
                 healed_members.append(f"{name} (+{heal_amount} MP)")
         
@@ -224,53 +242,43 @@ class InventorySystem:
         player_id = state.get("main_story_player_id")
         
         if main_db and player_id:
-            player_data = main_db.get_character(player_id)
-            if player_data:
-                return player_data['reputation']
+            return main_db.get_reputation(player_id)
         
         return 0
     
+# 상점 판매 목록 (모든 상점 공통 - stock은 상점별 최대 재고, 현재 재고는 DB의 shop_stock)
+SHOP_CATALOG = {
+    item_name: ShopItem(
+        name=item_name,
+        price=ITEMS_BY_NAME[item_name].value,
+        type=ITEMS_BY_NAME[item_name].type,
+        description=ITEMS_BY_NAME[item_name].description,
+        stock=stock
+    )
+    for item_name, stock in (("치유 물약", 10), ("마나 물약", 10), ("강화된 방패", 3), ("어둠의 결정", 5))
+}
+
+# 아이템명 -> 최대 재고
+SHOP_STOCK_LIMITS = {item_name: item_info["stock"] for item_name, item_info in SHOP_CATALOG.items()}
+
+
 class ShopSystem:
     #상점 시스템 클래스
     
-    def __init__(self):
-        self.reputation_manager = ReputationManager()
-        self.base_shop_items = {
-            "치유 물약": ShopItem(
-                name="치유 물약",
-                price=50,
-                type="hp_potion",
-                description="HP를 50 회복시키는 물약",
-                stock=10
-            ),
-            "마나 물약": ShopItem(
-                name="마나 물약",
-                price=50,
-                type="mp_potion",
-                description="MP를 30 회복시키는 물약",
-                stock=10
-            ),
-            "강화된 방패": ShopItem(
-                name="강화된 방패",
-                price=200,
-                type="shield",
-                description="방어력을 증가시키는 방패",
-                stock=3
-            ),
-            "어둠의 결정": ShopItem(
-                name="어둠의 결정",
-                price=100,
-                type="crystal",
-                description="어둠의 적에게 추가 피해를 주는 결정",
-                stock=5
-            )
-        }
+    def __init__(self, llm=None):
+        self.reputation_manager = ReputationManager(llm=llm)
+        self.base_shop_items = SHOP_CATALOG
 
     def get_shop_display(self, state: Dict) -> str:
         #상점 표시 생성
-        current_gold = state.get("player_gold", 0)
+        main_db = state.get("main_story_db")
+        player_id = state.get("main_story_player_id")
+        current_gold = main_db.get_gold(player_id) if main_db and player_id else state.get("player_gold", 0)
         current_reputation = self._get_current_reputation(state)
         
+        # 상점 지역별 현재 재고 (보충 시각이 지났으면 이때 채워짐)
+        stock = main_db.get_shop_stock(self._shop_location(state), SHOP_STOCK_LIMITS) if main_db else SHOP_STOCK_LIMITS
+        
         # 명성에 따른 가격 조정
         reputation_response = self.reputation_manager.get_reputation_response(current_reputation)
         
@@ -291,7 +299,9 @@ class ShopSystem:
             shop_display += f"• {item_name}: {adjusted_price}골드"
             if adjusted_price != item_info["price"]:
                 shop_display += f" (원가: {item_info['price']}골드)"
-            shop_display += f" - {item_info['description']}\n"
+            item_stock = stock.get(item_name, 0)
+            stock_label = f"재고 {item_stock}" if item_stock else "품절"
+            shop_display += f" - {item_info['description']} [{stock_label}]\n"
         
         shop_display += f"""
         **구매 방법**: "물약 구입", "방패 구입" 등으로 말하세요.
@@ -300,70 +310,77 @@ class ShopSystem:
         
         return shop_display
     
-    def process_purchase(self, state: Dict, item_name: str, quantity: int = 1) -> str:
-        #구매 처리
+    def try_purchase(self, state: Dict, item_name: str, quantity: int = 1) -> Dict:
+        #구매 시도 - 결과(status)와 가격/남은 골드/남은 재고를 담은 dict 반환 (메시지는 process_purchase에서)
+        #status: ok, unavailable, unknown_item, reputation, out_of_stock, not_enough_gold
         main_db = state.get("main_story_db")
         player_id = state.get("main_story_player_id")
-        current_gold = state.get("player_gold", 0)
-        current_reputation = self._get_current_reputation(state)
         
         if not main_db or not player_id:
-            return "구매할 수 없습니다."
+            return {"status": "unavailable"}
         
         # 아이템 존재 확인
         if item_name not in self.base_shop_items:
-            return "해당 아이템을 찾을 수 없습니다."
+            return {"status": "unknown_item"}
         
         item_info = self.base_shop_items[item_name]
-        
-        # 명성에 따른 가격 조정
-        adjusted_price = self.reputation_manager.apply_reputation_to_price(
-            item_info["price"], current_reputation
-        )
-        total_cost = adjusted_price * quantity
-        
-        # 골드 확인
-        if current_gold < total_cost:
-            return f"골드가 부족합니다! 현재 골드: {current_gold}, 필요한 골드: {total_cost}"
+        current_reputation = self._get_current_reputation(state)
         
         # 서비스 접근 권한 확인
         if not self.reputation_manager.can_access_service(current_reputation, "기본_상점"):
-            return "현재 명성으로는 이 상점을 이용할 수 없습니다."
+            return {"status": "reputation"}
         
-        # 구매 처리
-        new_gold = current_gold - total_cost
-        state["player_gold"] = new_gold
-        
-        # 골드 DB 업데이트
-        main_db.update_gold(player_id, -total_cost)
-        
-        # 아이템 추가
-        main_db.add_item(
-            player_id,
-            item_name,
-            item_info["type"],
-            quantity,
-            item_info["description"],
-            item_info["price"]
+        # 명성에 따른 가격 조정
+        adjusted_price = self.reputation_manager.apply_reputation_to_price(
+            item_info["price"], current_reputation
         )
         
-        # 거래 기록
-        main_db.record_shop_transaction(
+        # 재고/골드 확인과 차감, 아이템 지급, 거래 기록을 한 트랜잭션으로
+        status, gold, stock = main_db.purchase_item(
             player_id,
-            item_name,
+            self._shop_location(state),
+            SHOP_STOCK_LIMITS,
+            (item_name, item_info["type"], item_info["description"], item_info["price"]),
             quantity,
             adjusted_price,
-            total_cost,
-            "buy",
             state.get("current_location", "상점")
         )
+        state["player_gold"] = gold
+        
+        return {
+            "status": status,
+            "unit_price": adjusted_price,
+            "total_cost": adjusted_price * quantity,
+            "gold": gold,
+            "stock": stock
+        }
+    
+    def process_purchase(self, state: Dict, item_name: str, quantity: int = 1) -> str:
+        #구매 처리
+        result = self.try_purchase(state, item_name, quantity)
+        status = result["status"]
+        
+        if status == "unavailable":
+            return "구매할 수 없습니다."
+        if status == "unknown_item":
+            return "해당 아이템을 찾을 수 없습니다."
+        if status == "reputation":
+            return "현재 명성으로는 이 상점을 이용할 수 없습니다."
+        if status == "out_of_stock":
+            return f"{item_name}의 재고가 부족합니다! 남은 재고: {result['stock']}개 (잠시 후 다시 입고됩니다)"
+        if status == "not_enough_gold":
+            return f"골드가 부족합니다! 현재 골드: {result['gold']}, 필요한 골드: {result['total_cost']}"
+        
+        item_info = self.base_shop_items[item_name]
+        adjusted_price = result["unit_price"]
         
         # 구매 완료 메시지
         purchase_msg = f"""
         **구매 완료!**
         • {item_name} x{quantity} 구매
-        • 소모된 골드: {total_cost}
-        • 남은 골드: {new_gold}
+        • 소모된 골드: {result['total_cost']}
+        • 남은 골드: {result['gold']}
+        • 남은 재고: {result['stock']}
         """
         
         if adjusted_price != item_info["price"]:
@@ -382,34 +399,30 @@ class ShopSystem:
         
         return purchase_msg
     
+    def _shop_location(self, state: Dict) -> str:
+        #재고를 공유하는 상점 단위 (위치가 속한 지역)
+        return region_for_location(state.get("current_location", "")) or "상점"
+    
     def _get_current_reputation(self, state: Dict) -> int:
-        #현재 명성 조회
-        main_db = state.get("main_story_db")
-        player_id = state.get("main_story_player_id")
-        
-        if main_db and player_id:
-            player_data = main_db.get_character(player_id)
-            if player_data:
-                return player_data['reputation']
-        
-        return 0
+        #현재 위치에서의 평판 조회 (상점 가격은 지역 평판 기준)
+        return self.reputation_manager.get_local_reputation(
+            state.get("main_story_db"), state.get("main_story_player_id"), state.get("current_location", "")
+        )
 
 class ItemRewardSystem:
     #아이템 보상 시스템 클래스
         
-    def __init__(self):
-        self.possible_items = [
-            ("체력 물약", "hp_potion", "체력을 50 회복시키는 물약", 50),
-            ("마나 물약", "mp_potion", "마나를 30 회복시키는 물약", 50),
-            ("고급 체력 물약", "hp_potion", "체력을 100 회복시키는 강력한 물약", 100),
-            ("마법 두루마리", "scroll", "일회용 마법 아이템", 75),
-            ("은화", "currency", "귀중한 화폐", 25),
-            ("빵", "food", "허기를 달래는 음식", 10),
-            ("철광석", "material", "무기 제작에 사용되는 재료", 30),
-            ("마법 가루", "material", "마법 아이템 제작 재료", 40),
-            ("낡은 지도", "misc", "보물의 위치를 알려주는 지도", 200),
-            ("반지", "accessory", "능력을 향상시키는 반지", 150)
-        ]
+    def __init__(self, rng: GameRNG = None):
+        self.rng = rng if rng is not None else GameRNG()
+        self.possible_items = catalog_tuples(LOOT_ITEM_NAMES)
+        
+        # 탐험에서는 소모품과 재료 위주로 발견
+        self.exploration_items = [item for item in self.possible_items 
+                                  if item[1] in ["hp_potion", "mp_potion", "food", "material", "currency"]]
+        
+        # 위치/난이도별 가중치 드롭 테이블
+        self.battle_loot = LootTables(self.possible_items)
+        self.exploration_loot = LootTables(self.exploration_items)
     
     def generate_battle_rewards(self, state: Dict, battle_data: Dict) -> str:
         #전투 후 아이템 보상 생성
@@ -420,33 +433,33 @@ class ItemRewardSystem:
         if not main_db or not player_id:
             return "보상을 받을 수 없습니다."
         
+        # 전멸한 전투는 전리품 없음
+        enemy = battle_data.get("enemy")
+        if enemy and enemy.get("outcome") == "defeat":
+            return "파티가 쓰러져 전리품을 챙기지 못했습니다."
+        
         # 전투 난이도에 따른 보상 수량 결정
         total_damage = battle_data.get("total_damage_dealt", 0)
         critical_hits = len(battle_data.get("critical_hits", []))
         
-        # 1-3개 아이템 랜덤 획득
-        base_item_count = 1
-        if total_damage > 150:
-            base_item_count = 3
-        elif total_damage > 100:
-            base_item_count = 2
+        # 난이도(데미지 구간)에 따라 1-3개 아이템 획득
+        difficulty = difficulty_for_damage(total_damage)
+        base_item_count = {"easy": 1, "normal": 2, "hard": 3}[difficulty]
         
         bonus_items = critical_hits // 2  # 크리티컬 히트 2개당 보너스 아이템 1개
         num_items = min(5, base_item_count + bonus_items)
         
-        obtained_items = []
+        # 위치/난이도별 드롭 테이블에서 정확히 num_items개 추첨 (희귀 아이템은 가중치로 반영)
+        loot_rng = self.rng.stream("loot")
+        items = self.battle_loot.draw(loot_rng, num_items, current_location, difficulty)
+        quantities = loot_rng.integers(1, 3, endpoint=True, size=num_items)
         
-        for _ in range(num_items):
-            item_name, item_type, description, value = random.choice(self.possible_items)
-            quantity = random.randint(1, 3)
-            
-            # 희귀 아이템 확률 조정
-            if item_type in ["accessory", "misc"] and random.random() > 0.3:
-                continue  # 희귀 아이템은 30% 확률로만 획득
-            
-            # DB에 아이템 추가
-            main_db.add_item(player_id, item_name, item_type, quantity, description, value)
-            obtained_items.append(f"{item_name} x{quantity}")
+        drops = Counter()
+        for item, quantity in zip(items, quantities.tolist()):
+            drops[item] += quantity
+        
+        # DB에 아이템 일괄 추가 (같은 아이템은 합쳐서 커밋 1회)
+        obtained_items = self._store_drops(main_db, player_id, drops)
         
         # 보상 메시지 생성
         reward_msg = f"""
@@ -473,20 +486,17 @@ class ItemRewardSystem:
             return "아이템을 발견할 수 없습니다."
         
         # 탐험 보상은 전투 보상보다 적음
-        num_items = random.randint(1, 2)
-        obtained_items = []
+        loot_rng = self.rng.stream("loot")
+        num_items = randint(loot_rng, 1, 2)
+        items = self.exploration_loot.draw(loot_rng, num_items, current_location)
+        quantities = loot_rng.integers(1, 2, endpoint=True, size=num_items)
         
-        for _ in range(num_items):
-            # 탐험에서는 소모품과 재료 위주로 발견
-            exploration_items = [item for item in self.possible_items 
-                               if item[1] in ["hp_potion", "mp_potion", "food", "material", "currency"]]
-            
-            item_name, item_type, description, value = random.choice(exploration_items)
-            quantity = random.randint(1, 2)
-            
-            # DB에 아이템 추가
-            main_db.add_item(player_id, item_name, item_type, quantity, description, value)
-            obtained_items.append(f"{item_name} x{quantity}")
+        drops = Counter()
+        for item, quantity in zip(items, quantities.tolist()):
+            drops[item] += quantity
+        
+        # DB에 아이템 일괄 추가
+        obtained_items = self._store_drops(main_db, player_id, drops)
         
         reward_msg = f"""
         **탐험 중 발견!**
@@ -501,6 +511,14 @@ class ItemRewardSystem:
         
         return reward_msg
     
+    def _store_drops(self, main_db, player_id: int, drops: Counter) -> List[str]:
+        #집계된 드롭을 한 번에 저장하고 표시용 목록 반환
+        main_db.add_items(player_id, [
+            (item_name, item_type, quantity, description, value)
+            for (item_name, item_type, description, value), quantity in drops.items()
+        ])
+        return [f"{item[0]} x{quantity}" for item, quantity in drops.items()]
+    
     def give_quest_reward(self, state: Dict, quest_type: str) -> str:
         #퀘스트 완료 보상
         main_db = state.get("main_story_db")
@@ -509,27 +527,9 @@ class ItemRewardSystem:
         if not main_db or not player_id:
             return "보상을 받을 수 없습니다."
         
-        # 퀘스트 타입별 보상 설정
-        quest_rewards = {
-            "main_quest": [
-                ("전설의 검", "weapon", "고대의 힘이 깃든 검", 500),
-                ("마법 갑옷", "armor", "마법 방어력을 제공하는 갑옷", 400),
-                ("지혜의 반지", "accessory", "지능을 증가시키는 반지", 300)
-            ],
-            "side_quest": [
-                ("고급 체력 물약", "hp_potion", "체력을 100 회복시키는 물약", 100),
-                ("마법 두루마리", "scroll", "강력한 마법 두루마리", 75),
-                ("은화", "currency", "퀘스트 보상금", 50)
-            ],
-            "rescue_quest": [
-                ("감사의 목걸이", "accessory", "구조에 대한 감사의 표시", 200),
-                ("축복의 물약", "hp_potion", "신의 축복이 깃든 물약", 150),
-                ("희망의 결정", "crystal", "희망의 힘이 깃든 결정", 250)
-            ]
-        }
-        
-        reward_items = quest_rewards.get(quest_type, quest_rewards["side_quest"])
-        selected_reward = random.choice(reward_items)
+        # 퀘스트 타입별 보상 (item_catalog.QUEST_REWARD_NAMES)
+        reward_items = catalog_tuples(QUEST_REWARD_NAMES.get(quest_type, QUEST_REWARD_NAMES["side_quest"]))
+        selected_reward = choice(self.rng.stream("loot"), reward_items)
         
         item_name, item_type, description, value = selected_reward
         quantity = 1
@@ -0,0 +1,115 @@
+#아이템 카탈로그 모듈
+#상점/전리품/퀘스트 보상/초기 장비가 공유하는 아이템 정의 (이름당 하나)
+#DB의 items 테이블은 이 정의로 채워지고, 인벤토리는 (플레이어, 아이템 id, 수량)만 보관
+
+from types import MappingProxyType
+from typing import Dict, List, Tuple
+from models import ItemDefinition, GAME_CONSTANTS
+
+ITEM_DEFINITIONS = (
+    # 물약
+    ItemDefinition("치유 물약", "hp_potion", "HP를 50 회복시키는 물약", 50,
+                   hp_effect=GAME_CONSTANTS["HEALING_POTION_EFFECT"]),
+    ItemDefinition("체력 물약", "hp_potion", "체력을 50 회복시키는 물약", 50,
+                   hp_effect=GAME_CONSTANTS["HEALING_POTION_EFFECT"]),
+    ItemDefinition("고급 체력 물약", "hp_potion", "체력을 100 회복시키는 강력한 물약", 100, hp_effect=100),
+    ItemDefinition("축복의 물약", "hp_potion", "신의 축복이 깃든 물약 (체력 80 회복)", 150, hp_effect=80),
+    ItemDefinition("축성된 치유 물약", "hp_potion", "성직자가 축성한 치유 물약 (HP 80 회복)", 80, hp_effect=80),
+    ItemDefinition("마나 물약", "mp_potion", "MP를 30 회복시키는 물약", 50,
+                   mp_effect=GAME_CONSTANTS["MANA_POTION_EFFECT"]),
+    # 소모품/재료
+    ItemDefinition("마법 두루마리", "scroll", "일회용 마법 아이템", 75),
+    ItemDefinition("은화", "currency", "귀중한 화폐", 25),
+    ItemDefinition("빵", "food", "허기를 달래는 음식", 10),
+    ItemDefinition("철광석", "material", "무기 제작에 사용되는 재료", 30),
+    ItemDefinition("마법 가루", "material", "마법 아이템 제작 재료", 40),
+    ItemDefinition("성수", "consumable", "언데드에게 효과적"),
+    ItemDefinition("독 바르기", "consumable", "무기에 독을 바르는 도구"),
+    ItemDefinition("화살통", "ammunition", "화살 30발"),
+    ItemDefinition("도구 세트", "tool", "자물쇠 따개와 각종 도구"),
+    ItemDefinition("낡은 지도", "misc", "보물의 위치를 알려주는 지도", 200),
+    # 결정/장신구
+    ItemDefinition("어둠의 결정", "crystal", "어둠의 적에게 추가 피해를 주는 결정", 100),
+    ItemDefinition("희망의 결정", "crystal", "희망의 힘이 깃든 결정", 250),
+    ItemDefinition("반지", "accessory", "능력을 향상시키는 반지", 150),
+    ItemDefinition("지혜의 반지", "accessory", "지능을 증가시키는 반지", 300),
+    ItemDefinition("감사의 목걸이", "accessory", "구조에 대한 감사의 표시", 200),
+    # 장비
+    ItemDefinition("전설의 검", "weapon", "고대의 힘이 깃든 검", 500),
+    ItemDefinition("철검", "weapon", "견고한 철로 만든 검"),
+    ItemDefinition("마법 지팡이", "weapon", "마법력을 증폭시키는 지팡이"),
+    ItemDefinition("단검", "weapon", "날카로운 단검"),
+    ItemDefinition("장궁", "weapon", "정확한 장거리 활"),
+    ItemDefinition("성스러운 지팡이", "weapon", "치유 마법이 깃든 지팡이"),
+    ItemDefinition("마법 갑옷", "armor", "마법 방어력을 제공하는 갑옷", 400),
+    ItemDefinition("가죽 갑옷", "armor", "가벼운 가죽 갑옷"),
+    ItemDefinition("마법사 로브", "armor", "마법 방어력을 제공하는 로브"),
+    ItemDefinition("성직자 로브", "armor", "신성한 힘을 담은 로브"),
+    ItemDefinition("강화된 방패", "shield", "방어력을 증가시키는 방패", 200),
+    ItemDefinition("나무 방패", "shield", "튼튼한 나무 방패"),
+    ItemDefinition("마법서: 파이어볼", "spellbook", "화염 마법서"),
+)
+
+ITEMS_BY_NAME = MappingProxyType({item.name: item for item in ITEM_DEFINITIONS})
+
+# 전투/탐험 전리품 후보
+LOOT_ITEM_NAMES = (
+    "체력 물약", "마나 물약", "고급 체력 물약", "마법 두루마리", "은화",
+    "빵", "철광석", "마법 가루", "낡은 지도", "반지"
+)
+
+# 퀘스트 타입별 보상 후보
+QUEST_REWARD_NAMES = {
+    "main_quest": ("전설의 검", "마법 갑옷", "지혜의 반지"),
+    "side_quest": ("고급 체력 물약", "마법 두루마리", "은화"),
+    "rescue_quest": ("감사의 목걸이", "축복의 물약", "희망의 결정")
+}
+
+# 직업별 초기 장비 (아이템명, 수량) - 앞의 두 개가 무기/방어구
+STARTING_ITEMS = {
+    "전사": (("철검", 1), ("가죽 갑옷", 1), ("나무 방패", 1), ("체력 물약", 3)),
+    "마법사": (("마법 지팡이", 1), ("마법사 로브", 1), ("마법서: 파이어볼", 1), ("마나 물약", 5)),
+    "도적": (("단검", 1), ("가죽 갑옷", 1), ("도구 세트", 1), ("독 바르기", 1)),
+    "궁수": (("장궁", 1), ("화살통", 30), ("가죽 갑옷", 1), ("체력 물약", 2)),
+    "성직자": (("성스러운 지팡이", 1), ("성직자 로브", 1), ("성수", 3), ("축성된 치유 물약", 4))
+}
+
+# 이전 인벤토리의 (아이템명, 타입) -> 카탈로그 아이템명 (같은 이름이 다른 효과로 쓰이던 아이템)
+# 성직자 초기 장비의 치유 물약(potion 타입, HP 80)은 상점의 치유 물약(HP 50)과 다른 아이템
+LEGACY_ITEM_NAMES = MappingProxyType({
+    ("치유 물약", "potion"): "축성된 치유 물약"
+})
+
+
+def catalog_tuples(names: Tuple[str, ...]) -> List[Tuple[str, str, str, int]]:
+    #아이템명 목록 -> (이름, 타입, 설명, 가치) 목록
+    return [ITEMS_BY_NAME[name].as_tuple() for name in names]
+
+
+def legacy_item_name(name: str, item_type: str) -> str:
+    #이전 인벤토리 행의 카탈로그 아이템명
+    return LEGACY_ITEM_NAMES.get((name, item_type), name)
+
+
+def normalize_item_type(name: str, item_type: str) -> str:
+    #카탈로그에 있는 아이템은 카탈로그 타입, 예전 "potion" 타입은 이름으로 hp/mp 물약 구분
+    definition = ITEMS_BY_NAME.get(name)
+    if definition is not None:
+        return definition.type
+    if item_type == "potion":
+        return "mp_potion" if "마나" in name or "mp" in name.lower() else "hp_potion"
+    return item_type
+
+
+def starting_items(job: str) -> List[Dict]:
+    #직업별 초기 장비 - main_story_start_node가 DB에 넣는 dict 형식
+    return [
+        {
+            "name": name,
+            "type": ITEMS_BY_NAME[name].type,
+            "description": ITEMS_BY_NAME[name].description,
+            "value": ITEMS_BY_NAME[name].value,
+            "quantity": quantity
+        }
+        for name, quantity in STARTING_ITEMS.get(job, STARTING_ITEMS["전사"])
+    ]
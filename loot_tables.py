@@ -0,0 +1,117 @@
+#전리품 테이블 모듈
+#위치/난이도별 가중치를 명시한 드롭 테이블을 alias 테이블(Vose)로 컴파일해 O(1) 추첨
+#요청한 개수만큼 정확히 추첨 (버리는 추첨 없음)
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# 아이템 타입별 기본 가중치 - 희귀 아이템(accessory/misc)은 일반 아이템의 30%
+RARITY_WEIGHTS = {"accessory": 0.3, "misc": 0.3}
+RARE_ITEM_TYPES = tuple(RARITY_WEIGHTS)
+
+# 위치 키워드별 가중치 배율 (아이템 이름 기준, 앞에서부터 먼저 일치하는 키워드 사용)
+LOCATION_LOOT_MODIFIERS = {
+    "숲": {"빵": 1.5, "마법 가루": 1.5},
+    "동굴": {"철광석": 2.0, "마법 가루": 1.3},
+    "광산": {"철광석": 2.5, "은화": 1.5},
+    "유적": {"마법 두루마리": 2.0, "낡은 지도": 2.0},
+    "던전": {"고급 체력 물약": 1.5, "반지": 2.0},
+    "마을": {"빵": 2.0, "은화": 1.5}
+}
+
+# 난이도별 희귀 아이템 가중치 배율
+DIFFICULTY_RARE_MULTIPLIER = {"easy": 1.0, "normal": 1.5, "hard": 2.5}
+
+
+def difficulty_for_damage(total_damage: int) -> str:
+    #전투 총 데미지로 난이도 구분 (보상 개수 구간과 동일)
+    if total_damage > 150:
+        return "hard"
+    if total_damage > 100:
+        return "normal"
+    return "easy"
+
+
+def location_keyword(location: str) -> str:
+    #위치 이름에서 전리품 키워드 찾기 (없으면 빈 문자열)
+    for keyword in LOCATION_LOOT_MODIFIERS:
+        if keyword in (location or ""):
+            return keyword
+    return ""
+
+
+class AliasTable:
+    #Vose alias 테이블 - 가중치 분포에서 O(1) 추첨
+
+    def __init__(self, weights: Sequence[float]):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or len(weights) == 0 or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("가중치는 음수가 아닌 값이 하나 이상 있어야 합니다")
+
+        count = len(weights)
+        self.probabilities = weights / weights.sum()
+        scaled = self.probabilities * count
+        self.prob = np.zeros(count)
+        self.alias = np.zeros(count, dtype=np.int64)
+
+        small = [i for i in range(count) if scaled[i] < 1.0]
+        large = [i for i in range(count) if scaled[i] >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # 남은 칸은 부동소수점 오차만 남은 것이므로 확률 1
+        for i in small + large:
+            self.prob[i] = 1.0
+            self.alias[i] = i
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        #count개 인덱스 일괄 추첨
+        columns = rng.integers(len(self.prob), size=count)
+        accept = rng.random(count) < self.prob[columns]
+        return np.where(accept, columns, self.alias[columns])
+
+
+class LootTables:
+    #아이템 목록 하나에 대한 위치/난이도별 alias 테이블 (처음 요청 시 컴파일 후 캐시)
+
+    def __init__(self, items: List[Tuple[str, str, str, int]]):
+        self.items = list(items)
+        self._tables: Dict[Tuple[str, str], AliasTable] = {}
+
+    def weights_for(self, location: str, difficulty: str = "easy") -> np.ndarray:
+        #위치/난이도에 맞는 아이템별 가중치
+        modifiers = LOCATION_LOOT_MODIFIERS.get(location_keyword(location), {})
+        rare_multiplier = DIFFICULTY_RARE_MULTIPLIER.get(difficulty, 1.0)
+
+        weights = []
+        for item_name, item_type, description, value in self.items:
+            weight = RARITY_WEIGHTS.get(item_type, 1.0) * modifiers.get(item_name, 1.0)
+            if item_type in RARE_ITEM_TYPES:
+                weight *= rare_multiplier
+            weights.append(weight)
+        return np.asarray(weights)
+
+    def table(self, location: str, difficulty: str = "easy") -> AliasTable:
+        #위치 키워드/난이도별 alias 테이블
+        key = (location_keyword(location), difficulty)
+        table = self._tables.get(key)
+        if table is None:
+            table = AliasTable(self.weights_for(location, difficulty))
+            self._tables[key] = table
+        return table
+
+    def draw(self, rng: np.random.Generator, count: int, location: str,
+             difficulty: str = "easy") -> List[Tuple[str, str, str, int]]:
+        #정확히 count개 아이템 추첨
+        if count <= 0:
+            return []
+        return [self.items[i] for i in self.table(location, difficulty).sample(rng, count)]
+
@@ -1,7 +1,6 @@
 #실행부
 import os
 import sys
-import pickle
 import json
 from datetime import datetime
 from langchain_core.messages import HumanMessage, AIMessage
@@ -12,7 +11,16 @@ from database import MainStoryDB, reset_database
 from game_graph import create_game_graph, visualize_game_graph
 from game_nodes import GameNodes
 from reputation_system import ReputationManager
+from rng import GameRNG
 from character_creation import show_character_creation_help
+from save_system import (
+    AutosaveManager, get_save_journal, forget_save_journal, get_save_catalog,
+    new_slot_name, slot_name_from_filename, read_save_header, is_autosave_slot,
+    import_legacy_saves
+)
+
+# 저장 목록 한 페이지에 표시할 파일 수
+SAVE_PAGE_SIZE = 10
 
 
 def setup_openai_api():
@@ -71,81 +79,62 @@ def setup_openai_api():
 
 
 def save_game_state(state: PlayerInitState, filename: str = None):
-    #게임 상태 저장
+    #게임 상태 저장 - 세션 슬롯의 저널에 변경분만 추가
     try:
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"savegame_{timestamp}.pkl"
-        
-        # 저장할 수 없는 객체들 제거
-        save_state = {}
-        for key, value in state.items():
-            if key == "main_story_db":
-                # DB 객체는 저장하지 않고 DB 파일 경로만 저장
-                save_state["db_path"] = "main_story.db"
-            elif key == "messages":
-                # 메시지는 직렬화 가능한 형태로 변환
-                serializable_messages = []
-                for msg in value:
-                    if isinstance(msg, HumanMessage):
-                        serializable_messages.append({"type": "human", "content": msg.content})
-                    elif isinstance(msg, AIMessage):
-                        serializable_messages.append({"type": "ai", "content": msg.content})
-                save_state[key] = serializable_messages
-            else:
-                save_state[key] = value
+        if filename is not None:
+            slot_name = slot_name_from_filename(filename)
+        else:
+            slot_name = state.get("save_slot") or new_slot_name()
         
-        # 데이터베이스 백업
-        main_db = state.get("main_story_db")
-        if main_db:
-            db_backup_name = filename.replace(".pkl", "_db.db")
-            main_db.backup_database(db_backup_name)
+        # 같은 세션의 다음 저장이 같은 슬롯에 이어서 기록되도록 슬롯 이름 유지
+        state["save_slot"] = slot_name
         
-        # 상태 저장
-        with open(filename, 'wb') as f:
-            pickle.dump(save_state, f)
+        journal = get_save_journal(slot_name)
+        save_info = journal.save(state)
         
-        print(f"✅ 게임이 저장되었습니다: {filename}")
-        return filename
+        print(f"✅ 게임이 저장되었습니다: {slot_name} ({save_info['bytes']:,} bytes, {save_info['mode']})")
+        return slot_name
         
     except Exception as e:
         print(f"❌ 게임 저장 실패: {e}")
         return None
 
 
-def load_game_state(filename: str) -> PlayerInitState:
-    #게임 상태 로드
+def load_game_state(filename: str, main_db: MainStoryDB = None) -> PlayerInitState:
+    #게임 상태 로드 - 기본 스냅샷에 저널 재생 후 DB 스냅샷을 현재 DB에 복원
     try:
-        if not os.path.exists(filename):
+        slot_name = slot_name_from_filename(filename)
+        journal = get_save_journal(slot_name)
+        
+        if not os.path.exists(journal.snapshot_path):
             print(f"❌ 저장 파일을 찾을 수 없습니다: {filename}")
             return None
         
-        with open(filename, 'rb') as f:
-            save_state = pickle.load(f)
+        save_state = journal.load()
         
-        # DB 복원
-        db_backup_name = filename.replace(".pkl", "_db.db")
-        if os.path.exists(db_backup_name):
-            # 기존 DB 파일 교체
-            if os.path.exists("main_story.db"):
-                os.remove("main_story.db")
-            os.rename(db_backup_name, "main_story.db")
+        # 실행 중인 DB 연결이 있으면 재사용, 없으면 새로 연결
+        if main_db is None:
+            main_db = MainStoryDB()
         
-        # DB 객체 재생성
-        main_db = MainStoryDB()
-        save_state["main_story_db"] = main_db
+        # DB 복원 - 스냅샷 파일은 그대로 두므로 같은 저장을 여러 번 로드 가능
+        if os.path.exists(journal.db_snapshot_path):
+            main_db.restore_from(journal.db_snapshot_path)
+            journal.mark_db_synced(main_db)
+        
+        # 게임 시계 복원 (이전 버전 저장이면 restore_from이 DB의 마지막 기록 시각에서 이어서 진행)
+        if save_state.get("game_time") is not None:
+            main_db.game_time = save_state["game_time"]
+        
+        # 골드는 DB가 기준 - 상태의 표시용 골드를 복원된 DB 골드로 맞춤 (DB는 건드리지 않음)
+        player_id = save_state.get("main_story_player_id")
+        if player_id:
+            save_state["player_gold"] = main_db.get_gold(player_id)
         
-        # 메시지 복원
-        if "messages" in save_state:
-            restored_messages = []
-            for msg_data in save_state["messages"]:
-                if msg_data["type"] == "human":
-                    restored_messages.append(HumanMessage(content=msg_data["content"]))
-                elif msg_data["type"] == "ai":
-                    restored_messages.append(AIMessage(content=msg_data["content"]))
-            save_state["messages"] = restored_messages
+        save_state["main_story_db"] = main_db
+        # 자동 저장 슬롯에서 불러왔으면 다음 직접 저장은 새 슬롯에 (자동 저장 순환에 덮이지 않도록)
+        save_state["save_slot"] = None if is_autosave_slot(slot_name) else slot_name
         
-        print(f"✅ 게임이 로드되었습니다: {filename}")
+        print(f"✅ 게임이 로드되었습니다: {slot_name}")
         return save_state
         
     except Exception as e:
@@ -153,55 +142,54 @@ def load_game_state(filename: str) -> PlayerInitState:
         return None
 
 
-def get_save_files():
-    #저장 파일 목록 조회
+def get_save_files(limit: int = SAVE_PAGE_SIZE, offset: int = 0):
+    #저장 파일 목록 조회 - 카탈로그에서 최신 저장 순으로 한 페이지 조회
     save_files = []
-    for file in os.listdir("."):
-        if file.startswith("savegame_") and file.endswith(".pkl"):
-            try:
-                # 파일 생성 시간 확인
-                stat = os.stat(file)
-                created_time = datetime.fromtimestamp(stat.st_ctime)
-                
-                # 파일 크기 확인
-                file_size = stat.st_size
-                size_str = f"{file_size:,} bytes"
-                
-                save_files.append({
-                    "filename": file,
-                    "created": created_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "size": size_str
-                })
-            except:
-                continue
-    
-    # 최신 파일 순으로 정렬
-    save_files.sort(key=lambda x: x["created"], reverse=True)
+    for entry in get_save_catalog().list_saves(limit, offset):
+        saved_time = datetime.fromtimestamp(entry["saved_at"])
+        save_files.append({
+            **entry,
+            "created": saved_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "size": f"{entry['size']:,} bytes"
+        })
     return save_files
 
 
-def select_save_file():
-    #저장 파일 선택
-    save_files = get_save_files()
+def select_save_file(prompt: str = "로드할 파일을 선택하세요"):
+    #저장 파일 선택 (페이지 단위 표시)
+    catalog = get_save_catalog()
+    total = catalog.count()
     
-    if not save_files:
+    if total == 0:
         print("💾 저장된 게임 파일이 없습니다.")
         return None
     
-    print("\n💾 저장된 게임 파일 목록:")
-    print("-" * 60)
-    for i, save_file in enumerate(save_files, 1):
-        print(f"{i}. {save_file['filename']}")
-        print(f"   생성시간: {save_file['created']}")
-        print(f"   파일크기: {save_file['size']}")
-        print()
+    page = 0
+    page_count = (total + SAVE_PAGE_SIZE - 1) // SAVE_PAGE_SIZE
     
     while True:
+        save_files = get_save_files(SAVE_PAGE_SIZE, page * SAVE_PAGE_SIZE)
+        
+        print(f"\n💾 저장된 게임 파일 목록 ({page + 1}/{page_count} 페이지, 총 {total}개):")
+        print("-" * 60)
+        for i, save_file in enumerate(save_files, 1):
+            print(f"{i}. {save_file['filename']}")
+            print(f"   플레이어: {save_file['player_name']} | 위치: {save_file['location']}")
+            print(f"   저장시간: {save_file['created']}")
+            print(f"   파일크기: {save_file['size']}")
+            print()
+        
         try:
-            choice = input(f"로드할 파일을 선택하세요 (1-{len(save_files)}, 0: 취소): ").strip()
+            choice = input(f"{prompt} (1-{len(save_files)}, n: 다음, p: 이전, 0: 취소): ").strip().lower()
             
             if choice == "0":
                 return None
+            if choice == "n":
+                page = min(page + 1, page_count - 1)
+                continue
+            if choice == "p":
+                page = max(page - 1, 0)
+                continue
             
             file_index = int(choice) - 1
             if 0 <= file_index < len(save_files):
@@ -313,9 +301,16 @@ def run_game(initial_state: PlayerInitState = None):
             "next_action": "character_creation"
         }
     
+    # 턴 경계 자동 저장 (파일 기록은 작업 스레드에서 처리)
+    autosave = AutosaveManager()
+    autosave_event = None
+    
+    # 세션 난수 (저장된 게임이면 시드와 스트림 상태 복원)
+    game_rng = GameRNG.from_state(current_state.get("rng_state"))
+    
     try:
         # 게임 노드 초기화
-        game_nodes = GameNodes()
+        game_nodes = GameNodes(rng=game_rng)
         
         # 새 게임인 경우 캐릭터 생성부터 시작
         if not initial_state:
@@ -365,6 +360,7 @@ def run_game(initial_state: PlayerInitState = None):
             print("💡 게임 관리:")
             print("  - 'save' 또는 '저장' → 게임 저장")
             print("  - 'load' 또는 '로드' → 게임 불러오기")
+            print("  - '저장 통계' → 자동 저장 소요 시간 확인")
             print("💡 기존 기능:")
             print("  - '인벤토리' → 가방 확인 및 아이템 사용")
             print("  - '물약 구입' → 상점에서 아이템 구매")
@@ -377,6 +373,19 @@ def run_game(initial_state: PlayerInitState = None):
         # 메인 게임 루프
         while current_state.get("game_active", True):
             try:
+                # 턴 경계 - 지난 턴의 명성 변화를 한 번에 기록하고 게임 시계를 진행,
+                # 난수 상태/게임 시계를 상태에 기록한 뒤 정책(턴 수, 경과 시간, 주요 사건)에 따라 백그라운드 자동 저장
+                main_db = current_state.get("main_story_db")
+                if main_db:
+                    main_db.flush_reputation()
+                    main_db.advance_clock()
+                    current_state["game_time"] = main_db.game_time
+                current_state["rng_state"] = game_rng.get_state()
+                autosave.on_turn(current_state, autosave_event)
+                autosave_event = None
+                if main_db:
+                    main_db.begin_reputation_turn()
+                
                 user_input = input("\n당신: ")
                 
                 # 게임 종료
@@ -394,13 +403,19 @@ def run_game(initial_state: PlayerInitState = None):
                         print("게임이 저장되었습니다. 계속 플레이하세요!")
                     continue
                 
+                # 자동 저장 통계
+                if user_input.lower() in ['save stats', '저장 통계']:
+                    print(f"\n💾 {autosave.metrics.summary()}")
+                    continue
+                
                 # 게임 로드
                 if user_input.lower() in ['load', '로드']:
                     selected_file = select_save_file()
                     if selected_file:
-                        loaded_state = load_game_state(selected_file)
+                        loaded_state = load_game_state(selected_file, current_state.get("main_story_db"))
                         if loaded_state:
                             current_state = loaded_state
+                            game_rng.load_state(current_state.get("rng_state"))
                             print("게임이 로드되었습니다. 계속 플레이하세요!")
                             
                             # 현재 상태 출력
@@ -440,6 +455,7 @@ def run_game(initial_state: PlayerInitState = None):
                         
                     elif next_action == "battle":
                         current_state = game_nodes.battle_node(current_state)
+                        autosave_event = "battle"
                         # 전투 결과 출력
                         ai_messages = [msg for msg in current_state["messages"] if isinstance(msg, AIMessage)]
                         if ai_messages:
@@ -453,6 +469,11 @@ def run_game(initial_state: PlayerInitState = None):
                             reputation_status = reputation_manager.get_reputation_status_message(current_reputation)
                             print(f"⭐ {reputation_status}")
                         
+                        # 전투 장면 출력 (통계 출력 후 백그라운드 생성 결과 대기)
+                        if current_state.get("next_action") == "battle_narration":
+                            current_state = game_nodes.battle_narration_node(current_state)
+                            print("\n🎭 GM:", current_state["messages"][-1].content)
+                        
                         # 아이템 보상 처리
                         if current_state.get("next_action") == "item_reward":
                             current_state = game_nodes.item_reward_node(current_state)
@@ -545,7 +566,8 @@ def run_game(initial_state: PlayerInitState = None):
         print(f"❌ 치명적 오류: {e}")
         print("게임을 종료합니다.")
     finally:
-        # 데이터베이스 정리
+        # 남은 자동 저장을 마친 뒤 데이터베이스 정리
+        autosave.stop()
         if current_state.get("main_story_db"):
             current_state["main_story_db"].close()
 
@@ -563,6 +585,11 @@ def main():
         print("❌ API 키가 설정되지 않았습니다. 프로그램을 종료합니다.")
         return
     
+    # 이전 버전(pickle) 저장 파일은 처음 한 번 현재 저장 형식으로 변환
+    imported = import_legacy_saves()
+    if imported:
+        print(f"💾 이전 형식 저장 파일 {len(imported)}개를 변환했습니다: {', '.join(imported)}")
+    
     print("\n게임 옵션을 선택하세요:")
     print("1. 새게임 시작")
     print("2. 저장된 게임 이어하기")
@@ -644,61 +671,46 @@ def main():
                 print("7. character_creation.py - 캐릭터 생성")
                 print("8. game_nodes.py - 게임 노드")
                 print("9. game_graph.py - 워크플로우")
-                print("10. main.py - 메인 실행")
+                print("10. save_system.py - 저장/로드")
+                print("11. battle_engine.py - 배열 기반 전투 계산")
+                print("12. rng.py - 세션 난수 스트림")
+                print("13. main.py - 메인 실행")
                 continue
                 
             elif choice == "5":
                 print("\n💾 저장 파일 관리...")
-                save_files = get_save_files()
-                if not save_files:
-                    print("저장된 파일이 없습니다.")
+                filename = select_save_file("관리할 파일을 선택하세요")
+                if not filename:
                     continue
                 
-                print(f"총 {len(save_files)}개의 저장 파일이 있습니다:")
-                for i, save_file in enumerate(save_files, 1):
-                    print(f"{i}. {save_file['filename']} ({save_file['created']}, {save_file['size']})")
+                slot_name = slot_name_from_filename(filename)
+                journal = get_save_journal(slot_name)
                 
                 manage_choice = input("\n작업을 선택하세요 (1: 삭제, 2: 상세정보, 0: 돌아가기): ").strip()
                 
                 if manage_choice == "1":
-                    try:
-                        file_num = int(input("삭제할 파일 번호: ")) - 1
-                        if 0 <= file_num < len(save_files):
-                            filename = save_files[file_num]["filename"]
-                            confirm = input(f"'{filename}'을 삭제하시겠습니까? (y/n): ").lower()
-                            if confirm in ['y', 'yes', '예']:
-                                os.remove(filename)
-                                # DB 백업 파일도 삭제
-                                db_file = filename.replace(".pkl", "_db.db")
-                                if os.path.exists(db_file):
-                                    os.remove(db_file)
-                                print("파일이 삭제되었습니다.")
-                        else:
-                            print("잘못된 파일 번호입니다.")
-                    except ValueError:
-                        print("올바른 숫자를 입력해주세요.")
+                    confirm = input(f"'{filename}'을 삭제하시겠습니까? (y/n): ").lower()
+                    if confirm in ['y', 'yes', '예']:
+                        # 스냅샷, 저널, DB 백업 파일 및 카탈로그 항목 모두 삭제
+                        journal.delete()
+                        forget_save_journal(slot_name)
+                        print("파일이 삭제되었습니다.")
                 
                 elif manage_choice == "2":
                     try:
-                        file_num = int(input("정보를 볼 파일 번호: ")) - 1
-                        if 0 <= file_num < len(save_files):
-                            filename = save_files[file_num]["filename"]
-                            # 저장 파일 정보 로드
-                            with open(filename, 'rb') as f:
-                                save_data = pickle.load(f)
-                            
-                            print(f"\n📄 {filename} 상세 정보:")
-                            print(f"생성시간: {save_files[file_num]['created']}")
-                            print(f"파일크기: {save_files[file_num]['size']}")
-                            print(f"플레이어: {save_data.get('player', {}).get('name', 'N/A')}")
-                            print(f"현재 위치: {save_data.get('current_location', 'N/A')}")
-                            print(f"골드: {save_data.get('player_gold', 0)}")
-                            print(f"동료 수: {len(save_data.get('companion_ids', []))}")
-                            print(f"메시지 수: {len(save_data.get('messages', []))}")
-                        else:
-                            print("잘못된 파일 번호입니다.")
-                    except ValueError:
-                        print("올바른 숫자를 입력해주세요.")
+                        # 저장 파일 헤더만 읽어 정보 표시
+                        header = read_save_header(journal.snapshot_path)
+                        saved_time = datetime.fromtimestamp(header.saved_at)
+                        
+                        print(f"\n📄 {filename} 상세 정보:")
+                        print(f"저장시간: {saved_time.strftime('%Y-%m-%d %H:%M:%S')}")
+                        print(f"파일크기: {journal.total_size():,} bytes")
+                        print(f"저장 형식: v{header.version}")
+                        print(f"플레이어: {header.player_name or 'N/A'}")
+                        print(f"현재 위치: {header.location or 'N/A'}")
+                        print(f"골드: {header.gold}")
+                        print(f"동료 수: {header.party_size - 1}")
+                        print(f"턴 수: {header.turn_count}")
                     except Exception as e:
                         print(f"파일 정보 로드 실패: {e}")
                 
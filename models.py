@@ -1,6 +1,6 @@
 #RPG 게임 데이터 모델 및 타입 정의
 
-from typing import TypedDict, Annotated, List, Dict, Optional, Union
+from typing import TypedDict, Annotated, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import operator
@@ -58,6 +58,20 @@ class Item:
     description: str
     value: int = 0
 
+@dataclass(frozen=True)
+class ItemDefinition:
+    #아이템 카탈로그 항목 (items 테이블 한 행) - 인벤토리는 id와 수량만 보관
+    name: str
+    type: str
+    description: str
+    value: int = 0
+    hp_effect: int = 0  # 사용 시 파티원별 HP 회복량
+    mp_effect: int = 0  # 사용 시 파티원별 MP 회복량
+
+    def as_tuple(self) -> Tuple[str, str, str, int]:
+        #(이름, 타입, 설명, 가치) - 드롭 테이블/보상 목록 형식
+        return self.name, self.type, self.description, self.value
+
 class PlayerInitState(TypedDict):
     #LangGraph 상태 정의
     messages: Annotated[List, operator.add]
@@ -73,6 +87,8 @@ class PlayerInitState(TypedDict):
     current_objective: str
     player_gold: int
     reputation_changes: List[Dict]  # 명성 변화 기록
+    rng_state: Dict  # 세션 난수 시드/스트림 상태
+    game_time: float  # 게임 시계 (MainStoryDB.game_time - 명성 감쇠/상점 재고 기준)
 
 @dataclass
 class ReputationResponse:
@@ -85,6 +101,26 @@ class ReputationResponse:
     special_actions: List[str]
 
 
+@dataclass(frozen=True)
+class ReputationTier:
+    #명성 등급별 고정 정보 - 인사말/상태 메시지는 템플릿으로 두고 필요할 때 하나만 포맷
+    level: ReputationLevel
+    rank: int  # 등급 서열 (원수 0 ~ 영웅 7) - 클수록 좋은 등급
+    threshold: int  # 등급 하한 명성
+    greeting_template: str  # {npc_name}
+    tone: str
+    willingness_to_help: float
+    price_modifier: float
+    special_actions: Tuple[str, ...]
+    status_template: str  # {reputation}
+
+    def greeting(self, npc_name: str) -> str:
+        return self.greeting_template.format(npc_name=npc_name)
+
+    def status_message(self, reputation: int) -> str:
+        return self.status_template.format(reputation=reputation)
+
+
 class ShopItem(TypedDict):
     #상점 아이템 정보
     name: str
@@ -125,6 +161,13 @@ GAME_CONSTANTS = {
     "DEFAULT_GOLD": 300,
     "BATTLE_CRITICAL_CHANCE": 0.15,
     "BATTLE_SPECIAL_CHANCE": 0.20,
+    "BATTLE_NARRATION_TIMEOUT": 8.0,  # 전투 장면 생성 지연 한도(초) - 넘기면 기본 장면
+    "BATTLE_MAX_ROUNDS": 6,  # 라운드 전투 최대 라운드 - 넘기면 적이 퇴각
+    "REPUTATION_HALF_LIFE_HOURS": 168,  # 명성이 중립(0)으로 절반 감쇠하는 게임 시간 (GAME_TURN_SECONDS 기준)
+    "REGIONAL_REPUTATION_WEIGHT": 0.5,  # 지역 평판에서 그 지역 명성의 비중 (나머지는 전체 명성)
+    "REPUTATION_ACTION_CONFIDENCE": 0.6,  # 로컬 행동 분류를 그대로 쓰는 최소 확신도 (미만이면 LLM 판단 참고)
+    "SHOP_RESTOCK_HOURS": 1,  # 상점 재고가 최대치로 다시 채워지는 간격 (게임 시간, 조회/구매 시 지연 적용)
+    "GAME_TURN_SECONDS": 600,  # 턴 하나에 흐르는 게임 시간(초) - 게임을 하지 않는 동안은 흐르지 않음
     "HEALING_POTION_EFFECT": 50,
     "MANA_POTION_EFFECT": 30,
     "HEAL_SPELL_EFFECT": 70,
@@ -0,0 +1,103 @@
+#지역별 명성 모듈
+#(플레이어 x 지역) 명성을 배열 행렬로 메모리에 보관 - 조회/갱신은 dict 인덱스 + 배열 접근으로 O(1)
+#지역이 늘어나면 열을 두 배씩 늘려 재할당 비용을 분산
+
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from models import GAME_CONSTANTS
+
+# 위치 이름에서 지역을 가르는 키워드 (앞에서부터 먼저 일치하는 키워드, 없으면 위치 이름 자체가 지역)
+REGION_KEYWORDS = ("마을", "숲", "동굴", "광산", "유적", "던전", "산", "성", "항구", "사막", "평원")
+
+
+def region_for_location(location: str) -> str:
+    #위치 이름의 지역 키
+    location = (location or "").strip()
+    for keyword in REGION_KEYWORDS:
+        if keyword in location:
+            return keyword
+    return location
+
+
+def local_standing(global_reputation: int, regional_reputation: int,
+                   weight: float = GAME_CONSTANTS["REGIONAL_REPUTATION_WEIGHT"]) -> int:
+    #지역 평판 - 전체 명성과 그 지역에서 쌓은 명성의 가중 평균 (처음 가는 지역에는 소문만 일부 전해짐)
+    return max(-100, min(100, int(round((1 - weight) * global_reputation + weight * regional_reputation))))
+
+
+class ReputationMatrix:
+    #플레이어 x 지역 명성 행렬 (값과 마지막 기록 시각을 같은 모양의 배열로 보관)
+
+    def __init__(self, players: int = 4, regions: int = 8):
+        self._rows: Dict[int, int] = {}
+        self._columns: Dict[str, int] = {}
+        self.values = np.zeros((players, regions), dtype=np.int16)
+        self.stamps = np.full((players, regions), np.nan)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.stamps)))
+
+    @property
+    def regions(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def _grow(self, rows: int, columns: int):
+        #행/열이 부족하면 두 배씩 늘림
+        height, width = self.values.shape
+        if rows <= height and columns <= width:
+            return
+        shape = (max(rows, height * 2 if rows > height else height),
+                 max(columns, width * 2 if columns > width else width))
+        values = np.zeros(shape, dtype=np.int16)
+        stamps = np.full(shape, np.nan)
+        values[:height, :width] = self.values
+        stamps[:height, :width] = self.stamps
+        self.values, self.stamps = values, stamps
+
+    def _index(self, player_id: int, region: str) -> Tuple[int, int]:
+        #셀 위치 (처음 보는 플레이어/지역이면 행/열 추가)
+        row = self._rows.get(player_id)
+        if row is None:
+            row = self._rows[player_id] = len(self._rows)
+        column = self._columns.get(region)
+        if column is None:
+            column = self._columns[region] = len(self._columns)
+        self._grow(len(self._rows), len(self._columns))
+        return row, column
+
+    def get(self, player_id: int, region: str) -> Tuple[int, Optional[float]]:
+        #(지역 명성, 마지막 기록 시각) - 기록이 없으면 (0, None)
+        row = self._rows.get(player_id)
+        column = self._columns.get(region)
+        if row is None or column is None:
+            return 0, None
+        stamp = self.stamps[row, column]
+        if np.isnan(stamp):
+            return 0, None
+        return int(self.values[row, column]), float(stamp)
+
+    def set(self, player_id: int, region: str, reputation: int, stamp: float):
+        #셀 갱신
+        row, column = self._index(player_id, region)
+        self.values[row, column] = reputation
+        self.stamps[row, column] = stamp
+
+    def load(self, rows: Iterable[Tuple[int, str, int, float]]):
+        #(player_id, region, reputation, updated_at) 행으로 전체 다시 채움
+        self.clear()
+        for player_id, region, reputation, stamp in rows:
+            self.set(player_id, region, reputation, stamp)
+
+    def clear(self):
+        self._rows.clear()
+        self._columns.clear()
+        self.values[:] = 0
+        self.stamps[:] = np.nan
+
+    def player_row(self, player_id: int) -> Dict[str, Tuple[int, float]]:
+        #플레이어의 지역별 (명성, 마지막 기록 시각) - 기록된 지역만
+        row = self._rows.get(player_id)
+        if row is None:
+            return {}
+        return {region: (int(self.values[row, column]), float(self.stamps[row, column]))
+                for region, column in self._columns.items() if not np.isnan(self.stamps[row, column])}
@@ -1,17 +1,94 @@
 # 명성 시스템 관리
 # NPC와의 상호작용에서 명성에 따른 태도 변화 처리
-import random
+from bisect import bisect_right
+from types import MappingProxyType
 from typing import Dict, List, Optional
-from models import ReputationLevel, ReputationResponse, REPUTATION_THRESHOLDS
+from models import ReputationLevel, ReputationResponse, ReputationTier, REPUTATION_THRESHOLDS
+from rng import GameRNG, choice
+from dialogue_bank import DialogueBank, get_default_bank, is_small_talk, npc_archetype
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 import json
 
+# 명성 등급 테이블 (낮은 등급부터, 모듈 로드 시 한 번만 생성하는 불변 테이블)
+REPUTATION_TIERS = tuple(
+    ReputationTier(level, rank, REPUTATION_THRESHOLDS[level], greeting, tone, willingness, price, actions, status)
+    for rank, (level, greeting, tone, willingness, price, actions, status) in enumerate([
+        (ReputationLevel.ENEMY,
+         "감히 여기에 나타나다니! {npc_name}이 당신을 용서하지 않겠다!",
+         "극도로 적대적이고 공격적인", 0.0, 3.0, ("전투_시작", "도망", "경비_호출", "위협"),
+         "💀 원수 ({reputation}) - 사람들이 당신을 증오합니다!"),
+        (ReputationLevel.VERY_HOSTILE,
+         "당신이... {npc_name}은 당신을 경계하고 있습니다.",
+         "매우 적대적이고 두려워하는", 0.1, 2.0, ("서비스_거부", "도망_시도", "경비_호출"),
+         "😨 매우 적대적 ({reputation}) - 사람들이 당신을 무서워합니다!"),
+        (ReputationLevel.HOSTILE,
+         "흥! {npc_name}다. 당신 같은 자와는 거래하기 싫지만...",
+         "적대적이고 불쾌한", 0.2, 1.5, ("높은_가격", "무례한_태도", "정보_거부"),
+         "😠 적대적 ({reputation}) - 사람들이 당신을 싫어합니다."),
+        (ReputationLevel.SLIGHTLY_HOSTILE,
+         "음... {npc_name}입니다. 당신에 대한 이야기를 들었는데...",
+         "약간 경계하는", 0.4, 1.2, ("정보_제한", "경계"),
+         "😕 약간 비호의적 ({reputation}) - 사람들이 당신을 경계합니다."),
+        (ReputationLevel.NEUTRAL,
+         "안녕하세요. {npc_name}입니다.",
+         "평범하고 중립적인", 0.6, 1.0, ("기본_서비스",),
+         "😐 평범 ({reputation}) - 보통의 평판입니다."),
+        (ReputationLevel.FRIENDLY,
+         "안녕하세요! {npc_name}입니다. 좋은 평판을 들었습니다.",
+         "친근하고 협조적인", 0.8, 0.9, ("약간_할인", "기본_정보_제공"),
+         "🙂 호의적 ({reputation}) - 사람들이 당신을 좋아합니다."),
+        (ReputationLevel.VERY_FRIENDLY,
+         "오, {npc_name}입니다! 당신의 업적은 정말 훌륭합니다!",
+         "매우 친근하고 호의적인", 0.9, 0.7, ("할인_제공", "추가_정보", "친절한_조언"),
+         "😊 매우 호의적 ({reputation}) - 사람들이 당신을 매우 좋아합니다!"),
+        (ReputationLevel.HEROIC,
+         "영웅님! {npc_name}입니다. 당신의 명성은 온 대륙에 울려 퍼지고 있습니다!",
+         "극도로 존경스럽고 경외심 가득한", 1.0, 0.5, ("무료_서비스", "특별_정보_제공", "귀중한_선물"),
+         "🌟 영웅 ({reputation}) - 모든 이들이 당신을 경외합니다!")
+    ])
+)
+
+# 등급별 하한 (원수는 하한 없음 - 매우 적대 하한 미만은 모두 원수)
+_TIER_FLOORS = tuple(tier.threshold for tier in REPUTATION_TIERS[1:])
+
+TIER_BY_LEVEL = MappingProxyType({tier.level: tier for tier in REPUTATION_TIERS})
+
+# 서비스별 최소 등급
+SERVICE_REQUIREMENTS = MappingProxyType({
+    "기본_상점": ReputationLevel.VERY_HOSTILE,
+    "특별_아이템": ReputationLevel.FRIENDLY,
+    "고급_서비스": ReputationLevel.VERY_FRIENDLY,
+    "영웅_전용": ReputationLevel.HEROIC,
+    "정보_수집": ReputationLevel.NEUTRAL,
+    "퀘스트_수주": ReputationLevel.SLIGHTLY_HOSTILE
+})
+
+
+# 명성 추세 막대 (-100 ~ 100을 8단계로)
+TREND_BARS = "▁▂▃▄▅▆▇█"
+
+
+def reputation_tier(reputation: int) -> ReputationTier:
+    #명성 값이 속한 등급 (이진 탐색)
+    return REPUTATION_TIERS[bisect_right(_TIER_FLOORS, reputation)]
+
+
 class ReputationManager:
     #명성 시스템 관리 클래스"
 
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    def __init__(self, rng: GameRNG = None, llm=None, dialogue_bank: DialogueBank = None):
+        # llm을 주입하면 그대로 사용 (헤드리스 시뮬레이션 등)
+        self.llm = llm if llm is not None else ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+        self.rng = rng if rng is not None else GameRNG()
+        self._dialogue_bank = dialogue_bank
+    
+    @property
+    def dialogue_bank(self) -> DialogueBank:
+        #대화 템플릿 뱅크 (주입하지 않으면 처음 사용할 때 공용 뱅크 열기)
+        if self._dialogue_bank is None:
+            self._dialogue_bank = get_default_bank()
+        return self._dialogue_bank
     
     def get_reputation_level(self, reputation: int) -> ReputationLevel:
         #명성에 따른 등급 처리
@@ -19,118 +96,70 @@ class ReputationManager:
         #VERY_FRIENDLY >=60
         #FRIENDLY >=20
         #NEUTRAL >=0
-        #SLIGHTLY_HOSTILE >= -20
-        #HOSTILE >= -60
-        #VERY_HOSTILE >=-80
-        #ENEMY < -80
-        if reputation >= REPUTATION_THRESHOLDS[ReputationLevel.HEROIC]:
-            return ReputationLevel.HEROIC
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.VERY_FRIENDLY]:
-            return ReputationLevel.VERY_FRIENDLY
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.FRIENDLY]:
-            return ReputationLevel.FRIENDLY
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.NEUTRAL]:
-            return ReputationLevel.NEUTRAL
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.SLIGHTLY_HOSTILE]:
-            return ReputationLevel.SLIGHTLY_HOSTILE
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.HOSTILE]:
-            return ReputationLevel.HOSTILE
-        elif reputation >= REPUTATION_THRESHOLDS[ReputationLevel.VERY_HOSTILE]:
-            return ReputationLevel.VERY_HOSTILE
-        else:
-            return ReputationLevel.ENEMY
+        #SLIGHTLY_HOSTILE >= -1
+        #HOSTILE >= -21
+        #VERY_HOSTILE >= -41
+        #ENEMY < -41
+        return reputation_tier(reputation).level
+    
+    def get_local_reputation(self, main_db, player_id: int, region: str) -> int:
+        #지역(위치)에서의 평판 - 상점 가격과 NPC 태도는 전체 명성 대신 이 값을 기준으로
+        if not main_db or not player_id:
+            return 0
+        return main_db.get_local_reputation(player_id, region)
+    
+    def get_reputation_tier(self, reputation: int) -> ReputationTier:
+        #명성에 따른 등급 정보 (응답 객체를 만들지 않고 가격/태도만 필요할 때)
+        return reputation_tier(reputation)
         
     def get_reputation_response(self, reputation: int, npc_name: str = "NPC", location: str = "마을") -> ReputationResponse:
         #명성에 따른 NPC 응답 성향 변화
-
-        level = self.get_reputation_level(reputation)
-        
-        response_configs = {
-            ReputationLevel.HEROIC: {
-                "greeting": f"영웅님! {npc_name}입니다. 당신의 명성은 온 대륙에 울려 퍼지고 있습니다!",
-                "tone": "극도로 존경스럽고 경외심 가득한",
-                "willingness_to_help": 1.0,
-                "price_modifier": 0.5,
-                "special_actions": ["무료_서비스", "특별_정보_제공", "귀중한_선물"]
-            },
-            ReputationLevel.VERY_FRIENDLY: {
-                "greeting": f"오, {npc_name}입니다! 당신의 업적은 정말 훌륭합니다!",
-                "tone": "매우 친근하고 호의적인",
-                "willingness_to_help": 0.9,
-                "price_modifier": 0.7,
-                "special_actions": ["할인_제공", "추가_정보", "친절한_조언"]
-            },
-            ReputationLevel.FRIENDLY: {
-                "greeting": f"안녕하세요! {npc_name}입니다. 좋은 평판을 들었습니다.",
-                "tone": "친근하고 협조적인",
-                "willingness_to_help": 0.8,
-                "price_modifier": 0.9,
-                "special_actions": ["약간_할인", "기본_정보_제공"]
-            },
-            ReputationLevel.NEUTRAL: {
-                "greeting": f"안녕하세요. {npc_name}입니다.",
-                "tone": "평범하고 중립적인",
-                "willingness_to_help": 0.6,
-                "price_modifier": 1.0,
-                "special_actions": ["기본_서비스"]
-            },
-            ReputationLevel.SLIGHTLY_HOSTILE: {
-                "greeting": f"음... {npc_name}입니다. 당신에 대한 이야기를 들었는데...",
-                "tone": "약간 경계하는",
-                "willingness_to_help": 0.4,
-                "price_modifier": 1.2,
-                "special_actions": ["정보_제한", "경계"]
-            },
-            ReputationLevel.HOSTILE: {
-                "greeting": f"흥! {npc_name}다. 당신 같은 자와는 거래하기 싫지만...",
-                "tone": "적대적이고 불쾌한",
-                "willingness_to_help": 0.2,
-                "price_modifier": 1.5,
-                "special_actions": ["높은_가격", "무례한_태도", "정보_거부"]
-            },
-            ReputationLevel.VERY_HOSTILE: {
-                "greeting": f"당신이... {npc_name}은 당신을 경계하고 있습니다.",
-                "tone": "매우 적대적이고 두려워하는",
-                "willingness_to_help": 0.1,
-                "price_modifier": 2.0,
-                "special_actions": ["서비스_거부", "도망_시도", "경비_호출"]
-            },
-            ReputationLevel.ENEMY: {
-                "greeting": f"감히 여기에 나타나다니! {npc_name}이 당신을 용서하지 않겠다!",
-                "tone": "극도로 적대적이고 공격적인",
-                "willingness_to_help": 0.0,
-                "price_modifier": 3.0,
-                "special_actions": ["전투_시작", "도망", "경비_호출", "위협"]
-            }
-        }
-
-        config = response_configs[level]
+        tier = reputation_tier(reputation)
         
         return ReputationResponse(
-            level=level,
-            greeting=config["greeting"],
-            tone=config["tone"],
-            willingness_to_help=config["willingness_to_help"],
-            price_modifier=config["price_modifier"],
-            special_actions=config["special_actions"]
+            level=tier.level,
+            greeting=tier.greeting(npc_name),
+            tone=tier.tone,
+            willingness_to_help=tier.willingness_to_help,
+            price_modifier=tier.price_modifier,
+            special_actions=list(tier.special_actions)
         )
-    def generate_npc_dialogue(self, reputation: int, npc_name: str, location: str, context: str, user_input: str) -> str:
+    def generate_npc_dialogue(self, reputation: int, npc_name: str, location: str, context: str, user_input: str,
+                              personalize: Optional[bool] = None) -> str:
         #명성에 따른 NPC 대화 생성
+        #가벼운 대화는 대화 뱅크 템플릿으로 로컬 생성, 고유 맥락이 필요한 입력만 LLM 호출
+        #personalize: True면 항상 LLM, False면 항상 템플릿, None이면 입력으로 판단
         response_info = self.get_reputation_response(reputation, npc_name, location)
 
         # 특별한 행동 결정
         special_action = None
+        dialogue_rng = self.rng.stream("dialogue")
         if response_info.special_actions:
             if response_info.level == ReputationLevel.ENEMY:
                 # 적대적인 경우 높은 확률로 특별 행동
-                if random.random() < 0.7:
-                    special_action = random.choice(response_info.special_actions)
+                if dialogue_rng.random() < 0.7:
+                    special_action = choice(dialogue_rng, response_info.special_actions)
             elif response_info.level == ReputationLevel.VERY_HOSTILE:
-                if random.random() < 0.5:
-                    special_action = random.choice(response_info.special_actions)
+                if dialogue_rng.random() < 0.5:
+                    special_action = choice(dialogue_rng, response_info.special_actions)
             elif response_info.level == ReputationLevel.HEROIC:
-                if random.random() < 0.8:
-                    special_action = random.choice(response_info.special_actions)
+                if dialogue_rng.random() < 0.8:
+                    special_action = choice(dialogue_rng, response_info.special_actions)
+        
+        if personalize is None:
+            personalize = not is_small_talk(user_input)
+        
+        if not personalize:
+            archetype = npc_archetype(npc_name)
+            line = self.dialogue_bank.get_line(dialogue_rng, response_info.level, special_action, archetype,
+                                               npc_name, location)
+            if line is None and self.dialogue_bank.fill_with_llm(
+                self.llm, response_info.level, response_info.tone, special_action, archetype
+            ):
+                line = self.dialogue_bank.get_line(dialogue_rng, response_info.level, special_action, archetype,
+                                                   npc_name, location)
+            if line is not None:
+                return f"{npc_name}: {line}"
         
         sys_prompt = f"""
         당신은 {location}에 있는 {npc_name}입니다.
@@ -221,43 +250,28 @@ class ReputationManager:
     
     def get_reputation_status_message(self, reputation: int) -> str:
         #현재 명성 상태 메시지
-        level = self.get_reputation_level(reputation)
-        
-        status_messages = {
-            ReputationLevel.HEROIC: f"🌟 영웅 ({reputation}) - 모든 이들이 당신을 경외합니다!",
-            ReputationLevel.VERY_FRIENDLY: f"😊 매우 호의적 ({reputation}) - 사람들이 당신을 매우 좋아합니다!",
-            ReputationLevel.FRIENDLY: f"🙂 호의적 ({reputation}) - 사람들이 당신을 좋아합니다.",
-            ReputationLevel.NEUTRAL: f"😐 평범 ({reputation}) - 보통의 평판입니다.",
-            ReputationLevel.SLIGHTLY_HOSTILE: f"😕 약간 비호의적 ({reputation}) - 사람들이 당신을 경계합니다.",
-            ReputationLevel.HOSTILE: f"😠 적대적 ({reputation}) - 사람들이 당신을 싫어합니다.",
-            ReputationLevel.VERY_HOSTILE: f"😨 매우 적대적 ({reputation}) - 사람들이 당신을 무서워합니다!",
-            ReputationLevel.ENEMY: f"💀 원수 ({reputation}) - 사람들이 당신을 증오합니다!"
-        }
-
-        return status_messages[level]
+        return reputation_tier(reputation).status_message(reputation)
+    
+    def format_reputation_trend(self, series: List[tuple]) -> str:
+        #명성 시계열 (bucket, min, max, last, changes) -> 한 줄 추세 표시 (버킷별 마지막 명성 막대 + 범위)
+        if not series:
+            return "아직 기록이 없습니다"
+        bars = "".join(
+            TREND_BARS[min(len(TREND_BARS) - 1, (last + 100) * len(TREND_BARS) // 201)]
+            for _, _, _, last, _ in series
+        )
+        first, latest = series[0][3], series[-1][3]
+        lowest = min(row[1] for row in series)
+        highest = max(row[2] for row in series)
+        changes = sum(row[4] for row in series)
+        return f"{bars} {first} → {latest} (최저 {lowest}, 최고 {highest}, 변화 {changes}회)"
     
     def apply_reputation_to_price(self, base_price: int, reputation: int) -> int:
         #명성에 따른 가격 조정
-        response_info = self.get_reputation_response(reputation)
-        adjusted_price = int(base_price * response_info.price_modifier)
+        adjusted_price = int(base_price * reputation_tier(reputation).price_modifier)
         return max(1, adjusted_price)  # 최소 1골드
     
     def can_access_service(self, reputation: int, service_type: str) -> bool:
-        #명성에 따른 서비스 접근 가능 여부
-        level = self.get_reputation_level(reputation)
-        
-        service_requirements = {
-            "기본_상점": ReputationLevel.VERY_HOSTILE,
-            "특별_아이템": ReputationLevel.FRIENDLY,
-            "고급_서비스": ReputationLevel.VERY_FRIENDLY,
-            "영웅_전용": ReputationLevel.HEROIC,
-            "정보_수집": ReputationLevel.NEUTRAL,
-            "퀘스트_수주": ReputationLevel.SLIGHTLY_HOSTILE
-        }
-        
-        required_level = service_requirements.get(service_type, ReputationLevel.NEUTRAL)
-        player_level_value = list(REPUTATION_THRESHOLDS.keys()).index(level)
-        required_level_value = list(REPUTATION_THRESHOLDS.keys()).index(required_level)
-        
-        return player_level_value <= required_level_value
-    
\ No newline at end of file
+        #명성에 따른 서비스 접근 가능 여부 (등급 서열 비교)
+        required_level = SERVICE_REQUIREMENTS.get(service_type, ReputationLevel.NEUTRAL)
+        return reputation_tier(reputation).rank >= TIER_BY_LEVEL[required_level].rank
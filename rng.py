@@ -0,0 +1,70 @@
+#난수 관리 모듈
+#세션별 시드 하나에서 서브시스템별 독립 난수 스트림(전투, 보상, 대화 등)을 파생
+#시드와 스트림 상태를 저장 파일에 넣어 같은 세션을 그대로 재현
+
+import secrets
+import zlib
+from typing import Dict, Optional, Sequence, Any
+import numpy as np
+
+
+class GameRNG:
+    #세션 난수 생성기 - 이름별 서브스트림 제공
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else secrets.randbits(63)
+        self._streams: Dict[str, np.random.Generator] = {}
+
+    def _derive_state(self, name: str) -> Dict:
+        #시드와 스트림 이름으로 초기 상태 파생 (생성 순서와 무관하게 항상 같은 스트림)
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(zlib.crc32(name.encode("utf-8")),))
+        return np.random.PCG64(sequence).state
+
+    def stream(self, name: str) -> np.random.Generator:
+        #서브시스템 이름별 독립 난수 스트림
+        generator = self._streams.get(name)
+        if generator is None:
+            bit_generator = np.random.PCG64()
+            bit_generator.state = self._derive_state(name)
+            generator = np.random.Generator(bit_generator)
+            self._streams[name] = generator
+        return generator
+
+    def get_state(self) -> Dict:
+        #저장용 상태 (JSON 호환)
+        return {
+            "seed": self.seed,
+            "streams": {name: gen.bit_generator.state for name, gen in self._streams.items()}
+        }
+
+    def load_state(self, state: Optional[Dict]):
+        #저장된 상태 복원 - 이미 배포된 스트림 객체는 그대로 두고 상태만 교체
+        if not state:
+            return
+
+        self.seed = state["seed"]
+        saved_streams = state.get("streams", {})
+
+        for name, generator in self._streams.items():
+            generator.bit_generator.state = saved_streams.get(name) or self._derive_state(name)
+
+        for name, stream_state in saved_streams.items():
+            if name not in self._streams:
+                self.stream(name).bit_generator.state = stream_state
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "GameRNG":
+        #저장된 상태로 생성 (상태가 없으면 새 시드)
+        rng = cls(state["seed"] if state else None)
+        rng.load_state(state)
+        return rng
+
+
+def randint(generator: np.random.Generator, low: int, high: int) -> int:
+    #low 이상 high 이하 정수 (random.randint 대응)
+    return int(generator.integers(low, high, endpoint=True))
+
+
+def choice(generator: np.random.Generator, options: Sequence[Any]) -> Any:
+    #시퀀스에서 하나 선택 (random.choice 대응 - 튜플 원소도 그대로 반환)
+    return options[int(generator.integers(len(options)))]
@@ -0,0 +1,890 @@
+#게임 저장 시스템 모듈
+#저널 기반 증분 저장, 주기적 압축, 저널 재생을 통한 로드 처리
+#기본 스냅샷은 고정 크기 메타데이터 헤더 + zlib 압축 JSON 본문 형식
+
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field, is_dataclass, replace
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional, Any, Tuple
+from langchain_core.messages import HumanMessage, AIMessage
+from models import Player
+
+# 저장 파일 규칙
+SAVE_DIR = "saves"              # 저장 전용 디렉토리 (게임 DB 변경이 목록 재동기화를 유발하지 않도록 분리)
+SAVE_PREFIX = "savegame_"
+SNAPSHOT_EXT = ".sav"           # 기본 스냅샷 (압축 시점의 전체 상태)
+JOURNAL_EXT = ".journal"        # 스냅샷 이후 변경분만 기록하는 추가 전용 저널
+DB_SNAPSHOT_SUFFIX = "_db.db"   # 슬롯별 DB 스냅샷
+LEGACY_SAVE_EXT = ".pkl"        # 이전 버전의 pickle 저장 (작업 디렉토리, DB 백업은 같은 DB_SNAPSHOT_SUFFIX)
+
+# 저널 항목이 이 개수에 도달하면 다음 저장 시 기본 스냅샷으로 압축
+COMPACTION_INTERVAL = 20
+
+# 저장 목록 카탈로그 (저장 디렉토리 내 SQLite 인덱스)
+CATALOG_FILENAME = "saves_catalog.db"
+
+# 자동 저장 정책 - N턴마다, T초마다, 또는 주요 사건 발생 시
+AUTOSAVE_TURN_INTERVAL = 3
+AUTOSAVE_TIME_INTERVAL = 120.0
+AUTOSAVE_EVENTS = ("battle", "companion_join", "companion_leave")
+
+# 자동 저장 전용 슬롯 (돌아가며 가장 오래된 슬롯에 기록 - 플레이어가 직접 저장한 슬롯은 건드리지 않음)
+AUTOSAVE_SLOT_PREFIX = SAVE_PREFIX + "autosave_"
+AUTOSAVE_SLOT_COUNT = 3
+
+# 상태에서 저널 비교 대상이 아닌 키 (별도 처리)
+UNTRACKED_KEYS = ("main_story_db", "messages")
+
+# 스냅샷 파일 형식
+# magic, 버전, 헤더 크기, 플레이어 이름, 위치, 골드, 파티 인원, 턴 수, 저장 시각, 본문 길이, 본문 CRC32
+SAVE_MAGIC = b"RPGS"
+SAVE_FORMAT_VERSION = 1
+_HEADER_STRUCT = struct.Struct("<4sHH64s96siBIdII")
+HEADER_SIZE = _HEADER_STRUCT.size
+_NAME_FIELD_SIZE = 64
+_LOCATION_FIELD_SIZE = 96
+
+
+@dataclass
+class SaveHeader:
+    #저장 파일 헤더 정보 (본문을 읽지 않고 조회 가능)
+    version: int
+    player_name: str
+    location: str
+    gold: int
+    party_size: int
+    turn_count: int
+    saved_at: float
+    body_length: int
+    body_crc: int
+
+
+def _pack_text(text: str, size: int) -> bytes:
+    #고정 길이 필드용 UTF-8 인코딩 (문자 경계에서 자르기)
+    encoded = (text or "").encode("utf-8")[:size]
+    return encoded.decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def _unpack_text(raw: bytes) -> str:
+    #고정 길이 필드 디코딩
+    return raw.rstrip(b"\0").decode("utf-8", errors="ignore")
+
+
+def build_save_header(state: Dict, body_length: int, body_crc: int) -> SaveHeader:
+    #게임 상태에서 헤더 메타데이터 생성
+    player = state.get("player")
+    if isinstance(player, dict):
+        player_name = player.get("name", "")
+    else:
+        player_name = getattr(player, "name", "") or ""
+
+    messages = state.get("messages", [])
+    turn_count = sum(1 for msg in messages if isinstance(msg, HumanMessage))
+
+    return SaveHeader(
+        version=SAVE_FORMAT_VERSION,
+        player_name=player_name,
+        location=state.get("current_location", "") or "",
+        gold=int(state.get("player_gold", 0) or 0),
+        party_size=min(255, 1 + len(state.get("companion_ids", []) or [])),
+        turn_count=turn_count,
+        saved_at=time.time(),
+        body_length=body_length,
+        body_crc=body_crc
+    )
+
+
+def pack_save_header(header: SaveHeader) -> bytes:
+    #헤더를 고정 크기 바이트열로 변환
+    return _HEADER_STRUCT.pack(
+        SAVE_MAGIC,
+        header.version,
+        HEADER_SIZE,
+        _pack_text(header.player_name, _NAME_FIELD_SIZE),
+        _pack_text(header.location, _LOCATION_FIELD_SIZE),
+        header.gold,
+        header.party_size,
+        header.turn_count,
+        header.saved_at,
+        header.body_length,
+        header.body_crc
+    )
+
+
+def unpack_save_header(raw: bytes) -> SaveHeader:
+    #고정 크기 바이트열에서 헤더 복원
+    if len(raw) < HEADER_SIZE:
+        raise ValueError("저장 파일 헤더가 손상되었습니다.")
+
+    (magic, version, header_size, name, location, gold, party_size,
+     turn_count, saved_at, body_length, body_crc) = _HEADER_STRUCT.unpack(raw[:HEADER_SIZE])
+
+    if magic != SAVE_MAGIC:
+        raise ValueError("올바른 저장 파일이 아닙니다.")
+    if version > SAVE_FORMAT_VERSION or header_size != HEADER_SIZE:
+        raise ValueError(f"지원하지 않는 저장 파일 버전입니다: {version}")
+
+    return SaveHeader(
+        version=version,
+        player_name=_unpack_text(name),
+        location=_unpack_text(location),
+        gold=gold,
+        party_size=party_size,
+        turn_count=turn_count,
+        saved_at=saved_at,
+        body_length=body_length,
+        body_crc=body_crc
+    )
+
+
+def read_save_header(path: str) -> SaveHeader:
+    #저장 파일에서 헤더만 읽기 (본문은 읽지 않음)
+    with open(path, "rb") as f:
+        return unpack_save_header(f.read(HEADER_SIZE))
+
+
+def serialize_messages(messages: List) -> List[Dict]:
+    #메시지를 직렬화 가능한 형태로 변환
+    serializable_messages = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            serializable_messages.append({"type": "human", "content": msg.content})
+        elif isinstance(msg, AIMessage):
+            serializable_messages.append({"type": "ai", "content": msg.content})
+    return serializable_messages
+
+
+def deserialize_messages(message_data: List[Dict]) -> List:
+    #직렬화된 메시지 복원
+    restored_messages = []
+    for msg_data in message_data:
+        if msg_data["type"] == "human":
+            restored_messages.append(HumanMessage(content=msg_data["content"]))
+        elif msg_data["type"] == "ai":
+            restored_messages.append(AIMessage(content=msg_data["content"]))
+    return restored_messages
+
+
+def _encode_value(value: Any) -> Any:
+    #상태 값을 JSON 호환 형태로 변환
+    if isinstance(value, Player):
+        return {"__player__": asdict(value)}
+    if is_dataclass(value) and not isinstance(value, type):
+        return _encode_value(asdict(value))
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(k): _encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    #JSON 값을 상태 값으로 복원
+    if isinstance(value, dict):
+        if "__player__" in value and len(value) == 1:
+            return Player(**value["__player__"])
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def new_slot_name() -> str:
+    #새 저장 슬롯 이름 생성
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{SAVE_PREFIX}{timestamp}"
+
+
+def autosave_slot_name(index: int) -> str:
+    #자동 저장 슬롯 이름 (1부터)
+    return f"{AUTOSAVE_SLOT_PREFIX}{index}"
+
+
+def is_autosave_slot(slot_name: str) -> bool:
+    #자동 저장 전용 슬롯인지 확인
+    return (slot_name or "").startswith(AUTOSAVE_SLOT_PREFIX)
+
+
+def slot_name_from_filename(filename: str) -> str:
+    #파일명에서 저장 슬롯 이름 추출 (확장자 및 DB 스냅샷 접미사 제거)
+    slot_name = os.path.basename(filename)
+    if slot_name.endswith(DB_SNAPSHOT_SUFFIX):
+        return slot_name[:-len(DB_SNAPSHOT_SUFFIX)]
+    return os.path.splitext(slot_name)[0]
+
+
+@dataclass
+class SaveSnapshot:
+    #메인 스레드에서 캡처한 저장 시점의 일관된 상태 (파일 쓰기는 나중에 수행 가능)
+    capture_seq: int
+    state: Dict
+    messages: List[Dict]
+    header: SaveHeader
+    db_source: Optional[sqlite3.Connection]  # DB 변경이 없거나 db_copy_path를 쓰면 None
+    db_marker: Optional[Tuple]
+    owns_db_source: bool  # 메모리 복사본이면 쓰기 후 닫기
+    db_copy_path: Optional[str]  # 같은 DB 상태가 이미 기록된 다른 슬롯의 DB 파일 (파일만 연결/복사)
+    captured_at: float
+
+
+class SaveJournal:
+    #저장 슬롯 하나에 대한 저널 기반 저장 관리 클래스
+
+    def __init__(self, slot_name: str, save_dir: str = SAVE_DIR):
+        self.slot_name = slot_name
+        self.save_dir = save_dir
+        self.snapshot_path = os.path.join(save_dir, slot_name + SNAPSHOT_EXT)
+        self.journal_path = os.path.join(save_dir, slot_name + JOURNAL_EXT)
+        self.db_snapshot_path = os.path.join(save_dir, slot_name + DB_SNAPSHOT_SUFFIX)
+
+        # 마지막 저장 시점 정보 (메모리)
+        self._saved_state: Optional[Dict] = None
+        self._saved_message_count = 0
+        self._seq = 0
+        self._journal_entries = 0
+        self._db_marker = None  # 슬롯 DB 스냅샷의 MainStoryDB.data_version - DB 변경 여부 판단용
+        self._last_header: Optional[SaveHeader] = None
+
+        # 캡처 순서 (오래된 캡처가 최신 저장을 덮어쓰지 않도록)
+        self._capture_seq = 0
+        self._written_capture_seq = 0
+        self._lock = threading.RLock()
+
+    def save(self, state: Dict) -> Dict:
+        #상태 저장 - 변경분만 저널에 추가하거나 필요 시 스냅샷으로 압축
+        return self.write(self.capture(state, detach_db=False))
+
+    def capture(self, state: Dict, detach_db: bool = True, db_copy: Optional[Tuple[Tuple, str]] = None) -> SaveSnapshot:
+        #현재 상태의 일관된 스냅샷 캡처 (메인 스레드에서 호출)
+        #detach_db이면 변경된 DB를 메모리 DB로 복사해 다른 스레드에서 쓸 수 있게 함
+        #db_copy: (DB 버전, 그 버전이 기록된 DB 파일) - 버전이 같으면 DB를 다시 복사하지 않고 기록 시 그 파일을 사용
+        with self._lock:
+            self._capture_seq += 1
+            capture_seq = self._capture_seq
+            db_marker_on_disk = self._db_marker
+
+        db_source = None
+        db_marker = None
+        db_copy_path = None
+        main_db = state.get("main_story_db")
+        if main_db:
+            db_marker = main_db.data_version()
+            if db_marker == db_marker_on_disk and os.path.exists(self.db_snapshot_path):
+                pass
+            elif db_copy is not None and db_copy[0] == db_marker and os.path.exists(db_copy[1]):
+                db_copy_path = db_copy[1]
+            elif detach_db:
+                db_source = sqlite3.connect(":memory:", check_same_thread=False)
+                main_db.conn.backup(db_source)
+            else:
+                db_source = main_db.conn
+
+        return SaveSnapshot(
+            capture_seq=capture_seq,
+            state=self._capture_state(state),
+            messages=serialize_messages(state.get("messages", [])),
+            header=build_save_header(state, 0, 0),
+            db_source=db_source,
+            db_marker=db_marker,
+            owns_db_source=detach_db and db_source is not None,
+            db_copy_path=db_copy_path,
+            captured_at=time.time()
+        )
+
+    def write(self, snapshot: SaveSnapshot) -> Dict:
+        #캡처된 스냅샷을 파일에 기록 (작업 스레드에서도 호출 가능)
+        try:
+            with self._lock:
+                if snapshot.capture_seq <= self._written_capture_seq:
+                    return {"mode": "skipped", "bytes": 0, "seq": self._seq}
+
+                current_state = snapshot.state
+                messages = snapshot.messages
+
+                needs_snapshot = (
+                    self._saved_state is None
+                    or len(messages) < self._saved_message_count
+                    or self._journal_entries >= COMPACTION_INTERVAL
+                )
+
+                if needs_snapshot:
+                    written = self._write_snapshot(snapshot.header, current_state, messages)
+                    mode = "snapshot"
+                else:
+                    written = self._append_entry(current_state, messages)
+                    self._refresh_header(snapshot.header)
+                    mode = "journal"
+
+                self._saved_state = current_state
+                self._saved_message_count = len(messages)
+                self._write_db_snapshot(snapshot)
+                self._written_capture_seq = snapshot.capture_seq
+
+                # 저장 목록 카탈로그 갱신
+                get_save_catalog(self.save_dir).record(self.slot_name, self._last_header, self.total_size())
+
+                return {"mode": mode, "bytes": written, "seq": self._seq}
+        finally:
+            if snapshot.owns_db_source:
+                snapshot.db_source.close()
+
+    def compact(self, state: Dict) -> Dict:
+        #현재 상태를 기본 스냅샷으로 압축하고 저널 비우기
+        with self._lock:
+            self._journal_entries = COMPACTION_INTERVAL
+            return self.save(state)
+
+    def load(self) -> Dict:
+        #기본 스냅샷 로드 후 저널 재생
+        with self._lock:
+            with open(self.snapshot_path, "rb") as f:
+                header = unpack_save_header(f.read(HEADER_SIZE))
+                body = f.read(header.body_length)
+
+            if len(body) != header.body_length or zlib.crc32(body) != header.body_crc:
+                raise ValueError("저장 파일 본문이 손상되었습니다.")
+            snapshot = json.loads(zlib.decompress(body).decode("utf-8"))
+
+            state = dict(snapshot["state"])
+            messages = list(snapshot["messages"])
+            seq = snapshot.get("seq", 0)
+            entries = 0
+
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # 저장 도중 중단되어 잘린 마지막 줄은 무시
+                            break
+                        if entry["seq"] <= seq:
+                            continue
+                        state.update(entry.get("changes", {}))
+                        for key in entry.get("removed", []):
+                            state.pop(key, None)
+                        messages.extend(entry.get("messages", []))
+                        seq = entry["seq"]
+                        entries += 1
+
+            # 이어서 저장할 수 있도록 메모리 상태 복원
+            self._saved_state = state
+            self._saved_message_count = len(messages)
+            self._seq = seq
+            self._journal_entries = entries
+            self._db_marker = None
+            self._written_capture_seq = self._capture_seq
+
+        save_state = {key: _decode_value(value) for key, value in state.items()}
+        save_state["messages"] = deserialize_messages(messages)
+        return save_state
+
+    def delete(self):
+        #슬롯 관련 파일 모두 삭제
+        with self._lock:
+            for path in (self.snapshot_path, self.journal_path, self.db_snapshot_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._saved_state = None
+        get_save_catalog(self.save_dir).remove(self.slot_name)
+
+    def total_size(self) -> int:
+        #스냅샷 + 저널 크기
+        total = 0
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                total += os.path.getsize(path)
+        return total
+
+    def _capture_state(self, state: Dict) -> Dict:
+        #저널 비교용 상태 캡처 (DB 객체, 메시지 제외)
+        captured = {}
+        for key, value in state.items():
+            if key in UNTRACKED_KEYS:
+                continue
+            captured[key] = _encode_value(value)
+        captured["db_path"] = "main_story.db"
+        return captured
+
+    def _write_snapshot(self, header: SaveHeader, current_state: Dict, messages: List[Dict]) -> int:
+        #기본 스냅샷 작성 (임시 파일 후 교체) 및 저널 초기화
+        self._seq += 1
+        snapshot = {
+            "seq": self._seq,
+            "saved_at": header.saved_at,
+            "state": current_state,
+            "messages": messages
+        }
+        body = zlib.compress(json.dumps(snapshot, ensure_ascii=False).encode("utf-8"))
+        header = replace(header, body_length=len(body), body_crc=zlib.crc32(body))
+        data = pack_save_header(header) + body
+        self._last_header = header
+
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # 스냅샷에 포함된 저널 항목은 seq로 걸러지므로 교체 후 비워도 안전
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+
+        self._journal_entries = 0
+        return len(data)
+
+    def _append_entry(self, current_state: Dict, messages: List[Dict]) -> int:
+        #마지막 저장 이후 변경된 상태와 새 메시지만 저널에 추가
+        changes = {key: value for key, value in current_state.items()
+                   if key not in self._saved_state or self._saved_state[key] != value}
+        removed = [key for key in self._saved_state if key not in current_state]
+
+        self._seq += 1
+        entry = {
+            "seq": self._seq,
+            "saved_at": time.time(),
+            "changes": changes,
+            "removed": removed,
+            "messages": messages[self._saved_message_count:]
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._journal_entries += 1
+        return len(line)
+
+    def _refresh_header(self, header: SaveHeader):
+        #저널 저장 후 스냅샷 헤더만 현재 메타데이터로 제자리 갱신 (본문 정보는 유지)
+        with open(self.snapshot_path, "r+b") as f:
+            old_header = unpack_save_header(f.read(HEADER_SIZE))
+            header = replace(header, body_length=old_header.body_length, body_crc=old_header.body_crc)
+            f.seek(0)
+            f.write(pack_save_header(header))
+        self._last_header = header
+
+    def mark_db_synced(self, main_db):
+        #현재 DB가 슬롯 DB 스냅샷과 같음을 기록 (복원 직후 불필요한 재백업 방지)
+        with self._lock:
+            self._db_marker = main_db.data_version()
+
+    def _write_db_snapshot(self, snapshot: SaveSnapshot):
+        #캡처 시점에 DB가 변경되어 있었던 경우에만 슬롯 DB 스냅샷 갱신
+        #임시 파일에 쓴 뒤 교체 - 다른 슬롯과 하드 링크로 공유하던 파일은 덮어쓰지 않음
+        temp_path = self.db_snapshot_path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        if snapshot.db_copy_path is not None:
+            # 같은 DB 상태가 이미 다른 슬롯에 있음 - 하드 링크 (지원하지 않는 파일 시스템이면 파일 복사)
+            try:
+                os.link(snapshot.db_copy_path, temp_path)
+            except OSError:
+                shutil.copyfile(snapshot.db_copy_path, temp_path)
+        elif snapshot.db_source is not None:
+            backup_conn = sqlite3.connect(temp_path)
+            try:
+                snapshot.db_source.backup(backup_conn)
+            finally:
+                backup_conn.close()
+        else:
+            return
+
+        os.replace(temp_path, self.db_snapshot_path)
+        self._db_marker = snapshot.db_marker
+
+
+class SaveCatalog:
+    #저장 목록 카탈로그 - 저장/삭제 시 갱신되고 디렉토리 변경 시에만 지연 재동기화
+
+    def __init__(self, save_dir: str = SAVE_DIR):
+        self.save_dir = save_dir
+        os.makedirs(save_dir, exist_ok=True)
+        # 자동 저장 작업 스레드에서도 기록하므로 스레드 간 공유 + 잠금
+        self.conn = sqlite3.connect(os.path.join(save_dir, CATALOG_FILENAME), check_same_thread=False)
+        self._lock = threading.RLock()
+        # 롤백 저널 파일 생성/삭제로 디렉토리 mtime이 바뀌지 않도록 WAL 사용
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        #카탈로그 테이블 생성
+        cursor = self.conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS saves (
+            slot_name TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            player_name TEXT,
+            location TEXT,
+            gold INTEGER DEFAULT 0,
+            party_size INTEGER DEFAULT 1,
+            turn_count INTEGER DEFAULT 0,
+            saved_at REAL NOT NULL,
+            size INTEGER DEFAULT 0,
+            file_mtime INTEGER DEFAULT 0
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_saves_saved_at ON saves (saved_at DESC)
+        ''')
+
+        # 마지막 동기화 시점의 디렉토리 mtime 등 메타 정보
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''')
+
+        self.conn.commit()
+
+    def record(self, slot_name: str, header: Optional[SaveHeader] = None, size: Optional[int] = None):
+        #저장 슬롯 정보 기록 (헤더가 없으면 파일에서 읽음)
+        with self._lock:
+            snapshot_path = os.path.join(self.save_dir, slot_name + SNAPSHOT_EXT)
+            if header is None:
+                header = read_save_header(snapshot_path)
+            if size is None:
+                size = get_save_journal(slot_name, self.save_dir).total_size()
+
+            self.conn.execute('''
+                INSERT OR REPLACE INTO saves
+                (slot_name, filename, player_name, location, gold, party_size,
+                 turn_count, saved_at, size, file_mtime)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                slot_name, slot_name + SNAPSHOT_EXT, header.player_name, header.location,
+                header.gold, header.party_size, header.turn_count, header.saved_at,
+                size, os.stat(snapshot_path).st_mtime_ns
+            ))
+            self.conn.commit()
+
+    def remove(self, slot_name: str):
+        #저장 슬롯 정보 삭제
+        with self._lock:
+            self.conn.execute("DELETE FROM saves WHERE slot_name = ?", (slot_name,))
+            self.conn.commit()
+
+    def count(self) -> int:
+        #저장 슬롯 수
+        with self._lock:
+            self.resync()
+            return self.conn.execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+
+    def list_saves(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        #최신 저장 순으로 저장 목록 조회 (페이지 단위)
+        with self._lock:
+            self.resync()
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                SELECT slot_name, filename, player_name, location, gold, party_size,
+                       turn_count, saved_at, size
+                FROM saves
+                ORDER BY saved_at DESC
+                LIMIT ? OFFSET ?
+            ''', (limit, offset))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def resync(self, force: bool = False):
+        #디렉토리가 바뀐 경우에만 파일 목록과 카탈로그 동기화
+        with self._lock:
+            dir_mtime = str(os.stat(self.save_dir).st_mtime_ns)
+            row = self.conn.execute("SELECT value FROM catalog_meta WHERE key = 'dir_mtime'").fetchone()
+            if not force and row and row[0] == dir_mtime:
+                return
+
+            known = {slot_name: file_mtime for slot_name, file_mtime in
+                     self.conn.execute("SELECT slot_name, file_mtime FROM saves")}
+            found = set()
+
+            with os.scandir(self.save_dir) as entries:
+                for entry in entries:
+                    if not (entry.name.startswith(SAVE_PREFIX) and entry.name.endswith(SNAPSHOT_EXT)):
+                        continue
+                    slot_name = entry.name[:-len(SNAPSHOT_EXT)]
+                    found.add(slot_name)
+
+                    # 변경되지 않은 파일은 헤더를 다시 읽지 않음
+                    if known.get(slot_name) == entry.stat().st_mtime_ns:
+                        continue
+                    try:
+                        self.record(slot_name)
+                    except (OSError, ValueError, struct.error):
+                        continue
+
+            vanished = [(slot_name,) for slot_name in known if slot_name not in found]
+            if vanished:
+                self.conn.executemany("DELETE FROM saves WHERE slot_name = ?", vanished)
+
+            self.conn.execute('''
+                INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('dir_mtime', ?)
+            ''', (dir_mtime,))
+            self.conn.commit()
+
+    def close(self):
+        #카탈로그 연결 종료
+        if self.conn:
+            self.conn.close()
+
+
+def import_legacy_saves(source_dir: str = ".", save_dir: str = SAVE_DIR) -> List[str]:
+    #이전 버전의 pickle 저장(savegame_*.pkl)을 같은 이름의 저널 슬롯으로 한 번 변환
+    #이미 변환된 슬롯은 건너뛰고, 원본 파일은 그대로 둠 - 변환한 슬롯 이름 목록 반환
+    imported = []
+    for filename in sorted(os.listdir(source_dir)):
+        if not (filename.startswith(SAVE_PREFIX) and filename.endswith(LEGACY_SAVE_EXT)):
+            continue
+        slot_name = filename[:-len(LEGACY_SAVE_EXT)]
+        journal = get_save_journal(slot_name, save_dir)
+        if os.path.exists(journal.snapshot_path):
+            continue
+
+        try:
+            with open(os.path.join(source_dir, filename), "rb") as f:
+                legacy_state = pickle.load(f)
+
+            state = {key: value for key, value in legacy_state.items() if key not in ("db_path", "main_story_db")}
+            state["messages"] = deserialize_messages(legacy_state.get("messages", []))
+            state["save_slot"] = slot_name
+
+            legacy_db_path = os.path.join(source_dir, slot_name + DB_SNAPSHOT_SUFFIX)
+            if os.path.exists(legacy_db_path):
+                shutil.copyfile(legacy_db_path, journal.db_snapshot_path)
+
+            journal.save(state)
+            imported.append(slot_name)
+        except Exception as e:
+            print(f"이전 저장 파일 변환 실패 ({filename}): {e}")
+    return imported
+
+
+# 세션 중 슬롯별 저널 (메모리 상태 유지용)
+_journals: Dict[str, SaveJournal] = {}
+
+# 저장 디렉토리별 카탈로그
+_catalogs: Dict[str, SaveCatalog] = {}
+
+
+def get_save_journal(slot_name: str, save_dir: str = SAVE_DIR) -> SaveJournal:
+    #슬롯별 저널 조회 (없으면 생성)
+    key = os.path.join(save_dir, slot_name)
+    if key not in _journals:
+        os.makedirs(save_dir, exist_ok=True)
+        _journals[key] = SaveJournal(slot_name, save_dir)
+    return _journals[key]
+
+
+def forget_save_journal(slot_name: str, save_dir: str = SAVE_DIR):
+    #슬롯 저널을 메모리에서 제거
+    _journals.pop(os.path.join(save_dir, slot_name), None)
+
+
+def get_save_catalog(save_dir: str = SAVE_DIR) -> SaveCatalog:
+    #저장 디렉토리별 카탈로그 조회 (없으면 생성)
+    key = os.path.abspath(save_dir)
+    if key not in _catalogs:
+        _catalogs[key] = SaveCatalog(save_dir)
+    return _catalogs[key]
+
+
+@dataclass
+class SaveMetrics:
+    #저장 소요 시간 통계
+    saves: int = 0
+    coalesced: int = 0
+    failures: int = 0
+    db_backups: int = 0          # 메인 스레드에서 DB를 복사한 횟수 (DB가 바뀐 경우만)
+    capture_total: float = 0.0   # 메인 스레드에서 상태 캡처에 걸린 시간 합계
+    capture_max: float = 0.0
+    write_total: float = 0.0     # 작업 스레드에서 파일 기록에 걸린 시간 합계
+    write_max: float = 0.0
+    last_write: float = 0.0
+    last_error: str = ""
+    reasons: Dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        #통계 요약 문자열
+        captures = self.saves + self.coalesced + self.failures
+        avg_capture = self.capture_total / captures * 1000 if captures else 0.0
+        avg_write = self.write_total / self.saves * 1000 if self.saves else 0.0
+        lines = [
+            f"자동 저장 {self.saves}회 (병합 {self.coalesced}회, 실패 {self.failures}회)",
+            f"상태 캡처: 평균 {avg_capture:.2f}ms, 최대 {self.capture_max * 1000:.2f}ms (DB 복사 {self.db_backups}회)",
+            f"파일 기록: 평균 {avg_write:.2f}ms, 최대 {self.write_max * 1000:.2f}ms, 최근 {self.last_write * 1000:.2f}ms"
+        ]
+        if self.reasons:
+            lines.append("저장 사유: " + ", ".join(f"{reason} {count}회" for reason, count in self.reasons.items()))
+        if self.last_error:
+            lines.append(f"최근 오류: {self.last_error}")
+        return "\n".join(lines)
+
+
+class AutosaveManager:
+    #턴 경계 자동 저장 관리 클래스
+    #메인 스레드는 상태만 캡처하고, 파일 기록은 작업 스레드가 처리 (대기 중인 요청은 최신 것으로 병합)
+    #마지막으로 기록한 슬롯 DB의 버전을 기억해 DB가 그대로면 메인 스레드에서 다시 복사하지 않음 (슬롯을 돌아가며 써도)
+
+    def __init__(self, turn_interval: int = AUTOSAVE_TURN_INTERVAL,
+                 time_interval: float = AUTOSAVE_TIME_INTERVAL,
+                 save_dir: str = SAVE_DIR, slot_count: int = AUTOSAVE_SLOT_COUNT):
+        self.turn_interval = turn_interval
+        self.time_interval = time_interval
+        self.save_dir = save_dir
+        self.slot_count = max(1, slot_count)
+        self.metrics = SaveMetrics()
+        self._next_slot = self._oldest_slot()
+
+        self._last_turn_count = None
+        self._turns_since_save = 0
+        self._last_save_time = time.monotonic()
+        self._last_party_size = None
+
+        self._pending: Optional[Tuple[SaveJournal, SaveSnapshot, str]] = None
+        self._db_copy: Optional[Tuple[Tuple, str]] = None  # (DB 버전, 그 버전을 마지막으로 기록한 슬롯 DB 파일)
+        self._busy = False
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._worker, name="autosave", daemon=True)
+        self._thread.start()
+
+    def on_turn(self, state: Dict, event: Optional[str] = None) -> bool:
+        #턴 경계에서 호출 - 정책에 해당하면 자동 저장 요청
+        if not state.get("main_story_player_id"):
+            return False
+
+        turn_count = sum(1 for msg in state.get("messages", []) if isinstance(msg, HumanMessage))
+        if self._last_turn_count is None:
+            self._last_turn_count = turn_count
+        if turn_count > self._last_turn_count:
+            self._turns_since_save += turn_count - self._last_turn_count
+            self._last_turn_count = turn_count
+
+        # 동료 합류/이탈은 파티 인원 변화로도 감지
+        party_size = len(state.get("companion_ids", []) or [])
+        if self._last_party_size is not None and event is None and party_size != self._last_party_size:
+            event = "companion_join" if party_size > self._last_party_size else "companion_leave"
+        self._last_party_size = party_size
+
+        if event in AUTOSAVE_EVENTS:
+            reason = event
+        elif self._turns_since_save >= self.turn_interval:
+            reason = "turns"
+        elif self._turns_since_save > 0 and time.monotonic() - self._last_save_time >= self.time_interval:
+            reason = "time"
+        else:
+            return False
+
+        self.request_save(state, reason)
+        return True
+
+    def _oldest_slot(self) -> int:
+        #다음에 기록할 자동 저장 슬롯 번호 - 비어 있거나 가장 오래된 슬롯
+        def saved_at(index: int) -> float:
+            path = os.path.join(self.save_dir, autosave_slot_name(index) + SNAPSHOT_EXT)
+            return os.stat(path).st_mtime if os.path.exists(path) else float("-inf")
+        return min(range(1, self.slot_count + 1), key=saved_at)
+
+    def request_save(self, state: Dict, reason: str = "manual"):
+        #현재 상태를 캡처해 작업 스레드에 저장 요청
+        #자동 저장 전용 슬롯에 돌아가며 기록 (state["save_slot"]은 플레이어의 직접 저장용으로 그대로 둠)
+        started = time.perf_counter()
+
+        slot_name = autosave_slot_name(self._next_slot)
+        self._next_slot = self._next_slot % self.slot_count + 1
+        journal = get_save_journal(slot_name, self.save_dir)
+        with self._condition:
+            db_copy = self._db_copy
+        snapshot = journal.capture(state, db_copy=db_copy)
+
+        elapsed = time.perf_counter() - started
+        with self._condition:
+            if snapshot.owns_db_source:
+                self.metrics.db_backups += 1
+            self.metrics.capture_total += elapsed
+            self.metrics.capture_max = max(self.metrics.capture_max, elapsed)
+
+            if self._pending is not None:
+                # 아직 기록되지 않은 이전 요청은 최신 스냅샷으로 대체
+                _, old_snapshot, _ = self._pending
+                if old_snapshot.owns_db_source:
+                    old_snapshot.db_source.close()
+                self.metrics.coalesced += 1
+            self._pending = (journal, snapshot, reason)
+            self._condition.notify()
+
+        self._turns_since_save = 0
+        self._last_save_time = time.monotonic()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        #대기 중인 자동 저장이 모두 기록될 때까지 대기
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending is not None or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stop(self, timeout: Optional[float] = None):
+        #남은 저장을 마치고 작업 스레드 종료
+        self.flush(timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _worker(self):
+        #작업 스레드 - 대기 중인 스냅샷을 하나씩 기록
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._pending is None and self._stopped:
+                    return
+                journal, snapshot, reason = self._pending
+                self._pending = None
+                self._busy = True
+
+            started = time.perf_counter()
+            error = None
+            written = False
+            try:
+                written = journal.write(snapshot)["mode"] != "skipped"
+            except Exception as e:
+                error = e
+            elapsed = time.perf_counter() - started
+
+            with self._condition:
+                if error is None:
+                    if written and snapshot.db_marker is not None:
+                        self._db_copy = (snapshot.db_marker, journal.db_snapshot_path)
+                    self.metrics.saves += 1
+                    self.metrics.write_total += elapsed
+                    self.metrics.write_max = max(self.metrics.write_max, elapsed)
+                    self.metrics.last_write = elapsed
+                    self.metrics.reasons[reason] = self.metrics.reasons.get(reason, 0) + 1
+                else:
+                    self.metrics.failures += 1
+                    self.metrics.last_error = str(error)
+                self._busy = False
+                self._condition.notify_all()
+
@@ -233,9 +233,7 @@ class StoryManager:
         player_id = state.get("main_story_player_id")
         
         if main_db and player_id:
-            player_data = main_db.get_character(player_id)
-            if player_data:
-                return player_data['reputation']
+            return main_db.get_reputation(player_id)
         
         return 0
     
@@ -0,0 +1,34 @@
+#loot_tables 점검 - alias 테이블 추첨 분포가 가중치와 일치하는지 (고정 시드)
+
+import numpy as np
+import pytest
+
+from inventory_system import ItemRewardSystem
+from loot_tables import LootTables
+
+DRAWS = 200_000
+SEED = 2024
+
+
+@pytest.fixture(scope="module")
+def loot():
+    return LootTables(ItemRewardSystem().possible_items)
+
+
+@pytest.mark.parametrize("location, difficulty", [("마을", "easy"), ("어두운 동굴", "normal"), ("고대 유적", "hard")])
+def test_alias_distribution_matches_weights(loot, location, difficulty):
+    rng = np.random.default_rng(SEED)
+    expected = loot.weights_for(location, difficulty)
+    expected = expected / expected.sum()
+    counts = np.bincount(loot.table(location, difficulty).sample(rng, DRAWS), minlength=len(expected))
+    observed = counts / DRAWS
+
+    # 각 아이템 빈도가 기댓값의 표준오차 5배 안에 있어야 함
+    tolerance = 5 * np.sqrt(expected * (1 - expected) / DRAWS)
+    assert np.all(np.abs(observed - expected) <= tolerance), f"{location}/{difficulty} 분포 불일치"
+
+
+def test_draw_returns_exact_count(loot):
+    rng = np.random.default_rng(SEED)
+    assert len(loot.draw(rng, 7, "마을", "easy")) == 7
+    assert loot.draw(rng, 0, "마을", "easy") == []
@@ -0,0 +1,74 @@
+#save_system 점검 - 자동 저장 슬롯 순환과 DB 스냅샷 재사용
+
+import os
+import sqlite3
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from database import MainStoryDB
+from models import Player
+from save_system import AutosaveManager, autosave_slot_name, get_save_catalog, get_save_journal, forget_save_journal
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    save_dir = str(tmp_path)
+    yield save_dir
+    get_save_catalog(save_dir).close()
+
+
+@pytest.fixture
+def state():
+    return {"main_story_player_id": 1, "player": Player("점검", "인간", "전사", 1, 100, 50),
+            "current_location": "마을", "player_gold": 300, "companion_ids": [],
+            "messages": [HumanMessage(content="직접 저장")], "save_slot": "savegame_manual"}
+
+
+def test_autosave_does_not_overwrite_manual_slot(save_dir, state):
+    get_save_journal("savegame_manual", save_dir).save(state)
+
+    autosave = AutosaveManager(save_dir=save_dir, slot_count=2)
+    for turn in range(5):
+        state["messages"] = state["messages"] + [HumanMessage(content=f"턴 {turn}")]
+        state["player_gold"] += 10
+        autosave.request_save(state, "turns")
+        autosave.flush()
+    autosave.stop()
+
+    assert state["save_slot"] == "savegame_manual"
+    forget_save_journal("savegame_manual", save_dir)
+    restored = get_save_journal("savegame_manual", save_dir).load()
+    assert restored["player_gold"] == 300 and len(restored["messages"]) == 1
+
+    slots = sorted(entry["slot_name"] for entry in get_save_catalog(save_dir).list_saves())
+    assert slots == [autosave_slot_name(1), autosave_slot_name(2), "savegame_manual"]
+    # 5번째 저장은 1번 슬롯으로 돌아옴
+    assert get_save_journal(autosave_slot_name(1), save_dir).load()["player_gold"] == 350
+
+
+def test_unchanged_db_is_not_copied_again(save_dir, state):
+    # DB가 그대로면 슬롯을 돌아가며 저장해도 메인 스레드에서 DB를 다시 복사하지 않음
+    main_db = MainStoryDB(os.path.join(save_dir, "main_story.db"))
+    state["main_story_db"] = main_db
+    autosave = AutosaveManager(save_dir=save_dir, slot_count=3)
+    try:
+        for _ in range(4):
+            autosave.request_save(state, "turns")
+            autosave.flush()
+        assert autosave.metrics.db_backups == 1
+
+        main_db.create_character({"name": "점검", "type": "player", "current_location": "마을"})
+        autosave.request_save(state, "turns")
+        autosave.flush()
+        assert autosave.metrics.db_backups == 2
+    finally:
+        autosave.stop()
+        main_db.close()
+
+    # 모든 슬롯의 DB 스냅샷이 읽을 수 있는 DB이고, 마지막 슬롯에만 새 캐릭터가 있음
+    counts = []
+    for index in range(1, 4):
+        with sqlite3.connect(get_save_journal(autosave_slot_name(index), save_dir).db_snapshot_path) as conn:
+            counts.append(conn.execute("SELECT COUNT(*) FROM main_story_characters").fetchone()[0])
+    assert sorted(counts) == [0, 0, 1]